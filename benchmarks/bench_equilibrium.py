@@ -0,0 +1,262 @@
+"""Benchmarks of the equilibrium solvers for the standard form diagram patterns.
+
+Every solver is run on every pattern, for every number of divisions,
+and the time and peak memory of every phase of the run are reported.
+
+* ``setup``: construction of the form diagram, and of the force diagram if the solver needs one.
+* ``solve``: the solver call.
+
+With ``--phases``, the solve time is broken down further into the phases reported by the solver
+to a :class:`compas_tna.equilibrium.Collector`, e.g. index building, assembly, factorization, iterations and write-back.
+
+Usage
+-----
+
+.. code-block:: bash
+
+    python benchmarks/bench_equilibrium.py
+    python benchmarks/bench_equilibrium.py --solvers horizontal_numpy vertical_from_zmax --patterns cross fan --sizes 10 50 100 200
+    python benchmarks/bench_equilibrium.py --solvers vertical_from_zmax --sizes 100 --phases
+    python benchmarks/bench_equilibrium.py --json results.json
+    python benchmarks/bench_equilibrium.py --json results.json --compare baseline.json
+
+Timings are the best of ``--repeat`` runs.
+Peak memory is measured with :mod:`tracemalloc` in a separate run,
+since tracing slows down the solvers considerably.
+
+Every case runs in a fresh interpreter, such that caches of earlier cases,
+for example the memoized factorizations of :func:`compas.linalg.lufactorized`,
+don't affect the results.
+
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from compas_tna.diagrams import ForceDiagram
+from compas_tna.diagrams import FormDiagram
+from compas_tna.equilibrium import Collector
+from compas_tna.equilibrium import horizontal_nodal
+from compas_tna.equilibrium import horizontal_nodal_numpy
+from compas_tna.equilibrium import horizontal_numpy
+from compas_tna.equilibrium import relax_boundary_openings
+from compas_tna.equilibrium import vertical_from_q
+from compas_tna.equilibrium import vertical_from_zmax
+from compas_tna.equilibrium.scale_numpy import scale_from_target
+
+SIZES = [10, 20, 50, 100, 200]
+
+KMAX = 100
+
+ZMAX = 3.0
+
+# ==============================================================================
+# Patterns
+# ==============================================================================
+
+
+def create_cross(n, supports):
+    return FormDiagram.create_cross(n=n, supports=supports)
+
+
+def create_fan(n, supports):
+    return FormDiagram.create_fan(n_fans=n, n_hoops=n, supports=supports)
+
+
+def create_circular_radial(n, supports):
+    # all boundary vertices are supported
+    return FormDiagram.create_circular_radial(n_hoops=n, n_parallels=2 * n)
+
+
+def create_ortho(n, supports):
+    return FormDiagram.create_ortho(nx=n, ny=n, supports=supports)
+
+
+PATTERNS = {
+    "cross": create_cross,
+    "fan": create_fan,
+    "circular_radial": create_circular_radial,
+    "ortho": create_ortho,
+}
+
+# ==============================================================================
+# Solvers
+# ==============================================================================
+
+
+def run_horizontal(solver, form, force, monitor):
+    solver(form, force, kmax=KMAX, monitor=monitor)
+
+
+def run_vertical_from_q(form, force, monitor):
+    vertical_from_q(form, kmax=KMAX, monitor=monitor)
+
+
+def run_vertical_from_zmax(form, force, monitor):
+    vertical_from_zmax(form, ZMAX, kmax=KMAX, monitor=monitor)
+
+
+def run_scale_from_target(form, force, monitor):
+    scale_from_target(form, ZMAX, kmax=KMAX, monitor=monitor)  # type: ignore
+
+
+def run_relax_boundary_openings(form, force, monitor):
+    relax_boundary_openings(form, list(form.supports()), monitor=monitor)
+
+
+# name: (run, needs a force diagram)
+SOLVERS = {
+    "horizontal_nodal": (partial(run_horizontal, horizontal_nodal), True),
+    "horizontal_nodal_numpy": (partial(run_horizontal, horizontal_nodal_numpy), True),
+    "horizontal_numpy": (partial(run_horizontal, horizontal_numpy), True),
+    "vertical_from_q": (run_vertical_from_q, False),
+    "vertical_from_zmax": (run_vertical_from_zmax, False),
+    "scale_from_target": (run_scale_from_target, False),
+    "relax_boundary_openings": (run_relax_boundary_openings, False),
+}
+
+# ==============================================================================
+# Runner
+# ==============================================================================
+
+
+def setup(pattern, n, supports, needs_force):
+    form = PATTERNS[pattern](n, supports)
+    form.update_boundaries()
+    force = ForceDiagram.from_formdiagram(form) if needs_force else None
+    return form, force
+
+
+def run_case(solver, pattern, n, supports="all", repeat=3):
+    """Run one benchmark case and return the time and peak memory per phase.
+
+    Parameters
+    ----------
+    solver : str
+        The name of the solver.
+    pattern : str
+        The name of the pattern.
+    n : int
+        The number of divisions of the pattern.
+    supports : str, optional
+        The type of supports of the rectangular patterns.
+    repeat : int, optional
+        The number of timed runs.
+
+    Returns
+    -------
+    dict
+        The benchmark record.
+
+    """
+    run, needs_force = SOLVERS[solver]
+
+    times = {"setup": [], "solve": []}
+    phases = None
+    for _ in range(repeat):
+        gc.collect()
+        collector = Collector()
+        t0 = time.perf_counter()
+        form, force = setup(pattern, n, supports, needs_force)
+        t1 = time.perf_counter()
+        run(form, force, collector)
+        t2 = time.perf_counter()
+        times["setup"].append(t1 - t0)
+        times["solve"].append(t2 - t1)
+        if t2 - t1 <= min(times["solve"]):
+            phases = {path: data["time"] for path, data in collector.phases.items()}
+
+    memory = {}
+    gc.collect()
+    tracemalloc.start()
+    form, force = setup(pattern, n, supports, needs_force)
+    memory["setup"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    run(form, force, None)
+    memory["solve"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "solver": solver,
+        "pattern": pattern,
+        "n": n,
+        "vertices": form.number_of_vertices(),
+        "edges": form.number_of_edges(),
+        "time": {phase: min(values) for phase, values in times.items()},
+        "memory": memory,
+        "phases": phases,
+    }
+
+
+def key(record):
+    return record["solver"], record["pattern"], record["n"]
+
+
+def report(records, baseline=None, show_phases=False):
+    phases = list(records[0]["time"]) if records else []
+    reference = {key(record): record for record in baseline or []}
+
+    header = "{:<24} {:<16} {:>5} {:>8}".format("solver", "pattern", "n", "vertices")
+    for phase in phases:
+        header += " {:>12} {:>10}".format(phase + " [s]", "[MB]")
+    if reference:
+        header += " {:>8}".format("ratio")
+    print(header)
+    print("-" * len(header))
+
+    for record in records:
+        line = "{:<24} {:<16} {:>5} {:>8}".format(record["solver"], record["pattern"], record["n"], record["vertices"])
+        for phase in phases:
+            line += " {:>12.4f} {:>10.2f}".format(record["time"][phase], record["memory"][phase] / 1e6)
+        if reference:
+            other = reference.get(key(record))
+            line += " {:>8}".format("{:.2f}".format(record["time"]["solve"] / other["time"]["solve"]) if other else "-")
+        print(line)
+        if show_phases:
+            for path, seconds in record["phases"].items():
+                if "/" in path:
+                    print("{:<56} {:>12.4f}".format("    " + path.split("/", 1)[1], seconds))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--solvers", nargs="+", choices=list(SOLVERS), default=list(SOLVERS))
+    parser.add_argument("--patterns", nargs="+", choices=list(PATTERNS), default=list(PATTERNS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--supports", choices=["all", "corners"], default="all")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--phases", action="store_true", help="Report the time of the phases of the solvers.")
+    parser.add_argument("--json", help="Write the results to a JSON file.")
+    parser.add_argument("--compare", help="Compare the solve times with the results in a JSON file.")
+    args = parser.parse_args(argv)
+
+    records = []
+    context = multiprocessing.get_context("spawn")
+    for solver in args.solvers:
+        for pattern in args.patterns:
+            for n in args.sizes:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    records.append(executor.submit(run_case, solver, pattern, n, supports=args.supports, repeat=args.repeat).result())
+                print("{} {} {}: {:.4f}s".format(solver, pattern, n, records[-1]["time"]["solve"]), file=sys.stderr)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    report(records, baseline, show_phases=args.phases)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(records, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import Optional
+
+import numpy
+
+
+def fingerprint(*arrays) -> str:
+    """Compute a fingerprint of the contents of a number of arrays, for use as the key of a cache.
+
+    Parameters
+    ----------
+    *arrays : array-like
+        The arrays.
+        The fingerprint depends on the type, the shape and the values of every array, and on their order.
+
+    Returns
+    -------
+    str
+
+    """
+    h = hashlib.sha1()
+    for array in arrays:
+        array = numpy.ascontiguousarray(array)
+        h.update(array.dtype.str.encode())
+        h.update(numpy.asarray(array.shape, dtype=numpy.int64).tobytes())
+        h.update(array.tobytes())
+    return h.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe cache of the values of the most recently used keys.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of values kept in the cache.
+        The least recently used value is removed first.
+        Default is ``32``.
+
+    Notes
+    -----
+    Values are computed outside of the lock of the cache,
+    such that concurrent misses of the same key may compute the same value more than once.
+
+    Examples
+    --------
+    >>> cache = LRUCache(maxsize=8)
+    >>> interpolator = cache.get(fingerprint(xy), lambda: ScatteredInterpolator(xy))
+
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Get the value stored under a key, or compute and store it.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the value.
+        factory : callable
+            A function without parameters that computes the value if the key is not in the cache.
+
+        Returns
+        -------
+        object
+            The value.
+
+        """
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        value = factory()
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Remove a value from the cache.
+
+        Parameters
+        ----------
+        key : hashable, optional
+            The key of the value.
+            Default is ``None``, in which case all values are removed.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            if key is None:
+                self._items.clear()
+            else:
+                self._items.pop(key, None)
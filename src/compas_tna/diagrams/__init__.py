@@ -1,3 +1,5 @@
+import compas
+
 from .diagram import Diagram
 from .formdiagram import FormDiagram
 from .forcediagram import ForceDiagram
@@ -7,3 +9,14 @@ __all__ = [
     "FormDiagram",
     "ForceDiagram",
 ]
+
+if not compas.IPY:
+    from .compactformdiagram import CompactFormDiagram
+    from .binary import load_diagrams
+    from .binary import save_diagrams
+
+    __all__ += [
+        "CompactFormDiagram",
+        "load_diagrams",
+        "save_diagrams",
+    ]
@@ -0,0 +1,197 @@
+from typing import Optional
+from typing import Union
+
+import numpy
+
+from compas.data import json_dumps
+from compas.data import json_loads
+from compas.datastructures import Mesh
+from compas_tna.diagrams import CompactFormDiagram
+
+MAGIC = b"TNADIAG1"
+ALIGNMENT = 64
+TOPOLOGY = ["vertex_keys", "face_keys", "face_indptr", "face_indices", "edge_indices"]
+ELEMENTS = ["vertex", "edge", "face"]
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _compact(diagram: Union[Mesh, CompactFormDiagram]) -> CompactFormDiagram:
+    if isinstance(diagram, CompactFormDiagram):
+        return diagram
+    return CompactFormDiagram.from_formdiagram(diagram)  # type: ignore
+
+
+# =============================================================================
+# Save
+# =============================================================================
+
+
+def save_diagrams(filepath: str, form: Union[Mesh, CompactFormDiagram], force: Optional[Union[Mesh, CompactFormDiagram]] = None) -> None:
+    """Save a form diagram, and optionally its force diagram, to a binary file.
+
+    Parameters
+    ----------
+    filepath : str
+        Path of the file.
+    form : :class:`FormDiagram` | :class:`CompactFormDiagram`
+        The form diagram.
+    force : :class:`ForceDiagram` | :class:`CompactFormDiagram`, optional
+        The force diagram.
+        If provided, the correspondence between the edges of the form diagram
+        and the edges of the force diagram is stored with the diagrams.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    The file consists of a short header followed by the raw data of the arrays.
+    The header is a JSON document with the diagram attributes, the default attributes,
+    the attribute values that can't be represented by numerical arrays,
+    and the type, shape and position of every array.
+    The arrays are aligned to 64 bytes such that they can be loaded as memory maps.
+
+    See Also
+    --------
+    :func:`load_diagrams`
+
+    """
+    diagrams = {"form": _compact(form)}
+    if force is not None:
+        diagrams["force"] = _compact(force)
+
+    arrays = []
+    header = {"version": 1, "diagrams": {}, "arrays": []}
+
+    for prefix, diagram in diagrams.items():
+        meta = {
+            "name": diagram.name,
+            "attributes": diagram.attributes,
+            "objects": {},
+        }
+        for name in TOPOLOGY:
+            arrays.append(("{}/{}".format(prefix, name), getattr(diagram, name)))
+        for element in ELEMENTS:
+            meta["default_{}_attributes".format(element)] = getattr(diagram, "default_{}_attributes".format(element))
+            meta["objects"][element] = {}
+            for name, column in getattr(diagram, "{}_columns".format(element)).items():
+                if column.dtype == object:
+                    meta["objects"][element][name] = column.tolist()
+                else:
+                    arrays.append(("{}/{}/{}".format(prefix, element, name), column))
+        header["diagrams"][prefix] = meta
+
+    if force is not None:
+        header["scale"] = diagrams["force"].attributes.get("scale")
+        arrays.append(("correspondence", numpy.array(diagrams["form"].dual_edges(), dtype=numpy.int32).reshape((-1, 2))))
+
+    offset = 0
+    for name, array in arrays:
+        array = numpy.ascontiguousarray(array)
+        header["arrays"].append({"name": name, "type": array.dtype.str, "shape": list(array.shape), "offset": offset})
+        offset = _aligned(offset + array.nbytes)
+
+    data = json_dumps(header).encode("utf-8")
+    start = _aligned(len(MAGIC) + 8 + len(data))
+
+    with open(filepath, "wb") as f:
+        f.write(MAGIC)
+        f.write(numpy.uint64(len(data)).tobytes())
+        f.write(data)
+        for (_, array), spec in zip(arrays, header["arrays"]):
+            f.write(b"\0" * (start + spec["offset"] - f.tell()))
+            f.write(numpy.ascontiguousarray(array).tobytes())
+
+
+# =============================================================================
+# Load
+# =============================================================================
+
+
+def _read_header(filepath: str) -> dict:
+    with open(filepath, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a binary diagram file: {}".format(filepath))
+        size = int(numpy.frombuffer(f.read(8), dtype=numpy.uint64)[0])
+        header = json_loads(f.read(size).decode("utf-8"))
+    header["start"] = _aligned(len(MAGIC) + 8 + size)
+    return header
+
+
+def load_diagrams(filepath: str, mmap: bool = True) -> tuple[CompactFormDiagram, Optional[CompactFormDiagram]]:
+    """Load a form diagram, and its force diagram if available, from a binary file.
+
+    Parameters
+    ----------
+    filepath : str
+        Path of the file.
+    mmap : bool, optional
+        If True, the arrays are memory mapped instead of read into memory.
+        The maps are copy-on-write: the diagrams can be modified without changing the file.
+
+    Returns
+    -------
+    tuple[:class:`CompactFormDiagram`, :class:`CompactFormDiagram` | None]
+        The form diagram, and the force diagram or None if the file has no force diagram.
+        Use :meth:`CompactFormDiagram.to_formdiagram` to convert the diagrams to regular diagrams.
+
+    See Also
+    --------
+    :func:`save_diagrams`
+
+    """
+    header = _read_header(filepath)
+    start = header["start"]
+
+    arrays = {}
+    for spec in header["arrays"]:
+        dtype = numpy.dtype(spec["type"])
+        shape = tuple(spec["shape"])
+        count = int(numpy.prod(shape))
+        if count == 0:
+            array = numpy.empty(shape, dtype=dtype)
+        elif mmap:
+            array = numpy.memmap(filepath, dtype=dtype, mode="c", offset=start + spec["offset"], shape=shape)
+        else:
+            array = numpy.fromfile(filepath, dtype=dtype, count=count, offset=start + spec["offset"]).reshape(shape)
+        arrays[spec["name"]] = array
+
+    diagrams = {}
+    for prefix, meta in header["diagrams"].items():
+        columns = {}
+        for element in ELEMENTS:
+            columns[element] = {}
+            for name, values in meta["objects"][element].items():
+                column = numpy.empty(len(values), dtype=object)
+                column[:] = values
+                columns[element][name] = column
+            key = "{}/{}/".format(prefix, element)
+            for name, array in arrays.items():
+                if name.startswith(key):
+                    columns[element][name[len(key) :]] = array  # noqa: E203
+
+        diagrams[prefix] = CompactFormDiagram(
+            *[arrays["{}/{}".format(prefix, name)] for name in TOPOLOGY],
+            vertex_columns=columns["vertex"],
+            edge_columns=columns["edge"],
+            face_columns=columns["face"],
+            attributes=meta["attributes"],
+            default_vertex_attributes=meta["default_vertex_attributes"],
+            default_edge_attributes=meta["default_edge_attributes"],
+            default_face_attributes=meta["default_face_attributes"],
+            name=meta["name"],
+        )
+
+    form = diagrams["form"]
+    force = diagrams.get("force")
+    if force is not None:
+        form.dual = force
+        force.primal = form
+        form.set_dual_edges(arrays["correspondence"].tolist())
+        if header.get("scale") is not None:
+            force.attributes["scale"] = header["scale"]
+    return form, force
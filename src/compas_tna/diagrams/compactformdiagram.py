@@ -0,0 +1,735 @@
+from collections.abc import MutableMapping
+from typing import Any
+from typing import Generator
+from typing import Optional
+from typing import Type
+
+import numpy
+import numpy.typing as npt
+
+from compas.datastructures import Mesh
+from compas_tna.diagrams import FormDiagram
+
+
+def _is_real(value: Any) -> bool:
+    return isinstance(value, (int, float, numpy.number)) and not isinstance(value, (bool, numpy.bool_))
+
+
+def _column(values: list, default: Any = None) -> npt.NDArray:
+    """Convert a list of attribute values to the most specific array type that represents them without loss.
+
+    Booleans become a boolean column, integers an integer column, and real numbers a float column.
+    Missing values (``None``) of attributes without a default are stored as ``nan`` in float columns.
+    All other attributes are stored in an object column.
+
+    """
+    if all(isinstance(value, (bool, numpy.bool_)) for value in values):
+        return numpy.array(values, dtype=bool)
+    if all(isinstance(value, (int, numpy.integer)) and not isinstance(value, (bool, numpy.bool_)) for value in values):
+        return numpy.array(values, dtype=numpy.int64)
+    if all(_is_real(value) or (value is None and default is None) for value in values):
+        return numpy.array([numpy.nan if value is None else value for value in values], dtype=numpy.float64)
+    column = numpy.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _empty_column(n: int, value: Any, default: Any = None) -> npt.NDArray:
+    """Construct a column for a new attribute, filled with its default value."""
+    if isinstance(value, (bool, numpy.bool_)) and default is not None:
+        return numpy.full(n, default, dtype=bool)
+    if _is_real(value):
+        return numpy.full(n, numpy.nan if default is None else default, dtype=numpy.float64)
+    column = numpy.empty(n, dtype=object)
+    column[:] = [default] * n
+    return column
+
+
+class ColumnAttributeView(MutableMapping):
+    """Mutable mapping of the attributes of one element of a :class:`CompactFormDiagram`.
+
+    Reading and writing through the view reads and writes the attribute columns directly,
+    similar to the attribute views of COMPAS data structures.
+
+    Parameters
+    ----------
+    columns : dict[str, ndarray]
+        The attribute columns.
+    defaults : dict
+        The default attributes.
+    index : int
+        The index of the element in the columns.
+
+    """
+
+    def __init__(self, columns: dict, defaults: dict, index: int):
+        self.columns = columns
+        self.defaults = defaults
+        self.index = index
+
+    def __str__(self):
+        return str(dict(self))
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def __getitem__(self, name):
+        value = _get(self.columns, self.defaults, self.index, name)
+        if value is None and name not in self.defaults:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name, value):
+        _set(self.columns, self.defaults, self.index, name, value)
+
+    def __delitem__(self, name):
+        raise KeyError("Attributes of a compact diagram cannot be deleted: {}".format(name))
+
+    def __iter__(self):
+        for name in self.defaults:
+            yield name
+        for name in self.columns:
+            if name not in self.defaults and _get(self.columns, self.defaults, self.index, name) is not None:
+                yield name
+
+
+def _get(columns: dict, defaults: dict, index: int, name: str) -> Any:
+    column = columns.get(name)
+    if column is None:
+        return defaults.get(name)
+    value = column[index]
+    if column.dtype == object:
+        return value
+    if column.dtype == bool:
+        return bool(value)
+    if column.dtype.kind == "i":
+        return int(value)
+    if numpy.isnan(value) and name not in defaults:
+        return None
+    return float(value)
+
+
+def _set(columns: dict, defaults: dict, index, name: str, value: Any) -> None:
+    column = columns.get(name)
+    if column is None:
+        n = len(next(iter(columns.values())))
+        column = columns[name] = _empty_column(n, value, defaults.get(name))
+    try:
+        if column.dtype != object:
+            if column.dtype == bool and not isinstance(value, (bool, numpy.bool_)):
+                raise TypeError
+            if column.dtype.kind == "i" and not isinstance(value, (int, numpy.integer)):
+                raise TypeError
+            if column.dtype.kind == "f" and not _is_real(value):
+                raise TypeError
+        column[index] = value
+    except (TypeError, ValueError):
+        column = columns[name] = column.astype(object)
+        column[index] = value
+
+
+def _explicit(attr: ColumnAttributeView) -> dict:
+    """Collect the attributes of an element that differ from the defaults."""
+    return {name: value for name, value in attr.items() if name not in attr.defaults or value != attr.defaults[name]}
+
+
+class CompactFormDiagram:
+    """Array-backed representation of a form diagram for solver-only workflows.
+
+    Parameters
+    ----------
+    vertex_keys : ndarray (number_of_vertices,)
+        The identifiers of the vertices.
+    face_keys : ndarray (number_of_faces,)
+        The identifiers of the faces.
+    face_indptr : ndarray (number_of_faces + 1,)
+        The CSR row pointers of the face cycles.
+    face_indices : ndarray
+        The CSR vertex indices of the face cycles.
+    edge_indices : ndarray (number_of_edges x 2)
+        The edges as pairs of vertex indices,
+        in the order in which they are visited by :meth:`compas.datastructures.Mesh.edges`.
+    vertex_columns : dict[str, ndarray], optional
+        The vertex attributes, as one column per attribute.
+    edge_columns : dict[str, ndarray], optional
+        The edge attributes, as one column per attribute.
+    face_columns : dict[str, ndarray], optional
+        The face attributes, as one column per attribute.
+    attributes : dict, optional
+        The diagram attributes.
+    default_vertex_attributes : dict, optional
+        The default vertex attributes.
+    default_edge_attributes : dict, optional
+        The default edge attributes.
+    default_face_attributes : dict, optional
+        The default face attributes.
+    name : str, optional
+        The name of the diagram.
+
+    Notes
+    -----
+    The topology is stored in ``int32`` index arrays, and every attribute in a contiguous column.
+    Attributes with only boolean or integer values are stored in ``bool`` or ``int64`` columns,
+    attributes with real values in ``float64`` columns, and all others in ``object`` columns.
+    Values of attributes without a default that are not set on an element are stored as ``nan``.
+
+    The diagram supports the part of the :class:`FormDiagram` interface that is used by the equilibrium solvers,
+    such that all solvers in :mod:`compas_tna.equilibrium` accept it as a replacement of the form diagram.
+    The halfedge dictionary that is needed for constructing the dual and for computing selfweight
+    is only constructed on first use.
+
+    The topology of a compact diagram cannot be modified.
+    The same representation is used for the force diagram of a stored pair of diagrams,
+    which can be converted back with ``to_formdiagram(cls=ForceDiagram)``.
+
+    Examples
+    --------
+    >>> form = FormDiagram.create_cross(n=10, supports="all")
+    >>> form.update_boundaries()
+    >>> compact = CompactFormDiagram.from_formdiagram(form)
+    >>> compact.edge_columns["q"][:] = 2.0
+    >>> form = compact.to_formdiagram()
+
+    """
+
+    def __init__(
+        self,
+        vertex_keys: npt.NDArray,
+        face_keys: npt.NDArray,
+        face_indptr: npt.NDArray,
+        face_indices: npt.NDArray,
+        edge_indices: npt.NDArray,
+        vertex_columns: Optional[dict] = None,
+        edge_columns: Optional[dict] = None,
+        face_columns: Optional[dict] = None,
+        attributes: Optional[dict] = None,
+        default_vertex_attributes: Optional[dict] = None,
+        default_edge_attributes: Optional[dict] = None,
+        default_face_attributes: Optional[dict] = None,
+        name: str = "FormDiagram",
+    ):
+        self.name = name
+        self.dual = None
+        self.primal = None
+        self.attributes = dict(attributes or {})
+        self.default_vertex_attributes = dict(default_vertex_attributes or {})
+        self.default_edge_attributes = dict(default_edge_attributes or {})
+        self.default_face_attributes = dict(default_face_attributes or {})
+
+        self.vertex_keys = numpy.asarray(vertex_keys, dtype=numpy.int32)
+        self.face_keys = numpy.asarray(face_keys, dtype=numpy.int32)
+        self.face_indptr = numpy.asarray(face_indptr, dtype=numpy.int32)
+        self.face_indices = numpy.asarray(face_indices, dtype=numpy.int32)
+        self.edge_indices = numpy.asarray(edge_indices, dtype=numpy.int32).reshape((-1, 2))
+
+        self.vertex_columns = self._complete_columns(vertex_columns, self.default_vertex_attributes, self.vertex_keys.shape[0])
+        self.edge_columns = self._complete_columns(edge_columns, self.default_edge_attributes, self.edge_indices.shape[0])
+        self.face_columns = self._complete_columns(face_columns, self.default_face_attributes, self.face_keys.shape[0])
+
+        # index maps and halfedges are constructed on first use
+        self._vertex_index = None
+        self._face_index = None
+        self._edge_index = None
+        self._halfedge = None
+        self._face = None
+        self._dual_edges = None
+
+    def __str__(self):
+        return "CompactFormDiagram(name={}, vertices={}, edges={}, faces={})".format(
+            self.name,
+            self.number_of_vertices(),
+            self.number_of_edges(),
+            self.number_of_faces(),
+        )
+
+    @staticmethod
+    def _complete_columns(columns: Optional[dict], defaults: dict, n: int) -> dict:
+        columns = dict(columns or {})
+        for name, value in defaults.items():
+            if name not in columns:
+                columns[name] = _column([value] * n, value)
+        return columns
+
+    # --------------------------------------------------------------------------
+    # Conversions
+    # --------------------------------------------------------------------------
+
+    @classmethod
+    def from_formdiagram(cls, form: FormDiagram) -> "CompactFormDiagram":
+        """Construct a compact diagram from a form diagram.
+
+        Parameters
+        ----------
+        form : :class:`FormDiagram`
+            The form diagram.
+
+        Returns
+        -------
+        :class:`CompactFormDiagram`
+
+        """
+        vertices = list(form.vertices())
+        faces = list(form.faces())
+        edges = list(form.edges())
+        vertex_index = {vertex: index for index, vertex in enumerate(vertices)}
+
+        cycles = [form.face_vertices(face) for face in faces]
+        face_indptr = numpy.zeros(len(faces) + 1, dtype=numpy.int32)
+        face_indptr[1:] = numpy.cumsum([len(cycle) for cycle in cycles])
+        face_indices = numpy.array([vertex_index[vertex] for cycle in cycles for vertex in cycle], dtype=numpy.int32)
+        edge_indices = numpy.array([(vertex_index[u], vertex_index[v]) for u, v in edges], dtype=numpy.int32).reshape((-1, 2))
+
+        names = set(form.default_vertex_attributes)
+        for attr in form.vertex.values():
+            names.update(attr)
+        vertex_columns = {name: _column(form.vertices_attribute(name), form.default_vertex_attributes.get(name)) for name in sorted(names)}  # type: ignore
+
+        names = set(form.default_edge_attributes)
+        for attr in form.edgedata.values():
+            names.update(attr)
+        edge_columns = {name: _column(form.edges_attribute(name, keys=edges), form.default_edge_attributes.get(name)) for name in sorted(names)}  # type: ignore
+
+        names = set(form.default_face_attributes)
+        for attr in form.facedata.values():
+            names.update(attr)
+        face_columns = {name: _column(form.faces_attribute(name), form.default_face_attributes.get(name)) for name in sorted(names)}  # type: ignore
+
+        return cls(
+            vertices,
+            faces,
+            face_indptr,
+            face_indices,
+            edge_indices,
+            vertex_columns=vertex_columns,
+            edge_columns=edge_columns,
+            face_columns=face_columns,
+            attributes=form.attributes,
+            default_vertex_attributes=form.default_vertex_attributes,
+            default_edge_attributes=form.default_edge_attributes,
+            default_face_attributes=form.default_face_attributes,
+            name=form.name,
+        )
+
+    def to_formdiagram(self, cls: Type[Mesh] = FormDiagram) -> Mesh:
+        """Convert the compact diagram back to a form diagram.
+
+        Parameters
+        ----------
+        cls : Type[:class:`FormDiagram`], optional
+            The type of diagram.
+
+        Returns
+        -------
+        :class:`FormDiagram`
+            The diagram as an instance of type ``cls``.
+
+        """
+        form = cls(
+            default_vertex_attributes=self.default_vertex_attributes,
+            default_edge_attributes=self.default_edge_attributes,
+            default_face_attributes=self.default_face_attributes,
+            name=self.name,
+        )
+        form.attributes.update(self.attributes)
+        for index, vertex in enumerate(self.vertices()):
+            form.add_vertex(key=vertex, attr_dict=_explicit(ColumnAttributeView(self.vertex_columns, self.default_vertex_attributes, index)))
+        for index, face in enumerate(self.faces()):
+            form.add_face(self.face_vertices(face), fkey=face, attr_dict=_explicit(ColumnAttributeView(self.face_columns, self.default_face_attributes, index)))
+        for index, edge in enumerate(self.edges()):
+            for name, value in _explicit(ColumnAttributeView(self.edge_columns, self.default_edge_attributes, index)).items():
+                form.edge_attribute(edge, name, value)
+        return form
+
+    def copy(self) -> "CompactFormDiagram":
+        """Make an independent copy of the compact diagram.
+
+        Returns
+        -------
+        :class:`CompactFormDiagram`
+
+        """
+        return CompactFormDiagram(
+            self.vertex_keys.copy(),
+            self.face_keys.copy(),
+            self.face_indptr.copy(),
+            self.face_indices.copy(),
+            self.edge_indices.copy(),
+            vertex_columns={name: column.copy() for name, column in self.vertex_columns.items()},
+            edge_columns={name: column.copy() for name, column in self.edge_columns.items()},
+            face_columns={name: column.copy() for name, column in self.face_columns.items()},
+            attributes=self.attributes,
+            default_vertex_attributes=self.default_vertex_attributes,
+            default_edge_attributes=self.default_edge_attributes,
+            default_face_attributes=self.default_face_attributes,
+            name=self.name,
+        )
+
+    # --------------------------------------------------------------------------
+    # Topology
+    # --------------------------------------------------------------------------
+
+    @property
+    def halfedge(self) -> dict:
+        """The halfedge dictionary of the diagram, constructed on first use."""
+        if self._halfedge is None:
+            halfedge = {vertex: {} for vertex in self.vertices()}
+            for face, vertices in self.face.items():
+                for u, v in zip(vertices, vertices[1:] + vertices[:1]):
+                    halfedge[u][v] = face
+                    if u not in halfedge[v]:
+                        halfedge[v][u] = None
+            self._halfedge = halfedge
+        return self._halfedge
+
+    @property
+    def face(self) -> dict:
+        """The face dictionary of the diagram, constructed on first use."""
+        if self._face is None:
+            keys = self.vertex_keys.tolist()
+            indices = self.face_indices.tolist()
+            indptr = self.face_indptr.tolist()
+            self._face = {face: [keys[i] for i in indices[indptr[index] : indptr[index + 1]]] for index, face in enumerate(self.faces())}  # noqa: E203
+        return self._face
+
+    def number_of_vertices(self) -> int:
+        return self.vertex_keys.shape[0]
+
+    def number_of_edges(self) -> int:
+        return self.edge_indices.shape[0]
+
+    def number_of_faces(self) -> int:
+        return self.face_keys.shape[0]
+
+    def vertex_index(self) -> dict[int, int]:
+        """Map vertex identifiers to their index in the vertex arrays.
+
+        Returns
+        -------
+        dict[int, int]
+
+        """
+        if self._vertex_index is None:
+            self._vertex_index = {vertex: index for index, vertex in enumerate(self.vertices())}
+        return self._vertex_index
+
+    def face_index(self) -> dict[int, int]:
+        """Map face identifiers to their index in the face arrays.
+
+        Returns
+        -------
+        dict[int, int]
+
+        """
+        if self._face_index is None:
+            self._face_index = {face: index for index, face in enumerate(self.faces())}
+        return self._face_index
+
+    def edge_index(self) -> dict[tuple[int, int], int]:
+        """Map edge identifiers, in both directions, to their index in the edge arrays.
+
+        Returns
+        -------
+        dict[tuple[int, int], int]
+
+        """
+        if self._edge_index is None:
+            edge_index = {}
+            for index, (u, v) in enumerate(self.edges()):
+                edge_index[u, v] = index
+                edge_index[v, u] = index
+            self._edge_index = edge_index
+        return self._edge_index
+
+    def uv_index(self) -> dict[tuple[int, int], int]:
+        """Map the edges with ``_is_edge=True`` to their index in a list of those edges.
+
+        Returns
+        -------
+        dict[tuple[int, int], int]
+
+        """
+        return {(u, v): index for index, (u, v) in enumerate(self.edges_where(_is_edge=True))}  # type: ignore
+
+    def index_uv(self) -> dict[int, tuple[int, int]]:
+        """Map the index of the edges with ``_is_edge=True`` in a list of those edges to the edges.
+
+        Returns
+        -------
+        dict[int, tuple[int, int]]
+
+        """
+        return dict(enumerate(self.edges_where(_is_edge=True)))  # type: ignore
+
+    def vertices(self, data: bool = False) -> Generator:
+        for index, vertex in enumerate(self.vertex_keys.tolist()):
+            if data:
+                yield vertex, ColumnAttributeView(self.vertex_columns, self.default_vertex_attributes, index)
+            else:
+                yield vertex
+
+    def faces(self, data: bool = False) -> Generator:
+        for index, face in enumerate(self.face_keys.tolist()):
+            if data:
+                yield face, ColumnAttributeView(self.face_columns, self.default_face_attributes, index)
+            else:
+                yield face
+
+    def edges(self, data: bool = False) -> Generator:
+        keys = self.vertex_keys
+        for index, (u, v) in enumerate(zip(keys[self.edge_indices[:, 0]].tolist(), keys[self.edge_indices[:, 1]].tolist())):
+            if data:
+                yield (u, v), ColumnAttributeView(self.edge_columns, self.default_edge_attributes, index)
+            else:
+                yield u, v
+
+    def face_vertices(self, face: int) -> list[int]:
+        return list(self.face[face])
+
+    def vertex_neighbors(self, vertex: int) -> list[int]:
+        return list(self.halfedge[vertex])
+
+    def vertex_degree(self, vertex: int) -> int:
+        return len(self.halfedge[vertex])
+
+    # --------------------------------------------------------------------------
+    # Filters
+    # --------------------------------------------------------------------------
+
+    def _where(self, columns: dict, defaults: dict, keys: list, conditions: Optional[dict], kwargs: dict) -> npt.NDArray:
+        conditions = dict(conditions or {})
+        conditions.update(kwargs)
+        mask = numpy.ones(len(keys), dtype=bool)
+        for name, value in conditions.items():
+            column = columns.get(name)
+            if column is None:
+                method = getattr(self, name, None) if name not in defaults else None
+                if callable(method):
+                    column = numpy.array([method(key) for key in keys])
+                else:
+                    column = numpy.full(len(keys), defaults.get(name), dtype=object)
+            if isinstance(value, (tuple, list)):
+                minval, maxval = value
+                mask &= (column >= minval) & (column <= maxval)
+            else:
+                mask &= column == value
+        return numpy.nonzero(mask)[0]
+
+    def vertices_where(self, conditions: Optional[dict] = None, data: bool = False, **kwargs) -> Generator:
+        keys = self.vertex_keys.tolist()
+        for index in self._where(self.vertex_columns, self.default_vertex_attributes, keys, conditions, kwargs).tolist():
+            if data:
+                yield keys[index], ColumnAttributeView(self.vertex_columns, self.default_vertex_attributes, index)
+            else:
+                yield keys[index]
+
+    def edges_where(self, conditions: Optional[dict] = None, data: bool = False, **kwargs) -> Generator:
+        keys = list(self.edges())
+        for index in self._where(self.edge_columns, self.default_edge_attributes, keys, conditions, kwargs).tolist():
+            if data:
+                yield keys[index], ColumnAttributeView(self.edge_columns, self.default_edge_attributes, index)
+            else:
+                yield keys[index]
+
+    def faces_where(self, conditions: Optional[dict] = None, data: bool = False, **kwargs) -> Generator:
+        keys = self.face_keys.tolist()
+        for index in self._where(self.face_columns, self.default_face_attributes, keys, conditions, kwargs).tolist():
+            if data:
+                yield keys[index], ColumnAttributeView(self.face_columns, self.default_face_attributes, index)
+            else:
+                yield keys[index]
+
+    def supports(self) -> Generator[int, None, None]:
+        """Find vertices with ``is_support`` set to ``True``."""
+        return self.vertices_where(is_support=True)
+
+    def fixed(self) -> Generator[int, None, None]:
+        """Find vertices with ``is_fixed`` set to ``True``."""
+        return self.vertices_where(is_fixed=True)
+
+    # --------------------------------------------------------------------------
+    # Attributes
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def _attribute(columns, defaults, index, name, value=None):
+        if value is not None:
+            _set(columns, defaults, index, name, value)
+            return
+        return _get(columns, defaults, index, name)
+
+    @staticmethod
+    def _attributes(columns, defaults, index, names=None, values=None):
+        if names and values is not None:
+            for name, value in zip(names, values):
+                _set(columns, defaults, index, name, value)
+            return
+        if not names:
+            return ColumnAttributeView(columns, defaults, index)
+        return [_get(columns, defaults, index, name) for name in names]
+
+    def vertex_attribute(self, vertex: int, name: str, value: Any = None) -> Any:
+        return self._attribute(self.vertex_columns, self.default_vertex_attributes, self.vertex_index()[vertex], name, value)
+
+    def vertex_attributes(self, vertex: int, names=None, values=None) -> Any:
+        return self._attributes(self.vertex_columns, self.default_vertex_attributes, self.vertex_index()[vertex], names, values)
+
+    def vertices_attribute(self, name: str, value: Any = None, keys=None) -> Optional[list]:
+        vertices = self.vertices() if keys is None else keys
+        if value is not None:
+            for vertex in vertices:
+                self.vertex_attribute(vertex, name, value)
+            return
+        return [self.vertex_attribute(vertex, name) for vertex in vertices]
+
+    def vertices_attributes(self, names=None, values=None, keys=None) -> Optional[list]:
+        vertices = self.vertices() if keys is None else keys
+        if values is not None:
+            for vertex in vertices:
+                self.vertex_attributes(vertex, names, values)
+            return
+        return [self.vertex_attributes(vertex, names) for vertex in vertices]
+
+    def vertices_attribute_array(self, name: str, values: Optional[npt.ArrayLike] = None) -> Optional[npt.NDArray]:
+        """Get or set the values of a numerical attribute of all vertices as an array.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute.
+        values : array-like (n,), optional
+            The values of the attribute of the vertices, in the order of :meth:`vertices`.
+            If provided, they replace the column of the attribute.
+
+        Returns
+        -------
+        ndarray (n,) | None
+            A copy of the column of the attribute, if no values are provided,
+            with ``nan`` for the vertices without a value.
+
+        """
+        columns = self.vertex_columns
+        if values is not None:
+            values = numpy.array(values, dtype=numpy.float64).reshape(-1)
+            if values.shape[0] != len(self.vertex_keys):
+                raise ValueError(f"Expected {len(self.vertex_keys)} values of {name}, got {values.shape[0]}.")
+            columns[name] = values
+            return
+        column = columns.get(name)
+        if column is None:
+            default = self.default_vertex_attributes.get(name)
+            return numpy.full(len(self.vertex_keys), numpy.nan if default is None else default, dtype=numpy.float64)
+        if column.dtype == object:
+            return numpy.array([numpy.nan if value is None else value for value in column], dtype=numpy.float64)
+        return column.astype(numpy.float64)
+
+    def edge_attribute(self, edge: tuple[int, int], name: str, value: Any = None) -> Any:
+        return self._attribute(self.edge_columns, self.default_edge_attributes, self.edge_index()[edge], name, value)
+
+    def edge_attributes(self, edge: tuple[int, int], names=None, values=None) -> Any:
+        return self._attributes(self.edge_columns, self.default_edge_attributes, self.edge_index()[edge], names, values)
+
+    def edges_attribute(self, name: str, value: Any = None, keys=None) -> Optional[list]:
+        edges = self.edges() if keys is None else keys
+        if value is not None:
+            for edge in edges:
+                self.edge_attribute(edge, name, value)
+            return
+        return [self.edge_attribute(edge, name) for edge in edges]
+
+    def edges_attributes(self, names=None, values=None, keys=None) -> Optional[list]:
+        edges = self.edges() if keys is None else keys
+        if values is not None:
+            for edge in edges:
+                self.edge_attributes(edge, names, values)
+            return
+        return [self.edge_attributes(edge, names) for edge in edges]
+
+    def face_attribute(self, face: int, name: str, value: Any = None) -> Any:
+        return self._attribute(self.face_columns, self.default_face_attributes, self.face_index()[face], name, value)
+
+    def face_attributes(self, face: int, names=None, values=None) -> Any:
+        return self._attributes(self.face_columns, self.default_face_attributes, self.face_index()[face], names, values)
+
+    def faces_attribute(self, name: str, value: Any = None, keys=None) -> Optional[list]:
+        faces = self.faces() if keys is None else keys
+        if value is not None:
+            for face in faces:
+                self.face_attribute(face, name, value)
+            return
+        return [self.face_attribute(face, name) for face in faces]
+
+    # --------------------------------------------------------------------------
+    # Dual
+    # --------------------------------------------------------------------------
+
+    def dual_diagram(self, cls: Type[Mesh]) -> Mesh:
+        """Construct the dual of the diagram.
+
+        Parameters
+        ----------
+        cls : Mesh
+            The type of the dual.
+
+        Returns
+        -------
+        Mesh
+            The dual as an instance of type ``cls``.
+
+        See Also
+        --------
+        :meth:`FormDiagram.dual_diagram`
+
+        """
+        # the form diagram implementation only relies on the part of the interface that is shared
+        return FormDiagram.dual_diagram(self, cls)  # type: ignore
+
+    def _is_edge_mask(self) -> npt.NDArray:
+        column = self.edge_columns.get("_is_edge")
+        if column is None:
+            return numpy.full(self.number_of_edges(), bool(self.default_edge_attributes.get("_is_edge")), dtype=bool)
+        return numpy.asarray(column == True, dtype=bool)  # noqa: E712
+
+    def dual_edges(self) -> list[tuple[int, int]]:
+        """Compute the edges of the dual diagram corresponding to the edges of the diagram.
+
+        Returns
+        -------
+        list[tuple[int, int]]
+
+        See Also
+        --------
+        :meth:`FormDiagram.dual_edges`
+
+        """
+        # the topology is fixed, but the dual edges also depend on the edges marked with ``_is_edge``
+        mask = self._is_edge_mask()
+        if self._dual_edges is None or not numpy.array_equal(self._dual_edges[0], mask):
+            self._dual_edges = mask, FormDiagram.dual_edges(self)  # type: ignore
+        return list(self._dual_edges[1])  # type: ignore
+
+    def set_dual_edges(self, edges: list[tuple[int, int]]) -> None:
+        """Set the edges of the dual diagram corresponding to the edges of the diagram, if they are already known.
+
+        The edges are returned by :meth:`dual_edges` until other edges are marked with ``_is_edge``.
+
+        Parameters
+        ----------
+        edges : list[tuple[int, int]]
+            For every edge with ``_is_edge=True``, in the order of :meth:`edges`,
+            the pair of faces on the left and right of the edge.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If the number of dual edges is not the number of edges with ``_is_edge=True``.
+
+        """
+        mask = self._is_edge_mask()
+        edges = [(u, v) for u, v in edges]
+        if len(edges) != int(mask.sum()):
+            raise ValueError(f"Expected {int(mask.sum())} dual edges, got {len(edges)}.")
+        self._dual_edges = mask, edges
@@ -110,12 +110,7 @@ class ForceDiagram(Diagram):
         """
         if not form:
             return {uv: index for index, uv in enumerate(self.edges())}  # type: ignore
-        uv_index = dict()
-        for index, (u, v) in enumerate(form.edges_where(_is_edge=True)):
-            f1 = form.halfedge[u][v]
-            f2 = form.halfedge[v][u]
-            uv_index[(f1, f2)] = index
-        return uv_index
+        return {uv: index for index, uv in enumerate(form.dual_edges())}
 
     def ordered_edges(self, form: FormDiagram) -> list[tuple[int, int]]:
         """Construct an edge list in which the edges are ordered
@@ -131,10 +126,15 @@ class ForceDiagram(Diagram):
         list
             A list of edge uv tuples.
 
+        Raises
+        ------
+        ValueError
+            If the number of edges of the form diagram is not the number of edges of the force diagram.
+
         """
-        uv_index = self.uv_index(form=form)
-        index_uv = {index: uv for uv, index in iter(uv_index.items())}
-        edges = [index_uv[index] for index in range(self.number_of_edges())]
+        edges = form.dual_edges()
+        if len(edges) != self.number_of_edges():
+            raise ValueError(f"The form diagram has {len(edges)} edges, but the force diagram has {self.number_of_edges()}.")
         return edges
 
     def form_edge_attribute(self, form: FormDiagram, edge: tuple[int, int], name: str, value: Any = None) -> Any:
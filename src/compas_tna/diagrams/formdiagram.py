@@ -5,6 +5,9 @@ from typing import Type
 from compas.datastructures import Graph
 from compas.datastructures import Mesh
 from compas.geometry import Vector
+from compas.geometry import cross_vectors
+from compas.geometry import length_vector
+from compas.geometry import subtract_vectors
 from compas.itertools import pairwise
 from compas_tna.diagrams import Diagram
 
@@ -591,24 +594,67 @@ face degree: {}/{}
         Construction of the dual diagram is based on the faces around the inner, free vertices of the form diagram.
         This means not only the vertices on the boundary are ignored, but also the vertices that are supported.
 
+        The face centroids and the ordered cycles of faces around the inner vertices
+        are computed in a single pass over the face and halfedge dictionaries of the diagram.
+
         """
         dual = cls()
-        fkey_centroid = {fkey: self.face_centroid(fkey) for fkey in self.faces()}
-        inner = list(set(self.vertices()) - set(self.vertices_on_boundary()) - set(self.supports()))
+        xyz = dict(zip(self.vertices(), self.vertices_attributes("xyz")))  # type: ignore
+        supports = set(self.supports())
+        # centroid of every face, and the descendant of every vertex in every face
+        centroid = {}
+        descendant = {}
+        for fkey, vertices in self.face.items():
+            n = len(vertices)
+            x, y, z = 0.0, 0.0, 0.0
+            for u, v in pairwise(vertices + vertices[:1]):
+                descendant[fkey, u] = v
+                x += xyz[u][0]
+                y += xyz[u][1]
+                z += xyz[u][2]
+            centroid[fkey] = x / n, y / n, z / n
+        # ordered cycle of faces around every inner, free vertex
+        # the cycle direction is the same as that of Mesh.vertex_faces(key, ordered=True)
         vertices = {}
         faces = {}
-        for key in inner:
-            fkeys = self.vertex_faces(key, ordered=True)
-            for fkey in fkeys:
+        for key in self.vertices():
+            if key in supports:
+                continue
+            nbrs = self.halfedge[key]
+            if not nbrs or any(nbrs[nbr] is None or self.halfedge[nbr][key] is None for nbr in nbrs):
+                continue
+            start = next(iter(nbrs))
+            nbr = start
+            fkeys = []
+            while len(fkeys) < len(nbrs):
+                fkey = nbrs[nbr]
                 if fkey not in vertices:
-                    vertices[fkey] = fkey_centroid[fkey]
+                    vertices[fkey] = centroid[fkey]
+                fkeys.append(fkey)
+                nbr = descendant[self.halfedge[nbr][key], key]
+                if nbr == start:
+                    break
             faces[key] = fkeys
-        for key, (x, y, z) in vertices.items():
-            dual.add_vertex(key, x=x, y=y, z=z)
-        for fkey, vertices in faces.items():
-            dual.add_face(vertices, fkey=fkey)
+        for fkey, (x, y, z) in vertices.items():
+            dual.add_vertex(fkey, x=x, y=y, z=z)
+        for key, fkeys in faces.items():
+            dual.add_face(fkeys, fkey=key)
         return dual
 
+    def dual_edges(self) -> list[tuple[int, int]]:
+        """Compute the edges of the dual diagram corresponding to the edges of the FormDiagram.
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            For every edge with ``_is_edge=True``, in the order of :meth:`uv_index`,
+            the pair of faces on the left and right of the edge.
+            These pairs are the vertex pairs of the corresponding edges of the dual.
+
+        """
+        halfedge = self.halfedge
+        return [(halfedge[u][v], halfedge[v][u]) for u, v in self.edges_where(_is_edge=True)]  # type: ignore
+
     # --------------------------------------------------------------------------
     # vertices
     # --------------------------------------------------------------------------
@@ -673,6 +719,33 @@ face degree: {}/{}
         px, py, pz = self.vertex_attributes(vertex, ["px", "py", "pz"])  # type: ignore
         return Vector(px, py, pz)
 
+    def vertex_tributary_area(self, vertex: int) -> float:
+        """Compute the tributary area of a vertex in the loaded faces around it.
+
+        This is the area used for lumping the selfweight at the vertex,
+        the same as the one computed for all vertices at once by :func:`compas_tna.loads.tributary_areas`.
+
+        Parameters
+        ----------
+        vertex : int
+            The identifier of the vertex.
+
+        Returns
+        -------
+        float
+
+        """
+        area = 0.0
+        p0 = self.vertex_coordinates(vertex)
+        for nbr in self.halfedge[vertex]:
+            v1 = subtract_vectors(self.vertex_coordinates(nbr), p0)
+            for face in (self.halfedge[vertex][nbr], self.halfedge[nbr][vertex]):
+                if face is None or self.face_attribute(face, "_is_loaded") is False:
+                    continue
+                v2 = subtract_vectors(self.face_centroid(face), p0)
+                area += length_vector(cross_vectors(v1, v2))
+        return 0.25 * area
+
     def vertex_selfweight(self, vertex: int) -> Vector:
         """Get the selfweight of a vertex.
 
@@ -687,7 +760,7 @@ face degree: {}/{}
 
         """
         t = self.vertex_attribute(vertex, "t") or 0
-        a = self.vertex_area(vertex)
+        a = self.vertex_tributary_area(vertex)
         return Vector(0, 0, -t * a)
 
     def vertex_reaction(self, vertex: int) -> Vector:
@@ -703,7 +776,7 @@ face degree: {}/{}
         :class:`compas.geometry.Vector`
 
         """
-        rx, ry, rz = self.vertex_attributes(vertex, ["rx", "ry", "rz"])  # type: ignore
+        rx, ry, rz = self.vertex_attributes(vertex, ["_rx", "_ry", "_rz"])  # type: ignore
         return Vector(-rx, -ry, -rz)
 
     def vertex_residual(self, vertex: int) -> Vector:
@@ -719,9 +792,126 @@ face degree: {}/{}
         :class:`compas.geometry.Vector`
 
         """
-        rx, ry, rz = self.vertex_attributes(vertex, ["rx", "ry", "rz"])  # type: ignore
+        rx, ry, rz = self.vertex_attributes(vertex, ["_rx", "_ry", "_rz"])  # type: ignore
         return Vector(rx, ry, rz)
 
+    # --------------------------------------------------------------------------
+    # vector fields
+    # --------------------------------------------------------------------------
+
+    # The array counterparts of the vertex vectors require NumPy.
+    # They are imported on first use, such that the diagram remains available without NumPy.
+
+    def loads_array(self):
+        """Get the loads of all vertices.
+
+        Returns
+        -------
+        ndarray (n x 3)
+            The loads in the order of :meth:`vertices`, as in :meth:`vertex_load`.
+
+        """
+        import numpy
+
+        return numpy.array(self.vertices_attributes(["px", "py", "pz"]), dtype=float).reshape((-1, 3))
+
+    def selfweight_array(self):
+        """Get the selfweight of all vertices.
+
+        Returns
+        -------
+        ndarray (n x 3)
+            The selfweight in the order of :meth:`vertices`, as in :meth:`vertex_selfweight`.
+
+        """
+        import numpy
+
+        from compas_tna.loads import face_arrays
+        from compas_tna.loads import lumped_selfweight
+
+        xyz = numpy.array(self.vertices_attributes("xyz"), dtype=float).reshape((-1, 3))
+        thickness = numpy.array([t or 0 for t in self.vertices_attribute("t")], dtype=float)
+        indptr, indices, loaded = face_arrays(self)
+        selfweight = numpy.zeros_like(xyz)
+        selfweight[:, 2] = lumped_selfweight(xyz, indptr, indices, loaded, thickness)
+        return selfweight
+
+    def _supports_mask(self):
+        import numpy
+
+        return numpy.array([bool(value) for value in self.vertices_attribute("is_support")], dtype=bool)
+
+    def reactions_array(self):
+        """Get the reaction forces of all vertices.
+
+        Returns
+        -------
+        ndarray (n x 3)
+            The reaction forces in the order of :meth:`vertices`, as in :meth:`vertex_reaction`,
+            at the supports, and zero at the other vertices.
+
+        """
+        import numpy
+
+        r = numpy.array(self.vertices_attributes(["_rx", "_ry", "_rz"]), dtype=float).reshape((-1, 3))
+        reactions = numpy.zeros_like(r)
+        supports = self._supports_mask()
+        reactions[supports] = -r[supports]
+        return reactions
+
+    def residuals_array(self):
+        """Get the residual forces of all vertices.
+
+        Returns
+        -------
+        ndarray (n x 3)
+            The residual forces in the order of :meth:`vertices`, as in :meth:`vertex_residual`,
+            at the free vertices, and zero at the supports.
+
+        """
+        import numpy
+
+        r = numpy.array(self.vertices_attributes(["_rx", "_ry", "_rz"]), dtype=float).reshape((-1, 3))
+        r[self._supports_mask()] = 0.0
+        return r
+
+    def total_load(self) -> list[float]:
+        """Compute the sum of the loads of all vertices.
+
+        Returns
+        -------
+        list[float]
+            The components of the total load.
+
+        """
+        return self.loads_array().sum(axis=0).tolist()
+
+    def total_reaction(self) -> list[float]:
+        """Compute the sum of the reaction forces at the supports.
+
+        Returns
+        -------
+        list[float]
+            The components of the total reaction force.
+
+        """
+        return self.reactions_array().sum(axis=0).tolist()
+
+    def max_residual(self) -> float:
+        """Compute the largest magnitude of the residual forces at the free vertices.
+
+        Returns
+        -------
+        float
+
+        """
+        import numpy
+
+        residuals = self.residuals_array()
+        if not residuals.shape[0]:
+            return 0.0
+        return float(numpy.linalg.norm(residuals, axis=1).max())
+
     # --------------------------------------------------------------------------
     # boundary conditions
     # --------------------------------------------------------------------------
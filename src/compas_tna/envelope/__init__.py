@@ -1,6 +1,8 @@
 from .envelope import Envelope
 from .brepenvelope import BrepEnvelope
+from .meshenvelope import LinearInterpolator
 from .meshenvelope import MeshEnvelope
+from .meshgeometry import MeshGeometry
 from .parametricenvelope import ParametricEnvelope
 
 from .crossvault import CrossVaultEnvelope
@@ -11,7 +13,9 @@ from .pointedvault import PointedVaultEnvelope
 __all__ = [
     "Envelope",
     "BrepEnvelope",
+    "LinearInterpolator",
     "MeshEnvelope",
+    "MeshGeometry",
     "ParametricEnvelope",
     "PavillionVaultEnvelope",
     "PointedVaultEnvelope",
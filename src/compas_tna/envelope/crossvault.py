@@ -1,12 +1,19 @@
 import math
 
+from numpy import arange
 from numpy import array
+from numpy import asarray
+from numpy import clip
+from numpy import full
+from numpy import maximum
 from numpy import ones
+from numpy import sqrt
+from numpy import where
 from numpy import zeros
 
-from compas.datastructures import Mesh
 from compas_tna.diagrams.diagram_rectangular import create_cross_mesh
 from compas_tna.envelope.parametricenvelope import ParametricEnvelope
+from compas_tna.envelope.parametricenvelope import surface_mesh
 
 
 def crossvault_envelope(
@@ -40,26 +47,63 @@ def crossvault_envelope(
     extrados : Mesh
         Extrados mesh
     """
+    faces, xyzlb, xyzub, xyzt = crossvault_surfaces(x_span=x_span, y_span=y_span, thickness=thickness, min_lb=min_lb, n=n)
+
+    intrados = surface_mesh(xyzlb, faces, thickness)
+    extrados = surface_mesh(xyzub, faces, thickness)
+    middle = surface_mesh(xyzt, faces, thickness)
+
+    return intrados, extrados, middle
+
+
+def crossvault_surfaces(
+    x_span: tuple = (0.0, 10.0),
+    y_span: tuple = (0.0, 10.0),
+    thickness: float = 0.50,
+    min_lb: float = 0.0,
+    n: int = 100,
+):
+    """Create the surfaces of the envelope of a cross vault as coordinates over one shared base topology.
+
+    Parameters
+    ----------
+    x_span : tuple, optional
+        Span of the vault in x direction, by default (0.0, 10.0)
+    y_span : tuple, optional
+        Span of the vault in y direction, by default (0.0, 10.0)
+    thickness : float, optional
+        Thickness of the vault, by default 0.50
+    min_lb : float, optional
+        Parameter for lower bound in nodes in the boundary, by default 0.0
+    n : int, optional
+        Number of vertices for the mesh, by default 100
+
+    Returns
+    -------
+    faces : list[list[int]]
+        The vertex indices of the faces of the base topology.
+    intrados : ndarray (n x 3)
+        Coordinates of the vertices of the intrados
+    extrados : ndarray (n x 3)
+        Coordinates of the vertices of the extrados
+    middle : ndarray (n x 3)
+        Coordinates of the vertices of the middle surface
+    """
     # Create base topology
     base_topology = create_cross_mesh(x_span=x_span, y_span=y_span, n=n)
-    xyz0, faces_i = base_topology.to_vertices_and_faces()
+    xyz0, faces = base_topology.to_vertices_and_faces()
     xi, yi, _ = array(xyz0).transpose()
 
     # Create middle surface
     zt = crossvault_middle(xi, yi, min_lb, x_span=x_span, y_span=y_span, tol=1e-6)
     xyzt = array([xi, yi, zt.flatten()]).transpose()
-    middle = Mesh.from_vertices_and_faces(xyzt, faces_i)
-    middle.update_default_vertex_attributes(thickness=thickness)
 
     # Create upper and lower bounds
     zub, zlb = crossvault_bounds(xi, yi, thickness, min_lb, x_span=x_span, y_span=y_span, tol=1e-6)
     xyzub = array([xi, yi, zub.flatten()]).transpose()
     xyzlb = array([xi, yi, zlb.flatten()]).transpose()
 
-    extrados = Mesh.from_vertices_and_faces(xyzub, faces_i)
-    intrados = Mesh.from_vertices_and_faces(xyzlb, faces_i)
-
-    return intrados, extrados, middle
+    return faces, xyzlb, xyzub, xyzt
 
 
 def crossvault_middle(x, y, min_lb, x_span=(0.0, 10.0), y_span=(0.0, 10.0), tol=1e-6):
@@ -368,6 +412,99 @@ def crossvault_bounds_derivatives(x, y, thk, min_lb, x_span=(0.0, 10.0), y_span=
     return dub, dlb, dubdx, dubdy, dlbdx, dlbdy
 
 
+def crossvault_bounds_jacobian(x, y, thk, min_lb, x_span=(0.0, 10.0), y_span=(0.0, 10.0), tol=1e-6):
+    """Compute the upper and lower bounds of a crossvault and their derivatives, for all points at once.
+
+    Parameters
+    ----------
+    x : array
+        x-coordinates of the points
+    y : array
+        y-coordinates of the points
+    thk : float
+        Thickness of the arch
+    min_lb : float
+        Parameter for lower bound in nodes in the boundary
+    x_span : tuple, optional
+        Span of the vault in x direction, by default (0.0, 10.0)
+    y_span : tuple, optional
+        Span of the vault in y direction, by default (0.0, 10.0)
+    tol : float, optional
+        Tolerance, by default 1e-6
+
+    Returns
+    -------
+    ub : array (n,)
+        Values of the upper bound in the points
+    lb : array (n,)
+        Values of the lower bound in the points
+    dubdt : array (n,)
+        Derivatives of the upper bound with respect to the thickness
+    dlbdt : array (n,)
+        Derivatives of the lower bound with respect to the thickness
+    dubdxy : array (n x 2)
+        Derivatives of the upper bound with respect to the x and y coordinates of the points
+    dlbdxy : array (n x 2)
+        Derivatives of the lower bound with respect to the x and y coordinates of the points
+
+    Notes
+    -----
+    In every quadrant, the bounds of :func:`crossvault_bounds` simplify to ``hc / r * sqrt(r**2 - (u - uc)**2)``,
+    with ``u`` the coordinate along the span of the arches of the quadrant, ``uc`` its center and ``r`` the radius of the arches.
+    Unlike :func:`crossvault_bounds_derivatives`, the derivatives are exact for rectangular vaults.
+    """
+
+    x = asarray(x, dtype=float).ravel()
+    y = asarray(y, dtype=float).ravel()
+    n = len(x)
+
+    x0, x1 = x_span
+    y0, y1 = y_span
+
+    # the quadrants Q1 and Q2 are arches spanning in the y direction, Q3 and Q4 in the x direction
+    q1 = (y <= y0 + (y1 - y0) / (x1 - x0) * (x - x0) + tol) & (y >= y1 - (y1 - y0) / (x1 - x0) * (x - x0) - tol)
+    q3 = (y >= y0 + (y1 - y0) / (x1 - x0) * (x - x0) - tol) & (y >= y1 - (y1 - y0) / (x1 - x0) * (x - x0) - tol)
+    q2 = (y >= y0 + (y1 - y0) / (x1 - x0) * (x - x0) - tol) & (y <= y1 - (y1 - y0) / (x1 - x0) * (x - x0) + tol)
+    along_y = q1 | (~q3 & q2)
+    axis = where(along_y, 1, 0)
+    u = where(along_y, y, x)
+    uc = where(along_y, (y0 + y1) / 2, (x0 + x1) / 2)
+    r = where(along_y, (y1 - y0) / 2, (x1 - x0) / 2)
+    hc = max(x1 - x0, y1 - y0) / 2
+
+    lb = full(n, -min_lb, dtype=float)
+    dubdt = zeros(n)
+    dlbdt = zeros(n)
+    dubdxy = zeros((n, 2))
+    dlbdxy = zeros((n, 2))
+    rows = arange(n)
+
+    # the radii of the arches and the height of the crown grow with half the thickness at the extrados
+    r_ub = r + thk / 2
+    hc_ub = hc + thk / 2
+    s_ub = sqrt(maximum(r_ub**2 - (u - uc) ** 2, 0.0))
+    ub = hc_ub / r_ub * s_ub
+    extrados = s_ub > 0.0
+    r_, s_ = r_ub[extrados], s_ub[extrados]
+    dubdt[extrados] = 1 / 2 * (s_ / r_ + hc_ub / s_ - hc_ub * s_ / r_**2)
+    dubdxy[rows[extrados], axis[extrados]] = -hc_ub / r_ * (u - uc)[extrados] / s_
+
+    # and shrink with half the thickness at the intrados
+    # beyond the springings of the intrados, the points are projected back onto its boundary
+    intrados_null = ((y > y1 - thk / 2) | (y < y0 + thk / 2)) & ((x > x1 - thk / 2) | (x < x0 + thk / 2))
+    r_lb = r - thk / 2
+    hc_lb = hc - thk / 2
+    u_lb = clip(u, uc - r_lb, uc + r_lb)
+    s_lb = sqrt(maximum(r_lb**2 - (u_lb - uc) ** 2, 0.0))
+    lb[~intrados_null] = (hc_lb / r_lb * s_lb)[~intrados_null]
+    intrados = ~intrados_null & (s_lb > 0.0) & (u_lb == u)
+    r_, s_ = r_lb[intrados], s_lb[intrados]
+    dlbdt[intrados] = -1 / 2 * (s_ / r_ + hc_lb / s_ - hc_lb * s_ / r_**2)
+    dlbdxy[rows[intrados], axis[intrados]] = -hc_lb / r_ * (u - uc)[intrados] / s_
+
+    return ub, lb, dubdt, dlbdt, dubdxy, dlbdxy
+
+
 def crossvault_bound_react(x, y, thk, min_lb, x_span=(0.0, 10.0), y_span=(0.0, 10.0), tol=1e-6):
     """Compute the bounds on the reaction vector of the crossvault."""
     pass
@@ -391,6 +528,8 @@ def _sqrt(x):
 
 
 class CrossVaultEnvelope(ParametricEnvelope):
+    surface_parameters = ("thickness", "x_span", "y_span", "min_lb", "n")
+
     def __init__(
         self,
         x_span: tuple = (0.0, 10.0),
@@ -406,8 +545,6 @@ class CrossVaultEnvelope(ParametricEnvelope):
         self.min_lb = min_lb
         self.n = n
 
-        self.update_envelope()  # Generate the intra/extra/middle meshes
-
     @property
     def __data__(self):
         data = super().__data__
@@ -421,10 +558,8 @@ class CrossVaultEnvelope(ParametricEnvelope):
         return f"CrossVaultEnvelope(name={self.name})"
 
     def update_envelope(self):
-        intrados, extrados, middle = crossvault_envelope(x_span=self.x_span, y_span=self.y_span, thickness=self.thickness, min_lb=self.min_lb, n=self.n)
-        self.intrados = intrados
-        self.extrados = extrados
-        self.middle = middle
+        faces, intrados, extrados, middle = crossvault_surfaces(x_span=self.x_span, y_span=self.y_span, thickness=self.thickness, min_lb=self.min_lb, n=self.n)
+        self.set_surfaces(faces, intrados, extrados, middle)
 
     def compute_middle(self, x, y):
         return crossvault_middle(x, y, self.min_lb, self.x_span, self.y_span, tol=1e-6)
@@ -443,6 +578,11 @@ class CrossVaultEnvelope(ParametricEnvelope):
             self.thickness = thickness
         return crossvault_bounds_derivatives(x, y, thickness, self.min_lb, self.x_span, self.y_span, tol=1e-6)
 
+    def bounds_and_jacobian(self, x, y, thickness=None):
+        if thickness is None:
+            thickness = self.thickness
+        return crossvault_bounds_jacobian(x, y, thickness, self.min_lb, self.x_span, self.y_span, tol=1e-6)
+
     def compute_bound_react(self, x, y, thickness=None, fixed=None):
         if thickness is None:
             thickness = self.thickness
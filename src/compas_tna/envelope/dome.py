@@ -1,12 +1,17 @@
 import math
 
 from numpy import array
+from numpy import asarray
+from numpy import full
+from numpy import maximum
 from numpy import ones
+from numpy import sqrt
+from numpy import stack
 from numpy import zeros
 
-from compas.datastructures import Mesh
 from compas_tna.diagrams.diagram_circular import create_circular_radial_spaced_mesh
 from compas_tna.envelope.parametricenvelope import ParametricEnvelope
+from compas_tna.envelope.parametricenvelope import surface_mesh
 
 
 def dome_envelope(
@@ -46,33 +51,91 @@ def dome_envelope(
     extrados : Mesh
         Extrados mesh
     """
-    # Create meshes for different radii
-    for radius_current in [radius, radius - thickness / 2, radius + thickness / 2]:
-        base_topology = create_circular_radial_spaced_mesh(
-            center=center,
-            radius=radius_current,
-            n_hoops=n_hoops,
-            n_parallels=n_parallels,
-            r_oculus=r_oculus,
-        )
-        xyz0, faces_i = base_topology.to_vertices_and_faces()
-        xi, yi, _ = array(xyz0).transpose()
-        zt = dome_middle(xi, yi, radius_current, center=center)
-        xyzt = array([xi, yi, zt.flatten()]).transpose()
+    faces, xyzi, xyze, xyzt = dome_surfaces(
+        center=center,
+        radius=radius,
+        thickness=thickness,
+        min_lb=min_lb,
+        n_hoops=n_hoops,
+        n_parallels=n_parallels,
+        r_oculus=r_oculus,
+    )
+
+    intrados = surface_mesh(xyzi, faces, thickness)
+    extrados = surface_mesh(xyze, faces, thickness)
+    middle = surface_mesh(xyzt, faces, thickness)
 
-        if radius_current == radius:
-            middle = Mesh.from_vertices_and_faces(xyzt, faces_i)
-        elif radius_current == radius - thickness / 2:
-            intrados = Mesh.from_vertices_and_faces(xyzt, faces_i)
-        elif radius_current == radius + thickness / 2:
-            extrados = Mesh.from_vertices_and_faces(xyzt, faces_i)
+    return intrados, extrados, middle
 
-    # Set thickness attributes
-    middle.update_default_vertex_attributes(thickness=thickness)
-    intrados.update_default_vertex_attributes(thickness=thickness)
-    extrados.update_default_vertex_attributes(thickness=thickness)
 
-    return intrados, extrados, middle
+def dome_surfaces(
+    center: tuple = (5.0, 5.0),
+    radius: float = 5.0,
+    thickness: float = 0.50,
+    min_lb: float = 0.0,
+    n_hoops: int = 24,
+    n_parallels: int = 40,
+    r_oculus: float = 0.0,
+):
+    """Create the surfaces of the envelope of a dome as coordinates over one shared base topology.
+
+    The intrados, extrados and middle surface are hemispheres with different radii.
+    The radial layout of their vertices is that of the base topology, scaled to the radius outside the oculus.
+
+    Parameters
+    ----------
+    center : tuple, optional
+        x, y coordinates of the center of the dome, by default (5.0, 5.0)
+    radius : float, optional
+        The radius of the dome, by default 5.0
+    thickness : float, optional
+        Thickness of the dome, by default 0.50
+    min_lb : float, optional
+        Parameter for lower bound in nodes in the boundary, by default 0.0
+    n_hoops : int, optional
+        Number of hoops for the mesh, by default 24
+    n_parallels : int, optional
+        Number of parallels for the mesh, by default 40
+    r_oculus : float, optional
+        Radius of the oculus (opening at the top), by default 0.0
+
+    Returns
+    -------
+    faces : list[list[int]]
+        The vertex indices of the faces of the base topology.
+    intrados : ndarray (n x 3)
+        Coordinates of the vertices of the intrados
+    extrados : ndarray (n x 3)
+        Coordinates of the vertices of the extrados
+    middle : ndarray (n x 3)
+        Coordinates of the vertices of the middle surface
+    """
+    base_topology = create_circular_radial_spaced_mesh(
+        center=center,
+        radius=radius,
+        n_hoops=n_hoops,
+        n_parallels=n_parallels,
+        r_oculus=r_oculus,
+    )
+    xyz0, faces = base_topology.to_vertices_and_faces()
+    x0, y0, _ = array(xyz0).transpose()
+    dx = x0 - center[0]
+    dy = y0 - center[1]
+    distance = sqrt(dx**2 + dy**2)
+
+    surfaces = []
+    for radius_current in [radius - thickness / 2, radius + thickness / 2, radius]:
+        # the distances to the center outside the oculus scale with the radius
+        scale = (radius_current - r_oculus) / (radius - r_oculus)
+        factor = full(distance.shape, scale)
+        if r_oculus:
+            factor += r_oculus * (1 - scale) / distance
+        xi = center[0] + factor * dx
+        yi = center[1] + factor * dy
+        zt = dome_middle(xi, yi, radius_current, center=center)
+        surfaces.append(array([xi, yi, zt.flatten()]).transpose())
+
+    return faces, surfaces[0], surfaces[1], surfaces[2]
 
 
 def dome_middle(x, y, radius, center=(5.0, 5.0)):
@@ -205,6 +268,68 @@ def dome_bounds_derivatives(x, y, thk, min_lb, center=(5.0, 5.0), radius=5.0):
     return dub, dlb
 
 
+def dome_bounds_jacobian(x, y, thk, min_lb, center=(5.0, 5.0), radius=5.0):
+    """Compute the upper and lower bounds of the dome and their derivatives, for all points at once.
+
+    Parameters
+    ----------
+    x : array
+        x-coordinates of the points
+    y : array
+        y-coordinates of the points
+    thk : float
+        Thickness of the dome
+    min_lb : float
+        Parameter for lower bound in nodes in the boundary
+    center : tuple, optional
+        x, y coordinates of the center of the dome, by default (5.0, 5.0)
+    radius : float, optional
+        The radius of the dome, by default 5.0
+
+    Returns
+    -------
+    ub : array (n,)
+        Values of the upper bound in the points
+    lb : array (n,)
+        Values of the lower bound in the points
+    dubdt : array (n,)
+        Derivatives of the upper bound with respect to the thickness
+    dlbdt : array (n,)
+        Derivatives of the lower bound with respect to the thickness
+    dubdxy : array (n x 2)
+        Derivatives of the upper bound with respect to the x and y coordinates of the points
+    dlbdxy : array (n x 2)
+        Derivatives of the lower bound with respect to the x and y coordinates of the points
+    """
+
+    x = asarray(x, dtype=float).ravel()
+    y = asarray(y, dtype=float).ravel()
+    n = len(x)
+    ri = radius - thk / 2
+    re = radius + thk / 2
+    d = stack((x - center[0], y - center[1]), axis=1)
+    d2 = (d**2).sum(axis=1)
+
+    ub = sqrt(maximum(re**2 - d2, 0.0))
+    lb = full(n, -min_lb, dtype=float)
+    dubdt = zeros(n)
+    dlbdt = zeros(n)
+    dubdxy = zeros((n, 2))
+    dlbdxy = zeros((n, 2))
+
+    extrados = ub > 0.0
+    dubdt[extrados] = 1 / 2 * re / ub[extrados]
+    dubdxy[extrados] = -d[extrados] / ub[extrados, None]
+
+    intrados = ri**2 - d2 > 0.0
+    zi = sqrt(ri**2 - d2[intrados])
+    lb[intrados] = zi
+    dlbdt[intrados] = -1 / 2 * ri / zi
+    dlbdxy[intrados] = -d[intrados] / zi[:, None]
+
+    return ub, lb, dubdt, dlbdt, dubdxy, dlbdxy
+
+
 def dome_bound_react(x, y, thk, fixed, center=(5.0, 5.0), radius=5.0):
     """Computes the reaction bounds of a dome for a given thickness
 
@@ -280,6 +405,8 @@ def dome_bound_react_derivatives(x, y, thk, fixed, center=(5.0, 5.0), radius=5.0
 
 
 class DomeEnvelope(ParametricEnvelope):
+    surface_parameters = ("thickness", "center", "radius", "min_lb", "n_hoops", "n_parallels", "r_oculus")
+
     def __init__(
         self,
         center: tuple = (5.0, 5.0),
@@ -299,8 +426,6 @@ class DomeEnvelope(ParametricEnvelope):
         self.n_parallels = n_parallels
         self.r_oculus = r_oculus
 
-        self.update_envelope()  # Generate the intra/extra/middle meshes
-
     @property
     def __data__(self):
         data = super().__data__
@@ -316,7 +441,7 @@ class DomeEnvelope(ParametricEnvelope):
         return f"DomeEnvelope(name={self.name})"
 
     def update_envelope(self):
-        intrados, extrados, middle = dome_envelope(
+        faces, intrados, extrados, middle = dome_surfaces(
             center=self.center,
             radius=self.radius,
             thickness=self.thickness,
@@ -325,9 +450,7 @@ class DomeEnvelope(ParametricEnvelope):
             n_parallels=self.n_parallels,
             r_oculus=self.r_oculus,
         )
-        self.intrados = intrados
-        self.extrados = extrados
-        self.middle = middle
+        self.set_surfaces(faces, intrados, extrados, middle)
 
     def compute_middle(self, x, y):
         return dome_middle(x, y, self.radius, self.center)
@@ -346,6 +469,11 @@ class DomeEnvelope(ParametricEnvelope):
             self.thickness = thickness
         return dome_bounds_derivatives(x, y, thickness, self.min_lb, self.center, self.radius)
 
+    def bounds_and_jacobian(self, x, y, thickness=None):
+        if thickness is None:
+            thickness = self.thickness
+        return dome_bounds_jacobian(x, y, thickness, self.min_lb, self.center, self.radius)
+
     def compute_bound_react(self, x, y, thickness=None, fixed=None):
         if thickness is None:
             thickness = self.thickness
@@ -1,27 +1,162 @@
+from typing import Callable
 from typing import Optional
 from typing import Tuple
 
 import numpy as np
 
 from compas.data import Data
+from compas_tna.diagrams import CompactFormDiagram
 from compas_tna.diagrams import FormDiagram
+from compas_tna.loads import face_arrays
+from compas_tna.loads import lumped_selfweight
+
+
+def vertices_xy_array(formdiagram: FormDiagram) -> np.ndarray:
+    """Collect the XY coordinates of the vertices of a form diagram as an array.
+
+    Parameters
+    ----------
+    formdiagram : :class:`FormDiagram` | :class:`CompactFormDiagram`
+        The form diagram.
+
+    Returns
+    -------
+    ndarray (n x 2)
+        The coordinates in the order of the vertices of the diagram.
+
+    """
+    if isinstance(formdiagram, CompactFormDiagram):
+        return np.column_stack([formdiagram.vertices_attribute_array("x"), formdiagram.vertices_attribute_array("y")])
+    return np.array(formdiagram.vertices_attributes("xy"), dtype=float).reshape((-1, 2))
+
+
+def set_vertices_attribute_array(formdiagram: FormDiagram, name: str, values: np.ndarray) -> None:
+    """Store the values of a numerical attribute of all vertices of a form diagram at once.
+
+    The values of a :class:`CompactFormDiagram` replace the column of the attribute.
+    Those of a :class:`FormDiagram` are written into the attribute dictionaries of the vertices in a single pass.
+
+    Parameters
+    ----------
+    formdiagram : :class:`FormDiagram` | :class:`CompactFormDiagram`
+        The form diagram.
+    name : str
+        The name of the attribute.
+    values : ndarray (n,)
+        The values in the order of the vertices of the diagram.
+
+    Returns
+    -------
+    None
+
+    """
+    if isinstance(formdiagram, CompactFormDiagram):
+        formdiagram.vertices_attribute_array(name, values)
+        return
+    for (_, attr), value in zip(formdiagram.vertices(data=True), np.asarray(values, dtype=float).reshape(-1).tolist()):
+        attr[name] = value
+
+
+def apply_lumped_selfweight(formdiagram: FormDiagram, z: np.ndarray, thickness, density: float, total: Optional[float] = None) -> np.ndarray:
+    """Lump the selfweight of a shell at the vertices of a form diagram lifted onto its surface.
+
+    Parameters
+    ----------
+    formdiagram : :class:`FormDiagram` | :class:`CompactFormDiagram`
+        The form diagram.
+    z : ndarray (n,)
+        The heights of the vertices on the surface of the shell.
+    thickness : float | ndarray (n,)
+        The thickness of the shell.
+    density : float
+        The density of the material.
+    total : float, optional
+        The total selfweight to which the loads are scaled.
+        Default is ``None``, in which case the loads are not scaled.
+
+    Returns
+    -------
+    ndarray (n,)
+        The loads ``pz`` stored at the vertices.
+
+    """
+    xyz = np.column_stack([vertices_xy_array(formdiagram), np.asarray(z, dtype=float).reshape(-1)])
+    indptr, indices, loaded = face_arrays(formdiagram)
+    pz = lumped_selfweight(xyz, indptr, indices, loaded, thickness, density)
+    if total is not None:
+        lumped = np.abs(pz).sum()
+        if lumped > 0:
+            pz *= total / lumped
+    set_vertices_attribute_array(formdiagram, "pz", pz)
+    return pz
+
+
+class dependent_property:
+    """Decorator for read-only properties of an envelope that are cached until one of their dependencies changes.
+
+    Parameters
+    ----------
+    *dependencies : str
+        The names of the dependencies of the property.
+        Dependencies are attributes of the envelope, such as ``"thickness"`` or ``"rho"``,
+        or groups of attributes, such as ``"surfaces"`` (see :attr:`Envelope.dependency_attributes`).
+
+    Examples
+    --------
+    >>> class MyEnvelope(Envelope):
+    ...     @dependent_property("surfaces", "thickness")
+    ...     def volume(self):
+    ...         return self.compute_volume()
+
+    """
+
+    def __init__(self, *dependencies: str):
+        self.dependencies = dependencies
+        self.func = None
+        self.name = None
+
+    def __call__(self, func: Callable) -> "dependent_property":
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+        return self
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        cache = obj._cache
+        if self.name not in cache:
+            cache[self.name] = self.func(obj)
+        return cache[self.name]
 
 
 class Envelope(Data):
-    """Pure geometric envelope representing masonry structure boundaries."""
+    """Pure geometric envelope representing masonry structure boundaries.
+
+    The :attr:`area`, :attr:`volume` and :attr:`selfweight` of the envelope are cached,
+    and discarded when one of their dependencies is set.
+    Changes to the meshes of the envelope made in place are not detected,
+    and require an explicit call to :meth:`invalidate`.
+    """
+
+    # the attributes that are grouped into one dependency of the cached properties
+    dependency_attributes = {"intrados": "surfaces", "extrados": "surfaces", "middle": "surfaces"}
 
     def __init__(self, rho: Optional[float] = 20.0, rho_fill: Optional[float] = 14.0, is_parametric: bool = False, **kwargs):
         super().__init__(**kwargs)
 
+        # Computed properties (cached)
+        self._cache = {}
+
         self.rho = rho
         self.fill = None
         self.rho_fill = rho_fill
         self._is_parametric = is_parametric
 
-        # Computed properties (cached)
-        self._area = 0.0
-        self._volume = 0.0
-        self._total_selfweight = 0.0
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if self.__dict__.get("_cache"):
+            self.invalidate(self.dependency_attributes.get(name, name))
 
     @property
     def __data__(self):
@@ -38,23 +173,43 @@ class Envelope(Data):
     # Properties
     # =============================================================================
 
-    @property
-    def area(self):
-        if not self._area:
-            self._area = self.compute_area()
-        return self._area
-
-    @property
-    def volume(self):
-        if not self._volume:
-            self._volume = self.compute_volume()
-        return self._volume
-
-    @property
-    def selfweight(self):
-        if not self._total_selfweight:
-            self._total_selfweight = self.compute_selfweight()
-        return self._total_selfweight
+    @dependent_property("surfaces")
+    def area(self) -> float:
+        """The total area of the middle surface of the envelope."""
+        return self.compute_area()
+
+    @dependent_property("surfaces", "thickness")
+    def volume(self) -> float:
+        """The total volume of the envelope."""
+        return self.compute_volume()
+
+    @dependent_property("surfaces", "thickness", "rho")
+    def selfweight(self) -> float:
+        """The total selfweight of the envelope."""
+        return self.compute_selfweight()
+
+    def invalidate(self, dependency: Optional[str] = None) -> None:
+        """Discard the cached properties that depend on a dependency.
+
+        Parameters
+        ----------
+        dependency : str, optional
+            The name of the dependency, for example ``"thickness"``, ``"rho"`` or ``"surfaces"``.
+            Default is ``None``, in which case all cached properties are discarded.
+
+        Returns
+        -------
+        None
+
+        """
+        cache = self._cache
+        if dependency is None:
+            cache.clear()
+            return
+        cls = type(self)
+        for name in list(cache):
+            if dependency in getattr(cls, name).dependencies:
+                del cache[name]
 
     @property
     def is_parametric(self) -> bool:
@@ -131,6 +286,40 @@ class Envelope(Data):
 
         raise NotImplementedError("Implement compute_bounds_derivatives for specific envelope type.")
 
+    def bounds_and_jacobian(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        thickness: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Compute the upper and lower bounds of the envelope at a set of points, and their derivatives.
+
+        The bounds at a point only depend on the coordinates of that point,
+        such that the derivatives with respect to the coordinates are returned per point,
+        instead of as diagonal matrices.
+
+        Parameters
+        ----------
+        x : ndarray (n,)
+            The x-coordinates of the points.
+        y : ndarray (n,)
+            The y-coordinates of the points.
+        thickness : float, optional
+            The thickness of the envelope at which the bounds are evaluated.
+            The thickness of the envelope itself is not changed.
+            Default is ``None``, in which case the current thickness is used.
+
+        Returns
+        -------
+        tuple[ndarray, ndarray, ndarray, ndarray, ndarray, ndarray]
+            The upper bounds ``ub`` (n,), the lower bounds ``lb`` (n,),
+            their derivatives with respect to the thickness ``dubdt`` (n,) and ``dlbdt`` (n,),
+            and their derivatives with respect to the coordinates ``dubdxy`` (n x 2) and ``dlbdxy`` (n x 2).
+
+        """
+
+        raise NotImplementedError("Implement bounds_and_jacobian for specific envelope type.")
+
     def compute_bound_react(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
         """Compute the reaction bounds of the envelope based on the appropriate method."""
 
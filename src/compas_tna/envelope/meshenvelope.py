@@ -1,12 +1,26 @@
-import math
 from typing import Optional
 
+from numpy import abs as npabs
+from numpy import allclose
 from numpy import asarray
+from numpy import float64
+from numpy import isnan
+from numpy import nan
+from numpy import where
+from numpy import zeros
 from scipy.interpolate import griddata
 
 from compas.datastructures import Mesh
 from compas_tna.diagrams import FormDiagram
 from compas_tna.envelope import Envelope
+from compas_tna.envelope.envelope import apply_lumped_selfweight
+from compas_tna.envelope.envelope import set_vertices_attribute_array
+from compas_tna.envelope.envelope import vertices_xy_array
+from compas_tna.envelope.meshgeometry import MeshGeometry
+from compas_tna.envelope.meshgeometry import copy_mesh
+from compas_tna.envelope.meshgeometry import vertices_attribute_array
+from compas_tna.loads.interpolation import LinearInterpolator
+from compas_tna.loads.interpolation import scattered_interpolator
 
 
 def griddata_project(xy: list[list[float]], xyz_target: list[list[float]], method="linear"):
@@ -51,26 +65,29 @@ def interpolate_middle_mesh(intrados: Mesh, extrados: Mesh) -> Mesh:
         The interpolated middle mesh with proper normal-based thickness stored.
     """
     # Use the intrados as base topology
-    middle = intrados.copy()
+    geometry = MeshGeometry.from_mesh(intrados)
+    xyz = geometry.xyz.copy()
 
     # Get Z coordinates from both surfaces based on the same XY coordinates
-    zi = middle.vertices_attribute("z")
-    ze = griddata_project(middle.vertices_attributes("xy"), extrados.vertices_attributes("xyz"), method="linear")
-
-    # First loop: set middle Z as average of intrados and extrados
-    for i, key in enumerate(middle.vertices()):
-        middle_z = (zi[i] + ze[i]) / 2.0
-        middle.vertex_attribute(key, "z", middle_z)
-
-    # Second loop: calculate and set thickness using correct normals
-    for i, key in enumerate(middle.vertices()):
-        _, _, nz = middle.vertex_normal(key)
-        z_diff = ze[i] - zi[i]
-        if abs(nz) > 0.1:
-            thickness = abs(z_diff) * abs(nz)
-        else:
-            thickness = abs(z_diff)
-        middle.vertex_attribute(key, "thickness", thickness)
+    zi = xyz[:, 2].copy()
+    xyz_e = MeshGeometry.from_mesh(extrados).xyz
+    if xyz_e.shape == xyz.shape and allclose(xyz_e[:, :2], xyz[:, :2]):
+        # the extrados is a vertical offset of the intrados
+        ze = xyz_e[:, 2]
+    else:
+        ze = griddata(xyz_e[:, :2], xyz_e[:, 2], xyz[:, :2], method="linear")
+
+    # Set middle Z as average of intrados and extrados
+    xyz[:, 2] = 0.5 * (zi + ze)
+
+    # Calculate thickness using the normals of the middle surface
+    nz = npabs(geometry.vertex_normals(xyz)[:, 2])
+    z_diff = npabs(ze - zi)
+    thickness = where(nz > 0.1, z_diff * nz, z_diff)
+
+    middle = copy_mesh(intrados, xyz)
+    for (_, attr), value in zip(middle.vertices(data=True), thickness.tolist()):
+        attr["thickness"] = value
 
     return middle
 
@@ -96,40 +113,28 @@ def offset_from_middle(middle: Mesh, fixed_xy: bool = True) -> tuple[Mesh, Mesh]
     tuple[Mesh, Mesh]
         (intrados, extrados) offset meshes.
     """
-    extrados = middle.copy()
-    intrados = middle.copy()
-
-    for key in middle.vertices():
-        x, y, z = middle.vertex_coordinates(key)
-        nx, ny, nz = middle.vertex_normal(key)
-
-        # Get thickness for this specific vertex (should be normal-based)
-        thickness = middle.vertex_attribute(key, "thickness")
-        if thickness is None:
-            thickness = 0.5
-        half_thick = 0.5 * thickness
-
-        if fixed_xy:
-            # Prevent division by zero for horizontal normals
-            if abs(nz) < 1e-8:
-                raise ValueError(f"Normal at vertex {key} is (almost) horizontal: {nx, ny, nz}")
-            dz = half_thick / nz
-            extrados_z = z + dz
-            intrados_z = z - dz
-            extrados.vertex_attribute(key, "z", extrados_z)
-            intrados.vertex_attribute(key, "z", intrados_z)
-        else:
-            # Full 3D normal offset - this is the most accurate for curved surfaces
-            extrados.vertex_attributes(
-                key,
-                "xyz",
-                [x + half_thick * nx, y + half_thick * ny, z + half_thick * nz],
-            )
-            intrados.vertex_attributes(
-                key,
-                "xyz",
-                [x - half_thick * nx, y - half_thick * ny, z - half_thick * nz],
-            )
+    geometry = MeshGeometry.from_mesh(middle)
+    xyz = geometry.xyz
+    normals = geometry.vertex_normals()
+
+    # Get thickness for each vertex (should be normal-based)
+    half_thick = 0.5 * vertices_attribute_array(middle, "thickness", 0.5)
+
+    if fixed_xy:
+        # Prevent division by zero for horizontal normals
+        horizontal = npabs(normals[:, 2]) < 1e-8
+        if horizontal.any():
+            index = int(horizontal.nonzero()[0][0])
+            key = list(middle.vertices())[index]
+            raise ValueError(f"Normal at vertex {key} is (almost) horizontal: {tuple(normals[index].tolist())}")
+        offset = zeros(xyz.shape)
+        offset[:, 2] = half_thick / normals[:, 2]
+    else:
+        # Full 3D normal offset - this is the most accurate for curved surfaces
+        offset = half_thick[:, None] * normals
+
+    extrados = copy_mesh(middle, xyz + offset)
+    intrados = copy_mesh(middle, xyz - offset)
 
     return intrados, extrados
 
@@ -248,6 +253,9 @@ class MeshEnvelope(Envelope):
         # Thickness property
         self._thickness = thickness
 
+        # Interpolators of the heights of the surfaces, rebuilt if a surface is replaced
+        self._interpolators = {}
+
     def __str__(self):
         return f"MeshEnvelope(name={self.name})"
 
@@ -311,7 +319,7 @@ class MeshEnvelope(Envelope):
         """
         envelope = cls()
 
-        envelope.middle = mesh.copy(cls=Mesh)
+        envelope.middle = copy_mesh(mesh, cls=Mesh)
 
         if thickness is not None:
             envelope.thickness = thickness
@@ -356,14 +364,11 @@ class MeshEnvelope(Envelope):
         """
         if self.middle is not None:
             # Return average thickness from middle mesh vertices
-            thicknesses = []
-            for key in self.middle.vertices():
-                thickness = self.middle.vertex_attribute(key, "thickness")
-                if thickness is not None:
-                    thicknesses.append(thickness)
+            thicknesses = vertices_attribute_array(self.middle, "thickness", nan)
+            thicknesses = thicknesses[~isnan(thicknesses)]
 
-            if thicknesses:
-                return sum(thicknesses) / len(thicknesses)
+            if thicknesses.size:
+                return float(thicknesses.mean())
 
         return self._thickness
 
@@ -380,8 +385,9 @@ class MeshEnvelope(Envelope):
 
         # Update middle mesh if it exists
         if self.middle is not None:
-            for key in self.middle.vertices():
-                self.middle.vertex_attribute(key, "thickness", value)
+            self.middle.vertices_attribute("thickness", value)
+
+        self._interpolators = {}
 
     @property
     def is_parametric(self) -> bool:
@@ -426,19 +432,11 @@ class MeshEnvelope(Envelope):
         if self.middle is None:
             raise ValueError("Middle mesh is not available. Cannot compute volume.")
 
-        middle = self.middle
-        total_volume = 0.0
-
         # Use variable thickness from middle mesh vertices
-        for vertex in middle.vertices():
-            thickness = middle.vertex_attribute(vertex, "thickness")
-            if thickness is None:
-                thickness = self._thickness
-            vertex_area = middle.vertex_area(vertex)  # should be projected area
-            vertex_volume = thickness * vertex_area
-            total_volume += vertex_volume
+        thickness = vertices_attribute_array(self.middle, "thickness", self._thickness)
+        vertex_area = MeshGeometry.from_mesh(self.middle).vertex_areas()
 
-        return total_volume
+        return float(thickness.dot(vertex_area))
 
     def compute_selfweight(self) -> float:
         """Compute and returns the total selfweight of the structure based on the area and thickness in the data.
@@ -455,21 +453,7 @@ class MeshEnvelope(Envelope):
             else:
                 raise ValueError("Middle mesh is not available and cannot be interpolated.")
 
-        middle = self.middle
-        rho = self.rho
-        total_selfweight = 0.0
-
-        # Use variable thickness from middle mesh vertices
-        for vertex in middle.vertices():
-            thickness = middle.vertex_attribute(vertex, "thickness")
-            if thickness is None:
-                thickness = self._thickness
-            vertex_area = middle.vertex_area(vertex)
-            vertex_volume = thickness * vertex_area
-            vertex_weight = vertex_volume * rho
-            total_selfweight += vertex_weight
-
-        return total_selfweight
+        return self.volume * self.rho
 
     def compute_area(self) -> float:
         """Compute and returns the total selfweight of the structure based on the area and thickness in the data.
@@ -482,7 +466,7 @@ class MeshEnvelope(Envelope):
         if self.middle is None:
             raise ValueError("Middle mesh is not available. Cannot compute area.")
 
-        return self.middle.area()
+        return MeshGeometry.from_mesh(self.middle).area()
 
     # =============================================================================
     # Loads operations
@@ -493,7 +477,7 @@ class MeshEnvelope(Envelope):
 
         Parameters
         ----------
-        formdiagram : FormDiagram
+        formdiagram : FormDiagram | CompactFormDiagram
             The form diagram to apply selfweight to.
         normalize : bool, optional
             Whether or not normalize the selfweight to match the computed total selfweight, by default True
@@ -511,41 +495,14 @@ class MeshEnvelope(Envelope):
             else:
                 raise ValueError("Middle mesh is not set. Please set the middle mesh before applying selfweight.")
 
-        # Step 2: Compute the selfweight of the shell
-        total_selfweight = self.compute_selfweight()
-
-        # Step 3: Sync thickness to the form diagram
+        # Step 2: Sync thickness to the form diagram
         self.sync_thickness_to_formdiagram(formdiagram)
+        thickness = asarray(formdiagram.vertices_attribute("thickness"), dtype=float64)
 
-        # Step 4: Copy the form diagram and project it onto the middle mesh vertically
-        form_ = formdiagram.copy()
-        project_mesh_to_target_vertical(form_, self.middle)
-
-        # Step 5: Compute and lump selfweight at vertices
-        total_pz = 0.0
-        for vertex in form_.vertices():
-            # Get vertex area and thickness
-            vertex_area = form_.vertex_area(vertex)
-            thickness = form_.vertex_attribute(vertex, "thickness")
-
-            # Compute selfweight contribution (negative for downward direction)
-            pz = -vertex_area * thickness * self.rho
-
-            # Store in form diagram
-            formdiagram.vertex_attribute(vertex, "pz", pz)
-            total_pz += abs(pz)  # Sum absolute values for normalization
-
-        # Step 6: Scale to match total selfweight if normalize=True
-        if normalize and total_pz > 0:
-            scale_factor = total_selfweight / total_pz
-            if scale_factor != 1.0:
-                print(f"Scaled selfweight by factor: {scale_factor:.3f}")
-
-            for vertex in formdiagram.vertices():
-                pz = formdiagram.vertex_attribute(vertex, "pz")
-                formdiagram.vertex_attribute(vertex, "pz", pz * scale_factor)
-
-        print(f"Selfweight applied to form diagram. Total load: {sum(abs(formdiagram.vertex_attribute(vertex, 'pz')) for vertex in formdiagram.vertices()):.1f}")
+        # Step 3: Lift the form diagram onto the middle mesh and lump the selfweight at the vertices
+        z, _ = self.interpolator("middle")(vertices_xy_array(formdiagram))
+        total = self.selfweight if normalize else None
+        apply_lumped_selfweight(formdiagram, z, thickness, self.rho, total)
 
     def apply_fill_weight_to_formdiagram(self, formdiagram: FormDiagram) -> None:
         """Apply fill weight to the nodes of a form diagram based on the fill surface and local thicknesses."""
@@ -597,10 +554,11 @@ class MeshEnvelope(Envelope):
 
         This method projects the form diagram onto both intrados and extrados surfaces
         and assigns the heights to 'ub' (upper bound) and 'lb' (lower bound) properties.
+        Vertices outside of the surfaces get ``nan`` bounds.
 
         Parameters
         ----------
-        formdiagram : FormDiagram
+        formdiagram : FormDiagram | CompactFormDiagram
             The form diagram to apply bounds to.
 
         Returns
@@ -612,29 +570,14 @@ class MeshEnvelope(Envelope):
         if self.intrados is None or self.extrados is None:
             raise ValueError("Intra/Extrados not set. Please set them before applying bounds.")
 
-        # Step 2: Copy the form diagram for projection
-        form_ub = formdiagram.copy()  # For upper bound (extrados)
-        form_lb = formdiagram.copy()  # For lower bound (intrados)
-
-        # Step 3: Project form diagram onto extrados (upper bound)
-        project_mesh_to_target_vertical(form_ub, self.extrados)
-        project_mesh_to_target_vertical(form_lb, self.intrados)
-
-        # Step 4: Collect heights and assign to form diagram
-        for vertex in formdiagram.vertices():
-            if vertex in form_ub.vertices() and vertex in form_lb.vertices():
-                # Get z coordinates from projected meshes
-                _, _, z_ub = form_ub.vertex_coordinates(vertex)
-                _, _, z_lb = form_lb.vertex_coordinates(vertex)
+        # Step 2: Interpolate the heights of both surfaces at the vertices
+        xy = vertices_xy_array(formdiagram)
+        z_ub, _ = self.interpolator("extrados")(xy)
+        z_lb, _ = self.interpolator("intrados")(xy)
 
-                # Assign to form diagram
-                formdiagram.vertex_attribute(vertex, "ub", z_ub)
-                formdiagram.vertex_attribute(vertex, "lb", z_lb)
-            else:
-                print(f"Warning: Vertex {vertex} not found in projected meshes")
-                # Set default values if vertex not found
-                formdiagram.vertex_attribute(vertex, "ub", float("inf"))
-                formdiagram.vertex_attribute(vertex, "lb", float("-inf"))
+        # Step 3: Assign to form diagram
+        set_vertices_attribute_array(formdiagram, "ub", z_ub)
+        set_vertices_attribute_array(formdiagram, "lb", z_lb)
 
     def apply_target_heights_to_formdiagram(self, formdiagram: FormDiagram) -> None:
         """Apply target heights to a form diagram based on the Envelope middle surface.
@@ -645,16 +588,8 @@ class MeshEnvelope(Envelope):
         if self.middle is None:
             raise ValueError("Middle mesh is not set. Please set the middle mesh before applying target heights.")
 
-        # Step 1: Copy the form diagram for projection
-        form_target = formdiagram.copy()  # For upper bound (extrados)
-
-        project_mesh_to_target_vertical(form_target, self.middle)
-
-        # Step 2: Collect heights and assign to form diagram
-        for vertex in formdiagram.vertices():
-            if vertex in form_target.vertices():
-                z_target = form_target.vertex_attribute(vertex, "z")
-                formdiagram.vertex_attribute(vertex, "target", z_target)
+        z_target, _ = self.interpolator("middle")(vertices_xy_array(formdiagram))
+        set_vertices_attribute_array(formdiagram, "target", z_target)
 
     def apply_reaction_bounds_to_formdiagram(self, formdiagram: FormDiagram) -> None:
         """Apply reaction bounds to a form diagram based on the Envelope middle surface.
@@ -676,49 +611,110 @@ class MeshEnvelope(Envelope):
         even when the middle mesh and form diagram have different topologies.
 
         Parameters
-        -------
-        formdiagram : FormDiagram
+        ----------
+        formdiagram : FormDiagram | CompactFormDiagram
             The form diagram to sync thickness to.
+        method : {"linear", "nearest", "cubic"}, optional
+            The interpolation method of :class:`compas_tna.loads.ScatteredInterpolator`.
+            Default is ``"linear"``.
+        extrapolate : bool, optional
+            If True, the vertices outside of the middle mesh get the thickness of the nearest vertex of the mesh.
+            Otherwise, they get the thickness of the envelope.
+            Default is True.
         """
         if self.middle is None:
             raise ValueError("Middle mesh must be set to sync thickness.")
 
-        # Get middle mesh XY coordinates and thickness values
-        middle_xy = self.middle.vertices_attributes("xy")
-        middle_thickness = self.middle.vertices_attribute("thickness")
-
-        # Validate data
-        if not middle_xy or not middle_thickness:
+        middle_xy = asarray(self.middle.vertices_attributes("xy"), dtype=float64).reshape((-1, 2))
+        middle_thickness = vertices_attribute_array(self.middle, "thickness", nan)
+        if not middle_xy.shape[0] or isnan(middle_thickness).all():
             raise ValueError("Middle mesh must have both 'xy' and 'thickness' attributes.")
 
-        # Convert to numpy arrays
-        middle_xy_array = asarray(middle_xy)
-        middle_thickness_array = asarray(middle_thickness)
+        # The triangulation of the middle mesh is reused as long as its vertices don't move
+        thickness = scattered_interpolator(middle_xy)(
+            middle_thickness,
+            vertices_xy_array(formdiagram),
+            method=method,
+            extrapolate=extrapolate,
+            fill_value=self._thickness,
+        )
 
-        # Get form diagram XY coordinates
-        form_xy = formdiagram.vertices_attributes("xy")
-        if not form_xy:
-            raise ValueError("Form diagram must have 'xy' attributes.")
+        # Ensure thickness is positive and reasonable
+        thickness[~(thickness > 0)] = self._thickness
+        set_vertices_attribute_array(formdiagram, "thickness", thickness)
 
-        form_xy_array = asarray(form_xy)
+    def interpolator(self, name: str) -> LinearInterpolator:
+        """Get the cached piecewise-linear interpolator of the heights of one of the surfaces of the envelope.
 
-        # Use griddata for 2D interpolation
-        interpolated_thickness = griddata(
-            middle_xy_array,
-            middle_thickness_array,
-            form_xy_array,
-            method=method,
-            fill_value=self._thickness,  # Use default thickness for points outside convex hull
-            # extrapolate=extrapolate
-        )
+        Parameters
+        ----------
+        name : {"intrados", "extrados", "middle"}
+            The name of the surface.
 
-        # Assign interpolated thickness values to form diagram vertices
-        for i, vertex in enumerate(formdiagram.vertices()):
-            thickness_value = float(interpolated_thickness[i])
-            # Ensure thickness is positive and reasonable
-            if thickness_value <= 0 or math.isnan(thickness_value):
-                thickness_value = self._thickness
-            formdiagram.vertex_attribute(vertex, "thickness", thickness_value)
+        Returns
+        -------
+        :class:`LinearInterpolator`
+
+        """
+        mesh = getattr(self, name)
+        if mesh is None:
+            raise ValueError(f"The {name} mesh is not set.")
+        cached = self._interpolators.get(name)
+        if cached is None or cached[0] is not mesh:
+            xyz = asarray(mesh.vertices_attributes("xyz"), dtype=float64)
+            triangulation = scattered_interpolator(xyz[:, :2]).triangulation
+            cached = self._interpolators[name] = (mesh, LinearInterpolator(xyz[:, :2], xyz[:, 2], triangulation))
+        return cached[1]
+
+    def bounds_and_jacobian(self, x, y, thickness=None):
+        """Compute the upper and lower bounds of the envelope at a set of points, and their derivatives.
+
+        The bounds are interpolated linearly on the triangulations of the extrados and the intrados,
+        as in :meth:`apply_bounds_to_formdiagram`.
+        A change of thickness scales the distance of both bounds to the surface halfway between them.
+
+        Parameters
+        ----------
+        x : ndarray (n,)
+            The x-coordinates of the points.
+        y : ndarray (n,)
+            The y-coordinates of the points.
+        thickness : float, optional
+            The (average) thickness of the envelope at which the bounds are evaluated.
+            Default is ``None``, in which case the bounds of the intrados and extrados are returned.
+
+        Returns
+        -------
+        tuple[ndarray, ndarray, ndarray, ndarray, ndarray, ndarray]
+            The upper bounds ``ub`` (n,), the lower bounds ``lb`` (n,),
+            their derivatives with respect to the thickness ``dubdt`` (n,) and ``dlbdt`` (n,),
+            and their derivatives with respect to the coordinates ``dubdxy`` (n x 2) and ``dlbdxy`` (n x 2).
+            The bounds outside the projection of the meshes are ``nan``.
+
+        """
+        if self.intrados is None or self.extrados is None:
+            raise ValueError("Intra/Extrados not set. Please set them before computing bounds.")
+
+        xy = asarray([asarray(x, dtype=float64).ravel(), asarray(y, dtype=float64).ravel()]).T
+        ub, dubdxy = self.interpolator("extrados")(xy)
+        lb, dlbdxy = self.interpolator("intrados")(xy)
+
+        t0 = self.thickness
+        half = (ub - lb) / 2
+        dhalf = (dubdxy - dlbdxy) / 2
+        dubdt = half / t0
+        dlbdt = -dubdt
+
+        if thickness is not None and thickness != t0:
+            scale = thickness / t0
+            middle = (ub + lb) / 2
+            dmiddle = (dubdxy + dlbdxy) / 2
+            ub = middle + scale * half
+            lb = middle - scale * half
+            dubdxy = dmiddle + scale * dhalf
+            dlbdxy = dmiddle - scale * dhalf
+
+        return ub, lb, dubdt, dlbdt, dubdxy, dlbdxy
 
     def compute_middle(self, x, y):
         raise NotImplementedError("Implement compute_middle for specific envelope type.")
@@ -0,0 +1,345 @@
+import gc
+from contextlib import contextmanager
+from copy import deepcopy
+from itertools import chain
+from typing import Optional
+
+import numpy
+import numpy.typing as npt
+
+from compas.datastructures import Mesh
+from compas_tna.loads import tributary_areas
+
+
+class MeshGeometry:
+    """Vectorized geometry of a mesh with a fixed topology.
+
+    The topology of the mesh is collected once, as arrays of the corners of the faces,
+    such that the areas and normals of the faces and vertices can be computed for any coordinates of the vertices
+    without looping over the mesh.
+    The results are the same as those of :meth:`Mesh.face_area`, :meth:`Mesh.face_normal`,
+    :meth:`Mesh.vertex_area` and :meth:`Mesh.vertex_normal`.
+
+    Parameters
+    ----------
+    xyz : array-like (n x 3)
+        The coordinates of the vertices.
+    corners : array-like (c,)
+        The vertex indices of the corners of all faces, face after face.
+    sizes : array-like (f,)
+        The number of corners of every face.
+
+    Attributes
+    ----------
+    xyz : ndarray (n x 3)
+        The coordinates of the vertices.
+    corners : ndarray (c,)
+        The vertex of every corner of every face.
+    corner_face : ndarray (c,)
+        The face of every corner.
+    corner_next : ndarray (c,)
+        The vertex following the vertex of every corner in its face.
+    corner_prev : ndarray (c,)
+        The vertex preceding the vertex of every corner in its face.
+
+    Examples
+    --------
+    >>> geometry = MeshGeometry.from_mesh(mesh)
+    >>> areas = geometry.vertex_areas()
+    >>> normals = geometry.vertex_normals()
+
+    """
+
+    def __init__(self, xyz: npt.ArrayLike, corners: npt.ArrayLike, sizes: npt.ArrayLike):
+        self.xyz = numpy.asarray(xyz, dtype=numpy.float64)
+        self.corners = numpy.asarray(corners, dtype=numpy.int64)
+        self.face_sizes = numpy.asarray(sizes, dtype=numpy.int64)
+        self.face_starts = numpy.zeros(self.face_sizes.shape[0], dtype=numpy.int64)
+        numpy.cumsum(self.face_sizes[:-1], out=self.face_starts[1:])
+        self.corner_face = numpy.repeat(numpy.arange(self.face_sizes.shape[0]), self.face_sizes)
+        start = self.face_starts[self.corner_face]
+        size = self.face_sizes[self.corner_face]
+        position = numpy.arange(self.corners.shape[0]) - start
+        self.corner_next = self.corners[start + (position + 1) % size]
+        self.corner_prev = self.corners[start + (position - 1) % size]
+
+    @classmethod
+    def from_vertices_and_faces(cls, xyz: npt.ArrayLike, faces: list[list[int]]) -> "MeshGeometry":
+        """Construct the geometry from the coordinates of the vertices and the vertex indices of the faces.
+
+        Parameters
+        ----------
+        xyz : array-like (n x 3)
+            The coordinates of the vertices.
+        faces : list[list[int]]
+            The vertex indices of the faces.
+
+        Returns
+        -------
+        :class:`MeshGeometry`
+
+        """
+        sizes = numpy.fromiter((len(face) for face in faces), dtype=numpy.int64, count=len(faces))
+        corners = numpy.fromiter(chain.from_iterable(faces), dtype=numpy.int64, count=int(sizes.sum()))
+        return cls(xyz, corners, sizes)
+
+    @classmethod
+    def from_mesh(cls, mesh: Mesh) -> "MeshGeometry":
+        """Collect the topology and the coordinates of a mesh.
+
+        The vertices and faces are numbered in the order of :meth:`Mesh.vertices` and :meth:`Mesh.faces`.
+
+        Parameters
+        ----------
+        mesh : :class:`Mesh`
+
+        Returns
+        -------
+        :class:`MeshGeometry`
+
+        """
+        n = mesh.number_of_vertices()
+        f = mesh.number_of_faces()
+        keys = numpy.fromiter(mesh.vertices(), dtype=numpy.int64, count=n)
+        sizes = numpy.fromiter((len(vertices) for vertices in mesh.face.values()), dtype=numpy.int64, count=f)
+        corners = numpy.fromiter(chain.from_iterable(mesh.face.values()), dtype=numpy.int64, count=int(sizes.sum()))
+        if not numpy.array_equal(keys, numpy.arange(n)):
+            # map the vertex keys to their indices
+            order = numpy.argsort(keys)
+            corners = order[numpy.searchsorted(keys, corners, sorter=order)]
+        x, y, z = (mesh.default_vertex_attributes.get(name, 0.0) for name in "xyz")
+        xyz = numpy.fromiter(chain.from_iterable((attr.get("x", x), attr.get("y", y), attr.get("z", z)) for attr in mesh.vertex.values()), dtype=numpy.float64, count=3 * n)
+        return cls(xyz.reshape((n, 3)), corners, sizes)
+
+    @property
+    def number_of_vertices(self) -> int:
+        return self.xyz.shape[0]
+
+    @property
+    def number_of_faces(self) -> int:
+        return self.face_sizes.shape[0]
+
+    def _xyz(self, xyz: Optional[npt.ArrayLike]) -> npt.NDArray:
+        return self.xyz if xyz is None else numpy.asarray(xyz, dtype=numpy.float64)
+
+    def _scatter(self, index: npt.NDArray, values: npt.NDArray, n: int) -> npt.NDArray:
+        # the sums of the rows of values with the same index
+        if values.ndim == 1:
+            return numpy.bincount(index, weights=values, minlength=n)
+        return numpy.stack([numpy.bincount(index, weights=values[:, i], minlength=n) for i in range(values.shape[1])], axis=1)
+
+    # --------------------------------------------------------------------------
+    # faces
+    # --------------------------------------------------------------------------
+
+    def face_centroids(self, xyz: Optional[npt.ArrayLike] = None) -> npt.NDArray:
+        """Compute the centroids of the vertices of the faces.
+
+        Parameters
+        ----------
+        xyz : array-like (n x 3), optional
+            The coordinates of the vertices.
+            Default is ``None``, in which case the stored coordinates are used.
+
+        Returns
+        -------
+        ndarray (f x 3)
+
+        """
+        xyz = self._xyz(xyz)
+        return self._scatter(self.corner_face, xyz[self.corners], self.number_of_faces) / self.face_sizes[:, None]
+
+    def _fan(self, xyz: npt.NDArray, centroids: Optional[npt.NDArray] = None) -> npt.NDArray:
+        # the area vectors of the triangles of the fans of the faces around their centroids
+        if centroids is None:
+            centroids = self.face_centroids(xyz)
+        o = centroids[self.corner_face]
+        return 0.5 * numpy.cross(xyz[self.corner_prev] - o, xyz[self.corners] - o)
+
+    def face_normals(self, xyz: Optional[npt.ArrayLike] = None, unitized: bool = True) -> npt.NDArray:
+        """Compute the normals of the faces.
+
+        Parameters
+        ----------
+        xyz : array-like (n x 3), optional
+            The coordinates of the vertices.
+            Default is ``None``, in which case the stored coordinates are used.
+        unitized : bool, optional
+            If True, the normals are unitized.
+            Otherwise, their lengths are the areas of the (planar) faces.
+            Default is True.
+
+        Returns
+        -------
+        ndarray (f x 3)
+
+        """
+        xyz = self._xyz(xyz)
+        normals = self._scatter(self.corner_face, self._fan(xyz), self.number_of_faces)
+        if unitized:
+            lengths = numpy.linalg.norm(normals, axis=1, keepdims=True)
+            normals = numpy.divide(normals, lengths, out=numpy.zeros_like(normals), where=lengths > 0)
+        return normals
+
+    def face_areas(self, xyz: Optional[npt.ArrayLike] = None) -> npt.NDArray:
+        """Compute the areas of the faces.
+
+        Parameters
+        ----------
+        xyz : array-like (n x 3), optional
+            The coordinates of the vertices.
+            Default is ``None``, in which case the stored coordinates are used.
+
+        Returns
+        -------
+        ndarray (f,)
+
+        """
+        xyz = self._xyz(xyz)
+        fan = self._fan(xyz)
+        # as in area_polygon, the triangles of the fan facing away from the first one are subtracted
+        first = fan[self.face_starts][self.corner_face]
+        sign = numpy.where((fan * first).sum(axis=1) > 0, 1.0, -1.0)
+        sign[self.face_starts] = 1.0
+        areas = self._scatter(self.corner_face, sign * numpy.linalg.norm(fan, axis=1), self.number_of_faces)
+        return numpy.abs(areas)
+
+    # --------------------------------------------------------------------------
+    # vertices
+    # --------------------------------------------------------------------------
+
+    def vertex_areas(self, xyz: Optional[npt.ArrayLike] = None, faces: Optional[npt.NDArray] = None) -> npt.NDArray:
+        """Compute the tributary areas of the vertices.
+
+        Parameters
+        ----------
+        xyz : array-like (n x 3), optional
+            The coordinates of the vertices.
+            Default is ``None``, in which case the stored coordinates are used.
+        faces : ndarray (f,), optional
+            A boolean mask of the faces that contribute to the tributary areas.
+            Default is ``None``, in which case all faces contribute.
+
+        Returns
+        -------
+        ndarray (n,)
+
+        """
+        indptr = numpy.append(self.face_starts, self.corners.shape[0])
+        return tributary_areas(self._xyz(xyz), indptr, self.corners, faces)
+
+    def vertex_normals(self, xyz: Optional[npt.ArrayLike] = None) -> npt.NDArray:
+        """Compute the normals of the vertices, as the normalized sum of the area-weighted normals of the faces around them.
+
+        Parameters
+        ----------
+        xyz : array-like (n x 3), optional
+            The coordinates of the vertices.
+            Default is ``None``, in which case the stored coordinates are used.
+
+        Returns
+        -------
+        ndarray (n x 3)
+
+        """
+        normals = self.face_normals(xyz, unitized=False)
+        normals = self._scatter(self.corners, normals[self.corner_face], self.number_of_vertices)
+        lengths = numpy.linalg.norm(normals, axis=1, keepdims=True)
+        return numpy.divide(normals, lengths, out=numpy.zeros_like(normals), where=lengths > 0)
+
+    def area(self, xyz: Optional[npt.ArrayLike] = None) -> float:
+        """Compute the total area of the faces.
+
+        Parameters
+        ----------
+        xyz : array-like (n x 3), optional
+            The coordinates of the vertices.
+            Default is ``None``, in which case the stored coordinates are used.
+
+        Returns
+        -------
+        float
+
+        """
+        return float(self.face_areas(xyz).sum())
+
+
+@contextmanager
+def _gc_paused():
+    # the cyclic garbage collector repeatedly scans all objects while many containers are allocated,
+    # which is wasted on the acyclic dictionaries and lists of a mesh
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def copy_mesh(mesh: Mesh, xyz: Optional[npt.ArrayLike] = None, cls: Optional[type] = None) -> Mesh:
+    """Make an independent copy of a mesh, optionally with other coordinates of the vertices.
+
+    Unlike :meth:`Mesh.copy`, which serializes the mesh and rebuilds it vertex by vertex and face by face,
+    the dictionaries of the mesh are copied directly, with the cyclic garbage collector paused.
+    The attribute dictionaries are independent, but mutable attribute values are shared with the original.
+
+    Parameters
+    ----------
+    mesh : :class:`Mesh`
+        The mesh.
+    xyz : array-like (n x 3), optional
+        The coordinates of the vertices of the copy, in the order of :meth:`Mesh.vertices`.
+        Default is ``None``, in which case the coordinates are copied.
+    cls : type, optional
+        The type of the copy, for example :class:`Mesh` for a plain copy of a form diagram.
+        Default is ``None``, in which case the copy has the same type as the mesh.
+
+    Returns
+    -------
+    :class:`Mesh`
+
+    """
+    copy = (cls or type(mesh))(
+        default_vertex_attributes=mesh.default_vertex_attributes,
+        default_edge_attributes=mesh.default_edge_attributes,
+        default_face_attributes=mesh.default_face_attributes,
+        name=mesh.name,
+    )
+    copy.attributes.update(deepcopy(mesh.attributes))
+    with _gc_paused():
+        if xyz is None:
+            copy.vertex = {key: dict(attr) for key, attr in mesh.vertex.items()}
+        else:
+            points = numpy.asarray(xyz, dtype=numpy.float64).tolist()
+            copy.vertex = {key: dict(attr, x=x, y=y, z=z) for (key, attr), (x, y, z) in zip(mesh.vertex.items(), points)}
+        copy.halfedge = {key: dict(nbrs) for key, nbrs in mesh.halfedge.items()}
+        copy.face = {key: list(vertices) for key, vertices in mesh.face.items()}
+        copy.facedata = {key: dict(attr) for key, attr in mesh.facedata.items()}
+        copy.edgedata = {key: dict(attr) for key, attr in mesh.edgedata.items()}
+    copy._max_vertex = mesh._max_vertex
+    copy._max_face = mesh._max_face
+    return copy
+
+
+def vertices_attribute_array(mesh: Mesh, name: str, default: float) -> npt.NDArray:
+    """Collect a numerical vertex attribute of a mesh as an array, replacing missing values by a default.
+
+    Parameters
+    ----------
+    mesh : :class:`Mesh`
+        The mesh.
+    name : str
+        The name of the attribute.
+    default : float
+        The value of the vertices without a value of the attribute.
+
+    Returns
+    -------
+    ndarray (n,)
+
+    """
+    values = mesh.vertices_attribute(name)
+    if values is None:
+        return numpy.full(mesh.number_of_vertices(), default, dtype=numpy.float64)
+    return numpy.array([default if value is None else value for value in values], dtype=numpy.float64)
@@ -1,18 +1,67 @@
+from typing import Optional
+
 import numpy as np
+import numpy.typing as npt
 
+from compas.datastructures import Mesh
 from compas_tna.diagrams import FormDiagram
 from compas_tna.envelope import Envelope
+from compas_tna.envelope.envelope import apply_lumped_selfweight
+from compas_tna.envelope.envelope import set_vertices_attribute_array
+from compas_tna.envelope.envelope import vertices_xy_array
+from compas_tna.envelope.meshgeometry import MeshGeometry
+
+
+def surface_mesh(xyz: npt.ArrayLike, faces: list[list[int]], thickness: float) -> Mesh:
+    """Construct the mesh of a surface of a parametric envelope.
+
+    Parameters
+    ----------
+    xyz : array-like (n x 3)
+        The coordinates of the vertices.
+    faces : list[list[int]]
+        The vertex indices of the faces.
+    thickness : float
+        The thickness of the envelope, stored as default vertex attribute.
+
+    Returns
+    -------
+    :class:`Mesh`
+
+    """
+    mesh = Mesh.from_vertices_and_faces(xyz, faces)
+    mesh.update_default_vertex_attributes(thickness=thickness)
+    return mesh
 
 
 class ParametricEnvelope(Envelope):
-    """Pure geometric envelope representing masonry structure boundaries created parametrically."""
+    """Pure geometric envelope representing masonry structure boundaries created parametrically.
+
+    The surfaces of the envelope are generated on first access,
+    and discarded when one of the :attr:`surface_parameters` is set.
+    Envelopes that are only used through the analytic functions, such as :meth:`compute_bounds`, never generate them.
+    """
+
+    # the parameters from which the surfaces are generated
+    surface_parameters: tuple[str, ...] = ("thickness",)
 
     def __init__(self, thickness: float = 0.50, **kwargs):
+        # the surfaces share the faces of one base topology
+        # and are only converted to meshes when they are accessed
+        self._faces = None
+        self._surfaces = {}
+        self._meshes = {}
+
         super().__init__(**kwargs)
 
         self.is_parametric = True
         self._thickness = thickness
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self.surface_parameters:
+            self.invalidate_surfaces()
+
     def __str__(self):
         return f"ParametricEnvelope(name={self.name})"
 
@@ -48,6 +97,33 @@ class ParametricEnvelope(Envelope):
         """
         self._thickness = value
 
+    @property
+    def intrados(self) -> Optional[Mesh]:
+        """The intrados surface of the envelope, constructed on first access."""
+        return self._surface_mesh("intrados")
+
+    @intrados.setter
+    def intrados(self, mesh: Optional[Mesh]) -> None:
+        self._set_surface_mesh("intrados", mesh)
+
+    @property
+    def extrados(self) -> Optional[Mesh]:
+        """The extrados surface of the envelope, constructed on first access."""
+        return self._surface_mesh("extrados")
+
+    @extrados.setter
+    def extrados(self, mesh: Optional[Mesh]) -> None:
+        self._set_surface_mesh("extrados", mesh)
+
+    @property
+    def middle(self) -> Optional[Mesh]:
+        """The middle surface of the envelope, constructed on first access."""
+        return self._surface_mesh("middle")
+
+    @middle.setter
+    def middle(self, mesh: Optional[Mesh]) -> None:
+        self._set_surface_mesh("middle", mesh)
+
     # =============================================================================
     # Envelope Generator
     # =============================================================================
@@ -57,6 +133,93 @@ class ParametricEnvelope(Envelope):
 
         raise NotImplementedError("Implement update_envelope for specific envelope type.")
 
+    def invalidate_surfaces(self) -> None:
+        """Discard the surfaces of the envelope, such that they are generated again on their next access.
+
+        This is done automatically when one of the :attr:`surface_parameters` is set,
+        but not when a mutable parameter is modified in place.
+
+        Returns
+        -------
+        None
+
+        """
+        self._faces = None
+        self._surfaces = {}
+        self._meshes = {}
+        self.invalidate("surfaces")
+
+    def _ensure_surfaces(self) -> None:
+        # generate the surfaces that were not assigned, and keep the assigned ones
+        if self._faces is None and any(name not in self._meshes for name in ("intrados", "extrados", "middle")):
+            assigned = self._meshes
+            self.update_envelope()
+            for name, mesh in assigned.items():
+                self._set_surface_mesh(name, mesh)
+
+    def set_surfaces(self, faces: list[list[int]], intrados: npt.ArrayLike, extrados: npt.ArrayLike, middle: npt.ArrayLike) -> None:
+        """Store the surfaces of the envelope as the coordinates of the vertices of one shared base topology.
+
+        The meshes of the surfaces are constructed when they are first accessed,
+        through :attr:`intrados`, :attr:`extrados` and :attr:`middle`.
+
+        Parameters
+        ----------
+        faces : list[list[int]]
+            The vertex indices of the faces of the base topology.
+        intrados : array-like (n x 3)
+            The coordinates of the vertices of the intrados.
+        extrados : array-like (n x 3)
+            The coordinates of the vertices of the extrados.
+        middle : array-like (n x 3)
+            The coordinates of the vertices of the middle surface.
+
+        Returns
+        -------
+        None
+
+        """
+        self._faces = faces
+        self._surfaces = {
+            "intrados": np.asarray(intrados, dtype=float),
+            "extrados": np.asarray(extrados, dtype=float),
+            "middle": np.asarray(middle, dtype=float),
+        }
+        self._meshes = {}
+        self.invalidate("surfaces")
+
+    def surface_geometry(self, name: str) -> Optional[MeshGeometry]:
+        """Get the vectorized geometry of a surface of the envelope, without constructing its mesh.
+
+        Parameters
+        ----------
+        name : {"intrados", "extrados", "middle"}
+            The name of the surface.
+
+        Returns
+        -------
+        :class:`MeshGeometry` | None
+            The geometry of the surface, or None if the surface is not available.
+
+        """
+        self._ensure_surfaces()
+        if name in self._surfaces:
+            return MeshGeometry.from_vertices_and_faces(self._surfaces[name], self._faces)
+        mesh = self._meshes.get(name)
+        if mesh is None:
+            return None
+        return MeshGeometry.from_mesh(mesh)
+
+    def _surface_mesh(self, name: str) -> Optional[Mesh]:
+        self._ensure_surfaces()
+        if name not in self._meshes and name in self._surfaces:
+            self._meshes[name] = surface_mesh(self._surfaces[name], self._faces, self.thickness)
+        return self._meshes.get(name)
+
+    def _set_surface_mesh(self, name: str, mesh: Optional[Mesh]) -> None:
+        self._surfaces.pop(name, None)
+        self._meshes[name] = mesh
+
     # =============================================================================
     # Geometry operations
     # =============================================================================
@@ -70,10 +233,7 @@ class ParametricEnvelope(Envelope):
             The total volume of the structure.
 
         """
-        if self.middle is None:
-            self.update_envelope()
-
-        return self.compute_area() * self.thickness
+        return self.area * self.thickness
 
     def compute_selfweight(self) -> float:
         """Compute and returns the total selfweight of the structure based on the area and thickness in the data.
@@ -84,10 +244,7 @@ class ParametricEnvelope(Envelope):
             The total selfweight of the structure.
 
         """
-        if self.middle is None:
-            self.update_envelope()
-
-        return self.compute_volume() * self.rho
+        return self.volume * self.rho
 
     def compute_area(self) -> float:
         """Compute and returns the total selfweight of the structure based on the area and thickness in the data.
@@ -97,10 +254,7 @@ class ParametricEnvelope(Envelope):
         float
             The total selfweight of the structure.
         """
-        if self.middle is None:
-            self.update_envelope()
-
-        return self.middle.area()
+        return self.surface_geometry("middle").area()
 
     # =============================================================================
     # TNA-specific operations (accept formdiagram as parameter)
@@ -111,7 +265,7 @@ class ParametricEnvelope(Envelope):
 
         Parameters
         ----------
-        formdiagram : FormDiagram
+        formdiagram : FormDiagram | CompactFormDiagram
             The form diagram to apply selfweight to.
         normalize : bool, optional
             Whether or not normalize the selfweight to match the computed total selfweight, by default True
@@ -122,44 +276,17 @@ class ParametricEnvelope(Envelope):
             The FormDiagram is modified in place
 
         """
-        # Step 2: Compute the selfweight of the shell
-        total_selfweight = self.compute_selfweight()
-
-        # Step 3: Copy the form diagram and project it onto the middle mesh vertically
-        form_: FormDiagram = formdiagram.copy()
-
-        xy = np.array(form_.vertices_attributes("xy"))
-        zt = list(self.compute_middle(xy[:, 0], xy[:, 1]).flatten().tolist())
-        for i, key in enumerate(form_.vertices()):
-            form_.vertex_attribute(key, "z", zt[i])
-
-        # Step 4: Compute and lump selfweight at vertices
-        total_pz = 0.0
-        for vertex in form_.vertices():
-            vertex_area = form_.vertex_area(vertex)
-            thickness = self.thickness
-            pz = -vertex_area * thickness * self.rho
-            formdiagram.vertex_attribute(vertex, "pz", pz)
-            total_pz += abs(pz)
-
-        # Step 5: Scale to match total selfweight if normalize=True
-        if normalize and total_pz > 0:
-            scale_factor = total_selfweight / total_pz
-            if scale_factor != 1.0:
-                print(f"Scaled selfweight by factor: {scale_factor:.3f}")
-
-            for vertex in formdiagram.vertices():
-                pz = formdiagram.vertex_attribute(vertex, "pz")
-                formdiagram.vertex_attribute(vertex, "pz", pz * scale_factor)
-
-        print(f"Selfweight applied to form diagram. Total load: {sum(abs(formdiagram.vertex_attribute(vertex, 'pz')) for vertex in formdiagram.vertices()):.1f}")
+        xy = vertices_xy_array(formdiagram)
+        z = self.compute_middle(xy[:, 0], xy[:, 1])
+        total = self.selfweight if normalize else None
+        apply_lumped_selfweight(formdiagram, z, self.thickness, self.rho, total)
 
     def apply_bounds_to_formdiagram(self, formdiagram: FormDiagram) -> None:
         """Apply envelope bounds to a form diagram based on the intrados and extrados surfaces.
 
         Parameters
         ----------
-        formdiagram : FormDiagram
+        formdiagram : FormDiagram | CompactFormDiagram
             The form diagram to apply bounds to.
 
         Returns
@@ -168,19 +295,17 @@ class ParametricEnvelope(Envelope):
             The FormDiagram is modified in place.
         """
 
-        xy = np.array(formdiagram.vertices_attributes("xy"))
+        xy = vertices_xy_array(formdiagram)
         zub, zlb = self.compute_bounds(xy[:, 0], xy[:, 1])
-        for i, key in enumerate(formdiagram.vertices()):
-            formdiagram.vertex_attribute(key, "ub", float(zub[i]))
-            formdiagram.vertex_attribute(key, "lb", float(zlb[i]))
-        # TODO: Future Cached properties could be added here
+        set_vertices_attribute_array(formdiagram, "ub", zub)
+        set_vertices_attribute_array(formdiagram, "lb", zlb)
 
     def apply_target_heights_to_formdiagram(self, formdiagram: FormDiagram) -> None:
         """Apply target heights to a form diagram based on the Envelope middle surface.
 
         Parameters
         ----------
-        formdiagram : FormDiagram
+        formdiagram : FormDiagram | CompactFormDiagram
             The form diagram to apply target heights to.
 
         Returns
@@ -189,11 +314,9 @@ class ParametricEnvelope(Envelope):
             The FormDiagram is modified in place.
         """
 
-        xy = np.array(formdiagram.vertices_attributes("xy"))
-        zt = list(self.compute_middle(xy[:, 0], xy[:, 1]).flatten().tolist())
-        for i, key in enumerate(formdiagram.vertices()):
-            formdiagram.vertex_attribute(key, "z", zt[i])
-        # TODO: Future Cached properties could be added here
+        xy = vertices_xy_array(formdiagram)
+        zt = self.compute_middle(xy[:, 0], xy[:, 1])
+        set_vertices_attribute_array(formdiagram, "target", zt)
 
     def apply_reaction_bounds_to_formdiagram(self, formdiagram: FormDiagram) -> None:
         """Apply reaction bounds the supports of the form diagram based on the Envelope.
@@ -208,11 +331,12 @@ class ParametricEnvelope(Envelope):
         None
             The FormDiagram is modified in place.
         """
+        vertex_index = formdiagram.vertex_index()
         fixed: list[int] = list(formdiagram.vertices_where({"is_support": True}))
-        xy = np.array(formdiagram.vertices_attributes("xy"))
-        bound_react = self.compute_bound_react(xy[:, 0], xy[:, 1], self.thickness, fixed)
-        for i, key in enumerate(fixed):
-            formdiagram.vertex_attribute(key, "b", bound_react[i])
+        xy = vertices_xy_array(formdiagram)
+        bound_react = self.compute_bound_react(xy[:, 0], xy[:, 1], self.thickness, [vertex_index[key] for key in fixed])
+        for key, b in zip(fixed, np.asarray(bound_react, dtype=float).tolist()):
+            formdiagram.vertex_attribute(key, "b", b)
 
     def compute_middle(self, x, y):
         raise NotImplementedError("Implement compute_middle for specific envelope type.")
@@ -223,6 +347,9 @@ class ParametricEnvelope(Envelope):
     def compute_bounds_derivatives(self, x, y):
         raise NotImplementedError("Implement compute_bounds_derivatives for specific envelope type.")
 
+    def bounds_and_jacobian(self, x, y, thickness=None):
+        raise NotImplementedError("Implement bounds_and_jacobian for specific envelope type.")
+
     def compute_bound_react(self, x, y, thickness, fixed):
         raise NotImplementedError("Implement compute_bound_react for specific envelope type.")
 
@@ -1,12 +1,18 @@
 import math
 
+from numpy import arange
 from numpy import array
+from numpy import asarray
+from numpy import full
+from numpy import maximum
 from numpy import ones
+from numpy import sqrt
+from numpy import where
 from numpy import zeros
 
-from compas.datastructures import Mesh
 from compas_tna.diagrams.diagram_rectangular import create_cross_mesh
 from compas_tna.envelope.parametricenvelope import ParametricEnvelope
+from compas_tna.envelope.parametricenvelope import surface_mesh
 
 
 def pavillionvault_envelope(
@@ -43,32 +49,75 @@ def pavillionvault_envelope(
     middle : Mesh
         Middle mesh
     """
+    faces, xyzlb, xyzub, xyzt = pavillionvault_surfaces(x_span=x_span, y_span=y_span, thickness=thickness, min_lb=min_lb, n=n, spr_angle=spr_angle)
+
+    intrados = surface_mesh(xyzlb, faces, thickness)
+    extrados = surface_mesh(xyzub, faces, thickness)
+    middle = surface_mesh(xyzt, faces, thickness)
+
+    return intrados, extrados, middle
+
+
+def pavillionvault_surfaces(
+    x_span: tuple = (0.0, 10.0),
+    y_span: tuple = (0.0, 10.0),
+    thickness: float = 0.50,
+    min_lb: float = 0.0,
+    n: int = 100,
+    spr_angle: float = 0.0,
+):
+    """Create the surfaces of the envelope of a pavillion vault as coordinates over one shared base topology.
+
+    The extrados covers a larger span than the intrados and the middle surface.
+    Its vertices are those of the base topology, stretched over the larger span.
+
+    Parameters
+    ----------
+    x_span : tuple, optional
+        Span of the vault in x direction, by default (0.0, 10.0)
+    y_span : tuple, optional
+        Span of the vault in y direction, by default (0.0, 10.0)
+    thickness : float, optional
+        Thickness of the vault, by default 0.50
+    min_lb : float, optional
+        Parameter for lower bound in nodes in the boundary, by default 0.0
+    n : int, optional
+        Number of vertices for the mesh, by default 100
+    spr_angle : float, optional
+        Springing angle, by default 0.0
+
+    Returns
+    -------
+    faces : list[list[int]]
+        The vertex indices of the faces of the base topology.
+    intrados : ndarray (n x 3)
+        Coordinates of the vertices of the intrados
+    extrados : ndarray (n x 3)
+        Coordinates of the vertices of the extrados
+    middle : ndarray (n x 3)
+        Coordinates of the vertices of the middle surface
+    """
     # Create base topology
     base_topology = create_cross_mesh(x_span=x_span, y_span=y_span, n=n)
-    xyz0, faces_i = base_topology.to_vertices_and_faces()
+    xyz0, faces = base_topology.to_vertices_and_faces()
     xi, yi, _ = array(xyz0).transpose()
 
     # Create middle surface
     zt = pavillionvault_middle(xi, yi, x_span=x_span, y_span=y_span, spr_angle=spr_angle, tol=1e-6)
     xyzt = array([xi, yi, zt.flatten()]).transpose()
-    middle = Mesh.from_vertices_and_faces(xyzt, faces_i)
-    middle.update_default_vertex_attributes(thickness=thickness)
 
     # Create upper and lower bounds
     zub, zlb = pavillionvault_bounds(xi, yi, thickness, min_lb, x_span=x_span, y_span=y_span, spr_angle=spr_angle, tol=1e-6)
     xyzlb = array([xi, yi, zlb.flatten()]).transpose()
-    intrados = Mesh.from_vertices_and_faces(xyzlb, faces_i)
 
     x_span_extra = (x_span[0] - thickness / 2 / math.cos(math.radians(spr_angle)), x_span[1] + thickness / 2 / math.cos(math.radians(spr_angle)))
     y_span_extra = (y_span[0] - thickness / 2 / math.cos(math.radians(spr_angle)), y_span[1] + thickness / 2 / math.cos(math.radians(spr_angle)))
-    extra_topology = create_cross_mesh(x_span=x_span_extra, y_span=y_span_extra, n=n)
-    xyz0, faces_i = extra_topology.to_vertices_and_faces()
-    xi, yi, _ = array(xyz0).transpose()
-    zub, zlb = pavillionvault_bounds(xi, yi, thickness, min_lb, x_span=x_span, y_span=y_span, spr_angle=spr_angle, tol=1e-6)
-    xyzub = array([xi, yi, zub.flatten()]).transpose()
-    extrados = Mesh.from_vertices_and_faces(xyzub, faces_i)
+    xe = x_span_extra[0] + (xi - x_span[0]) * (x_span_extra[1] - x_span_extra[0]) / (x_span[1] - x_span[0])
+    ye = y_span_extra[0] + (yi - y_span[0]) * (y_span_extra[1] - y_span_extra[0]) / (y_span[1] - y_span[0])
+    zub, zlb = pavillionvault_bounds(xe, ye, thickness, min_lb, x_span=x_span, y_span=y_span, spr_angle=spr_angle, tol=1e-6)
+    xyzub = array([xe, ye, zub.flatten()]).transpose()
 
-    return intrados, extrados, middle
+    return faces, xyzlb, xyzub, xyzt
 
 
 def pavillionvault_middle(x, y, x_span=(0.0, 10.0), y_span=(0.0, 10.0), spr_angle=0.0, tol=1e-6):
@@ -303,6 +352,95 @@ def pavillionvault_bounds_derivatives(x, y, thk, min_lb, x_span=(0.0, 10.0), y_s
     return dub, dlb  # ub, lb
 
 
+def pavillionvault_bounds_jacobian(x, y, thk, min_lb, x_span=(0.0, 10.0), y_span=(0.0, 10.0), spr_angle=0.0, tol=1e-6):
+    """Compute the upper and lower bounds of a pavillion vault and their derivatives, for all points at once.
+
+    Parameters
+    ----------
+    x : array
+        x-coordinates of the points
+    y : array
+        y-coordinates of the points
+    thk : float
+        Thickness of the vault
+    min_lb : float
+        Parameter for lower bound in nodes in the boundary
+    x_span : tuple, optional
+        Span of the vault in x direction, by default (0.0, 10.0)
+    y_span : tuple, optional
+        Span of the vault in y direction, by default (0.0, 10.0)
+    spr_angle : float, optional
+        Springing angle, by default 0.0
+    tol : float, optional
+        Tolerance, by default 1e-6
+
+    Returns
+    -------
+    ub : array (n,)
+        Values of the upper bound in the points
+    lb : array (n,)
+        Values of the lower bound in the points
+    dubdt : array (n,)
+        Derivatives of the upper bound with respect to the thickness
+    dlbdt : array (n,)
+        Derivatives of the lower bound with respect to the thickness
+    dubdxy : array (n x 2)
+        Derivatives of the upper bound with respect to the x and y coordinates of the points
+    dlbdxy : array (n x 2)
+        Derivatives of the lower bound with respect to the x and y coordinates of the points
+    """
+
+    x = asarray(x, dtype=float).ravel()
+    y = asarray(y, dtype=float).ravel()
+    n = len(x)
+
+    x0, x1 = x_span
+    y0, y1 = y_span
+
+    if spr_angle == 0.0:
+        z_ = 0.0
+    else:
+        alpha = 1 / math.cos(math.radians(spr_angle))
+        z_ = (x1 - x0) / 2 * math.tan(math.radians(spr_angle))
+        L = x1 * alpha
+        Ldiff = L - x1
+        x0, x1 = -Ldiff / 2, x1 + Ldiff / 2
+        y0, y1 = -Ldiff / 2, y1 + Ldiff / 2
+
+    # the quadrants Q1 and Q3 are arches spanning in the y direction, Q2 and Q4 in the x direction
+    q1 = ((y - y0) <= y1 / x1 * (x - x0) + tol) & ((y - y0) <= (y1 - y0) - (x - x0) + tol)
+    q3 = ((y - y0) >= y1 / x1 * (x - x0) - tol) & ((y - y0) >= (y1 - y0) - (x - x0) - tol)
+    along_y = q1 | q3
+    axis = where(along_y, 1, 0)
+    u = where(along_y, y, x)
+    uc = where(along_y, (y0 + y1) / 2, (x0 + x1) / 2)
+    r = where(along_y, (y1 - y0) / 2, (x1 - x0) / 2)
+
+    lb = full(n, -min_lb, dtype=float)
+    dubdt = zeros(n)
+    dlbdt = zeros(n)
+    dubdxy = zeros((n, 2))
+    dlbdxy = zeros((n, 2))
+    rows = arange(n)
+
+    r_ub = r + thk / 2
+    s_ub = sqrt(maximum(r_ub**2 - (u - uc) ** 2, 0.0))
+    ub = s_ub - z_
+    extrados = s_ub > 0.0
+    dubdt[extrados] = 1 / 2 * r_ub[extrados] / s_ub[extrados]
+    dubdxy[rows[extrados], axis[extrados]] = -(u - uc)[extrados] / s_ub[extrados]
+
+    intrados_null = (y > y1 - thk / 2) | (x > x1 - thk / 2) | (x < x0 + thk / 2) | (y < y0 + thk / 2)
+    r_lb = r - thk / 2
+    s_lb = sqrt(maximum(r_lb**2 - (u - uc) ** 2, 0.0))
+    lb[~intrados_null] = s_lb[~intrados_null] - z_
+    intrados = ~intrados_null & (s_lb > 0.0)
+    dlbdt[intrados] = -1 / 2 * r_lb[intrados] / s_lb[intrados]
+    dlbdxy[rows[intrados], axis[intrados]] = -(u - uc)[intrados] / s_lb[intrados]
+
+    return ub, lb, dubdt, dlbdt, dubdxy, dlbdxy
+
+
 def pavillionvault_bound_react(x, y, thk, fixed, x_span=(0.0, 10.0), y_span=(0.0, 10.0)):
     """Computes the reaction bounds of a pavillion vault for a given thickness
 
@@ -390,6 +528,8 @@ def pavillionvault_bound_react_derivatives(x, y, thk, fixed, x_span=(0.0, 10.0),
 
 
 class PavillionVaultEnvelope(ParametricEnvelope):
+    surface_parameters = ("thickness", "x_span", "y_span", "min_lb", "n", "spr_angle")
+
     def __init__(
         self,
         x_span: tuple = (0.0, 10.0),
@@ -407,8 +547,6 @@ class PavillionVaultEnvelope(ParametricEnvelope):
         self.n = n
         self.spr_angle = spr_angle
 
-        self.update_envelope()  # Generate the intra/extra/middle meshes
-
     @property
     def __data__(self):
         data = super().__data__
@@ -423,12 +561,10 @@ class PavillionVaultEnvelope(ParametricEnvelope):
         return f"PavillionVaultEnvelope(name={self.name})"
 
     def update_envelope(self):
-        intrados, extrados, middle = pavillionvault_envelope(
+        faces, intrados, extrados, middle = pavillionvault_surfaces(
             x_span=self.x_span, y_span=self.y_span, thickness=self.thickness, min_lb=self.min_lb, n=self.n, spr_angle=self.spr_angle
         )
-        self.intrados = intrados
-        self.extrados = extrados
-        self.middle = middle
+        self.set_surfaces(faces, intrados, extrados, middle)
 
     def compute_middle(self, x, y):
         return pavillionvault_middle(x, y, x_span=self.x_span, y_span=self.y_span, spr_angle=self.spr_angle, tol=1e-6)
@@ -447,6 +583,11 @@ class PavillionVaultEnvelope(ParametricEnvelope):
             self.thickness = thickness
         return pavillionvault_bounds_derivatives(x, y, thickness, self.min_lb, x_span=self.x_span, y_span=self.y_span, tol=1e-6)
 
+    def bounds_and_jacobian(self, x, y, thickness=None):
+        if thickness is None:
+            thickness = self.thickness
+        return pavillionvault_bounds_jacobian(x, y, thickness, self.min_lb, x_span=self.x_span, y_span=self.y_span, spr_angle=self.spr_angle, tol=1e-6)
+
     def compute_bound_react(self, x, y, thickness=None, fixed=None):
         if thickness is None:
             thickness = self.thickness
@@ -1,12 +1,19 @@
 import math
 
+from numpy import abs as npabs
+from numpy import arange
 from numpy import array
+from numpy import asarray
+from numpy import full
 from numpy import ones
+from numpy import sign
+from numpy import sqrt
+from numpy import where
 from numpy import zeros
 
-from compas.datastructures import Mesh
 from compas_tna.diagrams.diagram_rectangular import create_cross_mesh
 from compas_tna.envelope.parametricenvelope import ParametricEnvelope
+from compas_tna.envelope.parametricenvelope import surface_mesh
 
 
 def pointedvault_envelope(
@@ -49,26 +56,72 @@ def pointedvault_envelope(
     envelope : Envelope
         The created envelope with intrados, extrados, and middle meshes.
     """
+    faces, xyzlb, xyzub, xyzt = pointedvault_surfaces(x_span=x_span, y_span=y_span, thickness=thickness, min_lb=min_lb, n=n, hc=hc, he=he, hm=hm)
+
+    intrados = surface_mesh(xyzlb, faces, thickness)
+    extrados = surface_mesh(xyzub, faces, thickness)
+    middle = surface_mesh(xyzt, faces, thickness)
+
+    return intrados, extrados, middle
+
+
+def pointedvault_surfaces(
+    x_span: tuple = (0.0, 10.0),
+    y_span: tuple = (0.0, 10.0),
+    thickness: float = 0.50,
+    min_lb: float = 0.0,
+    n: int = 100,
+    hc: float = 8.0,
+    he: list = None,
+    hm: list = None,
+):
+    """Create the surfaces of the envelope of a pointed cross vault as coordinates over one shared base topology.
+
+    Parameters
+    ----------
+    x_span : tuple, optional
+        Span of the vault in x direction, by default (0.0, 10.0)
+    y_span : tuple, optional
+        Span of the vault in y direction, by default (0.0, 10.0)
+    thickness : float, optional
+        Thickness of the vault, by default 0.50
+    min_lb : float, optional
+        Parameter for lower bound in nodes in the boundary, by default 0.0
+    n : int, optional
+        Number of vertices for the mesh, by default 100
+    hc : float, optional
+        Height in the middle point of the vault, by default 8.0
+    he : list, optional
+        Height of the opening mid-span for each of the quadrants, by default None
+    hm : list, optional
+        Height of each quadrant center (spadrel), by default None
+
+    Returns
+    -------
+    faces : list[list[int]]
+        The vertex indices of the faces of the base topology.
+    intrados : ndarray (n x 3)
+        Coordinates of the vertices of the intrados
+    extrados : ndarray (n x 3)
+        Coordinates of the vertices of the extrados
+    middle : ndarray (n x 3)
+        Coordinates of the vertices of the middle surface
+    """
     # Create base topology
     base_topology = create_cross_mesh(x_span=x_span, y_span=y_span, n=n)
-    xyz0, faces_i = base_topology.to_vertices_and_faces()
+    xyz0, faces = base_topology.to_vertices_and_faces()
     xi, yi, _ = array(xyz0).transpose()
 
     # Create middle surface
     zt = pointedvault_middle(xi, yi, min_lb, x_span=x_span, y_span=y_span, hc=hc, he=he, hm=hm, tol=1e-6)
     xyzt = array([xi, yi, zt.flatten()]).transpose()
-    middle = Mesh.from_vertices_and_faces(xyzt, faces_i)
-    middle.update_default_vertex_attributes(thickness=thickness)
 
     # Create upper and lower bounds
     zub, zlb = pointedvault_bounds(xi, yi, thickness, min_lb, x_span=x_span, y_span=y_span, hc=hc, he=he, hm=hm, tol=1e-6)
     xyzub = array([xi, yi, zub.flatten()]).transpose()
     xyzlb = array([xi, yi, zlb.flatten()]).transpose()
 
-    extrados = Mesh.from_vertices_and_faces(xyzub, faces_i)
-    intrados = Mesh.from_vertices_and_faces(xyzlb, faces_i)
-
-    return intrados, extrados, middle
+    return faces, xyzlb, xyzub, xyzt
 
 
 def pointedvault_middle(
@@ -499,6 +552,133 @@ def pointedvault_bounds_derivatives(
     return dub, dlb  # ub, lb
 
 
+def pointedvault_bounds_jacobian(
+    x,
+    y,
+    thk,
+    min_lb,
+    x_span=(0.0, 10.0),
+    y_span=(0.0, 10.0),
+    hc=8.0,
+    he=None,
+    hm=None,
+    tol=1e-6,
+):
+    """Compute the upper and lower bounds of a pointed vault and their derivatives, for all points at once.
+
+    Parameters
+    ----------
+    x : array
+        x-coordinates of the points
+    y : array
+        y-coordinates of the points
+    thk : float
+        Thickness of the arch
+    min_lb : float
+        Parameter for lower bound in nodes in the boundary
+    x_span : tuple, optional
+        Span of the vault in x direction, by default (0.0, 10.0)
+    y_span : tuple, optional
+        Span of the vault in y direction, by default (0.0, 10.0)
+    hc : float, optional
+        Height in the middle point of the vault, by default 8.0
+    he : [float, float, float, float], optional
+        Height of the opening mid-span for each of the quadrants, by default None
+    hm : [float, float, float, float], optional
+        Height of each quadrant center (spadrel), by default None
+    tol : float, optional
+        Tolerance, by default 1e-6
+
+    Returns
+    -------
+    ub : array (n,)
+        Values of the upper bound in the points
+    lb : array (n,)
+        Values of the lower bound in the points
+    dubdt : array (n,)
+        Derivatives of the upper bound with respect to the thickness
+    dlbdt : array (n,)
+        Derivatives of the lower bound with respect to the thickness
+    dubdxy : array (n x 2)
+        Derivatives of the upper bound with respect to the x and y coordinates of the points
+    dlbdxy : array (n x 2)
+        Derivatives of the lower bound with respect to the x and y coordinates of the points
+
+    Notes
+    -----
+    If the heights of the openings ``he`` are given, the radius of the pointed arches varies along the vault,
+    and the derivatives with respect to the coordinates include the change of the radius.
+    """
+
+    if hm:
+        raise NotImplementedError()
+
+    x = asarray(x, dtype=float).ravel()
+    y = asarray(y, dtype=float).ravel()
+    n = len(x)
+    rows = arange(n)
+
+    x0, x1 = x_span
+    y0, y1 = y_span
+    lx = x1 - x0
+    ly = y1 - y0
+
+    # the quadrants Q1 and Q2 are arches spanning in the y direction, Q3 and Q4 in the x direction
+    q1 = (y <= y0 + (y1 - y0) / (x1 - x0) * (x - x0) + tol) & (y >= y1 - (y1 - y0) / (x1 - x0) * (x - x0) - tol)
+    q3 = (y >= y0 + (y1 - y0) / (x1 - x0) * (x - x0) - tol) & (y >= y1 - (y1 - y0) / (x1 - x0) * (x - x0) - tol)
+    q2 = (y >= y0 + (y1 - y0) / (x1 - x0) * (x - x0) - tol) & (y <= y1 - (y1 - y0) / (x1 - x0) * (x - x0) + tol)
+    along_y = q1 | (~q3 & q2)
+    axis = where(along_y, 1, 0)
+    u = where(along_y, y, x)
+    v = where(along_y, x, y)
+    length = where(along_y, ly, lx)
+
+    # the height of the crown of the arch, and its derivative along the other direction
+    if he:
+        h1, k1, r1 = _circle_3points_xy([x0, he[1]], [(x1 + x0) / 2, hc], [x1, he[0]])
+        h3, k3, r3 = _circle_3points_xy([y0, he[3]], [(y1 + y0) / 2, hc], [y1, he[2]])
+        h = where(along_y, h1, h3)
+        k = where(along_y, k1, k3)
+        r = where(along_y, r1, r3)
+        w = sqrt(r**2 - (v - h) ** 2)
+        hi = k + w
+        dhidv = -(v - h) / w
+    else:
+        hi = full(n, hc, dtype=float)
+        dhidv = zeros(n)
+
+    # the radius of the arch, and the position of the center of the arch through the point
+    ri = _find_r_given_h_l(hi, length)
+    dridv = 2 * hi / length * dhidv
+    first = where(along_y, y <= (y1 + y0) / 2, x <= (x0 + x1) / 2)
+    direction = where(first, 1.0, -1.0)
+    uc = where(along_y, where(first, y0, y1), where(first, x0, x1)) + direction * ri
+
+    def bound(offset):
+        ro = ri + offset
+        a = ro**2 - (u - uc) ** 2
+        # as in _sqrt
+        z = where(a > -10e4, sqrt(npabs(a)), 0.0)
+        dzdt = zeros(n)
+        dzdxy = zeros((n, 2))
+        nonzero = z > 0.0
+        scale = sign(a[nonzero]) / (2 * z[nonzero])
+        dzdt[nonzero] = scale * ro[nonzero] * sign(offset)
+        dzdxy[rows[nonzero], axis[nonzero]] = scale * -2 * (u - uc)[nonzero]
+        dzdxy[rows[nonzero], 1 - axis[nonzero]] = scale * (2 * ro + 2 * (u - uc) * direction)[nonzero] * dridv[nonzero]
+        return z, dzdt, dzdxy
+
+    ub, dubdt, dubdxy = bound(thk / 2)
+    lb, dlbdt, dlbdxy = bound(-thk / 2)
+
+    intrados_null = ((y > y1 - thk / 2) | (y < y0 + thk / 2)) & ((x > x1 - thk / 2) | (x < x0 + thk / 2))
+    lb[intrados_null] = -1 * min_lb
+    dlbdt[intrados_null] = 0.0
+    dlbdxy[intrados_null] = 0.0
+
+    return ub, lb, dubdt, dlbdt, dubdxy, dlbdxy
+
+
 def pointedvault_bound_react(
     x,
     y,
@@ -582,6 +762,8 @@ def _sqrt(x):
 
 
 class PointedVaultEnvelope(ParametricEnvelope):
+    surface_parameters = ("thickness", "x_span", "y_span", "min_lb", "n", "hc", "he", "hm")
+
     def __init__(
         self,
         x_span: tuple = (0.0, 10.0),
@@ -603,8 +785,6 @@ class PointedVaultEnvelope(ParametricEnvelope):
         self.he = he
         self.hm = hm
 
-        self.update_envelope()  # Generate the intra/extra/middle meshes
-
     @property
     def __data__(self):
         data = super().__data__
@@ -621,12 +801,10 @@ class PointedVaultEnvelope(ParametricEnvelope):
         return f"PointedVaultEnvelope(name={self.name})"
 
     def update_envelope(self):
-        intrados, extrados, middle = pointedvault_envelope(
+        faces, intrados, extrados, middle = pointedvault_surfaces(
             x_span=self.x_span, y_span=self.y_span, thickness=self.thickness, min_lb=self.min_lb, n=self.n, hc=self.hc, he=self.he, hm=self.hm
         )
-        self.intrados = intrados
-        self.extrados = extrados
-        self.middle = middle
+        self.set_surfaces(faces, intrados, extrados, middle)
 
     def compute_middle(self, x, y):
         return pointedvault_middle(x, y, self.min_lb, self.x_span, self.y_span, self.hc, self.he, self.hm)
@@ -645,6 +823,11 @@ class PointedVaultEnvelope(ParametricEnvelope):
             self.thickness = thickness
         return pointedvault_bounds_derivatives(x, y, thickness, self.min_lb, self.x_span, self.y_span, self.hc, self.he, self.hm)
 
+    def bounds_and_jacobian(self, x, y, thickness=None):
+        if thickness is None:
+            thickness = self.thickness
+        return pointedvault_bounds_jacobian(x, y, thickness, self.min_lb, self.x_span, self.y_span, self.hc, self.he, self.hm)
+
     def compute_bound_react(self, x, y, thickness=None, fixed=None):
         if thickness is None:
             thickness = self.thickness
@@ -2,23 +2,45 @@ from __future__ import absolute_import
 
 import compas
 
+from .monitor import Monitor
+from .monitor import Collector
 from .horizontal import horizontal_nodal
 
 __all__ = [
+    "Monitor",
+    "Collector",
     "horizontal_nodal",
 ]
 
 if not compas.IPY:
+    from .relaxation import RelaxationProblem
     from .relaxation import relax_boundary_openings
+    from .parallelisation_numpy import FACTORIZATIONS
+    from .parallelisation_numpy import FactorizationCache
+    from .horizontal_numpy import HorizontalState
     from .horizontal_numpy import horizontal_nodal_numpy
     from .horizontal_numpy import horizontal_numpy
+    from .vertical_numpy import VerticalProblem
     from .vertical_numpy import vertical_from_q
     from .vertical_numpy import vertical_from_zmax
+    from .sensitivity_numpy import VerticalSensitivity
+    from .bestfit_numpy import independent_edges_matrix
+    from .bestfit_numpy import vertical_bestfit
+    from .limits_numpy import thrust_limits
 
     __all__ += [
+        "FACTORIZATIONS",
+        "FactorizationCache",
+        "HorizontalState",
+        "RelaxationProblem",
+        "VerticalProblem",
+        "VerticalSensitivity",
         "horizontal_nodal_numpy",
         "horizontal_numpy",
+        "independent_edges_matrix",
         "relax_boundary_openings",
+        "thrust_limits",
+        "vertical_bestfit",
         "vertical_from_q",
         "vertical_from_zmax",
     ]
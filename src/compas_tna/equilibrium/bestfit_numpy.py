@@ -0,0 +1,322 @@
+from typing import Optional
+
+from numpy import array
+from numpy import concatenate
+from numpy import diag
+from numpy import eye
+from numpy import float64
+from numpy import isfinite
+from numpy import zeros
+from scipy.linalg import cho_factor
+from scipy.linalg import cho_solve
+from scipy.linalg import cholesky
+from scipy.linalg import solve_triangular
+from scipy.optimize import nnls
+from scipy.sparse.linalg import splu
+
+from compas.linalg import normrow
+from compas.matrices import equilibrium_matrix
+from compas_tna.diagrams import FormDiagram
+
+from .diagrams import form_identify_dof
+from .diagrams import update_z
+from .monitor import Monitor
+from .sensitivity_numpy import VerticalSensitivity
+from .vertical_numpy import VerticalProblem
+
+
+def independent_edges_matrix(E, ind):
+    """Construct the matrix mapping the force densities of the independent edges to the force densities of all edges.
+
+    Parameters
+    ----------
+    E : sparse matrix
+        The equilibrium matrix of the free vertices.
+    ind : list[int]
+        The indices of the independent edges.
+
+    Returns
+    -------
+    ndarray (m x k)
+        The matrix ``T`` such that ``q = T qind`` satisfies horizontal equilibrium for any ``qind``.
+
+    Notes
+    -----
+    The force densities of the dependent edges are computed as in :func:`update_q_from_qind`,
+    but for all independent edges at once, with a single sparse factorization.
+
+    """
+    m = E.shape[1]
+    ind = list(ind)
+    dep = sorted(set(range(m)) - set(ind))
+    Ei = E[:, ind]
+    Ed = E[:, dep]
+    if Ed.shape[0] == Ed.shape[1]:
+        A = Ed
+        b = Ei
+    else:
+        Edt = Ed.transpose()
+        A = Edt.dot(Ed)
+        b = Edt.dot(Ei)
+    T = zeros((m, len(ind)), dtype=float64)
+    T[ind] = eye(len(ind))
+    if dep:
+        T[dep] = -splu(A.tocsc()).solve(b.toarray())
+    return T
+
+
+def _solve_subproblem(H, c, G, g, kmax=10):
+    # minimize 1/2 s^T H s + c^T s subject to G s + g >= 0
+    # the constraints that are violated by the current step are added to a working set,
+    # and the QP of the working set is solved exactly through its dual,
+    # a non-negative least-squares problem in the multipliers of the working constraints
+    factor = cho_factor(H)
+    s0 = cho_solve(factor, -c)
+    s = s0
+    working = zeros(g.shape[0], dtype=bool)
+    for _ in range(kmax):
+        violated = G.dot(s) + g < 0
+        if not (violated & ~working).any():
+            break
+        working |= violated
+        Gw = G[working]
+        HGt = cho_solve(factor, Gw.T)
+        M = Gw.dot(HGt)
+        M += 1e-12 * M.trace() / M.shape[0] * eye(M.shape[0])
+        Lm = cholesky(M, lower=True)
+        v = Gw.dot(s0) + g[working]
+        multipliers = nnls(Lm.T, -solve_triangular(Lm, v, lower=True))[0]
+        s = s0 + HGt.dot(multipliers)
+    return s
+
+
+def _free_values(form, problem, name):
+    # the indices and finite values of a vertex attribute at the free vertices
+    indices = []
+    values = []
+    free = set(problem.free)
+    for vertex, value in zip(form.vertices(), form.vertices_attribute(name)):
+        index = problem.k_i[vertex]
+        if index in free and value is not None and isfinite(value):
+            indices.append(index)
+            values.append(value)
+    return indices, array(values, dtype=float64)
+
+
+def vertical_bestfit(
+    form: FormDiagram,
+    density: float = 1.0,
+    ind: Optional[list[int]] = None,
+    kmax: int = 100,
+    tol: float = 1e-8,
+    rtol: float = 1e-6,
+    display: bool = False,
+    monitor: Optional[Monitor] = None,
+    problem: Optional[VerticalProblem] = None,
+) -> tuple[FormDiagram, float]:
+    """Compute the force densities of the independent edges for which the thrust network best fits the target heights of its vertices.
+
+    The target heights are taken from the vertex attribute ``"target"``,
+    and the heights of the vertices are constrained by the optional vertex attributes ``"ub"`` and ``"lb"``,
+    for example as set by :meth:`Envelope.apply_target_heights_to_formdiagram` and :meth:`Envelope.apply_bounds_to_formdiagram`.
+    The horizontal forces of the edges are constrained by the edge attributes ``"hmin"`` and ``"hmax"``.
+
+    Parameters
+    ----------
+    form : :class:`FormDiagram`
+        The form diagram, in horizontal equilibrium.
+        The force densities stored in the diagram are the starting point of the optimization,
+        for example after :func:`vertical_from_zmax`.
+    density : float, optional
+        The density for computation of the self-weight of the thrust network.
+        Default is ``1.0``.
+    ind : list[int], optional
+        The indices of the independent edges, in the order of :meth:`FormDiagram.uv_index`.
+        Default is ``None``, in which case they are identified with :func:`form_identify_dof`.
+    kmax : int, optional
+        The maximum number of iterations of the optimization,
+        and of the computation of vertical equilibrium with the self-weight in every evaluation.
+        Default is ``100``.
+    tol : float, optional
+        The stopping criterion of the optimization,
+        relative to the change of the objective between iterations.
+        Default is ``1e-8``.
+    rtol : float, optional
+        The stopping criterion for computing vertical equilibrium with the self-weight in every evaluation.
+        Default is ``1e-6``.
+    display : bool, optional
+        If True, information about the optimization will be displayed.
+        Default is False.
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the phases and iterations of the solver.
+        Default is ``None``.
+    problem : :class:`VerticalProblem`, optional
+        The precompiled vertical problem of the form diagram.
+        Default is ``None``.
+
+    Returns
+    -------
+    tuple[:class:`FormDiagram`, float]
+        The form diagram and the sum of the squared distances of the vertices to their target heights.
+
+    Raises
+    ------
+    ValueError
+        If none of the free vertices has a target height.
+
+    Notes
+    -----
+    The force densities of all edges are a linear function of those of the independent edges,
+    ``q = T qind`` (see :func:`independent_edges_matrix`),
+    such that every evaluation of the optimization problem is a thrust network in horizontal equilibrium.
+
+    The problem is solved with a Gauss-Newton variant of sequential quadratic programming.
+    In every iteration, the Jacobian of the heights with respect to the independent force densities
+    is computed with :class:`VerticalSensitivity`, in a single tangent solve for all independent edges,
+    reusing the factorization of the vertical system of the current point.
+    The least-squares model of the objective, damped as in the Levenberg-Marquardt method,
+    is then minimized subject to the linearized constraints.
+    Only the constraints that are violated by the step are passed to the quadratic subproblem,
+    which is solved exactly through its dual.
+    Steps are accepted if they reduce the objective of a feasible point, or the violation of an infeasible one.
+
+    Examples
+    --------
+    >>> envelope.apply_target_heights_to_formdiagram(form)
+    >>> envelope.apply_bounds_to_formdiagram(form)
+    >>> form, scale = vertical_from_zmax(form, 3.0)
+    >>> form, error = vertical_bestfit(form)
+
+    """
+    monitor = monitor or Monitor()
+    with monitor.phase("vertical_bestfit"):
+        with monitor.phase("index"):
+            if problem is None:
+                problem = VerticalProblem(form)
+            else:
+                problem.check(form)
+
+            k_i = problem.k_i
+            uv_i = problem.uv_i
+            free = problem.free
+            fixed = problem.fixed
+            C = problem.C
+            xyz, thick, p, q = problem.data(form)
+
+            targeted, target = _free_values(form, problem, "target")
+            upper, ub = _free_values(form, problem, "ub")
+            lower, lb = _free_values(form, problem, "lb")
+            if not targeted:
+                raise ValueError("None of the free vertices has a target height.")
+
+            hmin = array(form.edges_attribute("hmin", keys=problem.edges), dtype=float64)
+            hmax = array(form.edges_attribute("hmax", keys=problem.edges), dtype=float64)
+        with monitor.phase("assembly"):
+            # --------------------------------------------------------------------------
+            # independent edges
+            # --------------------------------------------------------------------------
+            if ind is None:
+                ind = form_identify_dof(form)
+            E = equilibrium_matrix(C, xyz, free, "csr")
+            T = independent_edges_matrix(E, ind)
+            # the horizontal forces are linear in the independent force densities
+            L = normrow(C.dot(xyz[:, :2])) * T
+            # --------------------------------------------------------------------------
+            # loads and sensitivities
+            # --------------------------------------------------------------------------
+            p0 = array(p, copy=True)
+            sensitivity = VerticalSensitivity(form, density=density, tol=rtol, problem=problem)
+            update_loads = problem.loads(p0, thick, density)
+
+        # --------------------------------------------------------------------------
+        # evaluations
+        # --------------------------------------------------------------------------
+        def evaluate(x):
+            qx = T.dot(x).reshape((-1, 1))
+            system, factor = problem.system(qx, monitor=monitor)
+            update_z(xyz, None, C, p, free, fixed, update_loads, tol=rtol, kmax=kmax, monitor=monitor, system=system, scale=factor)
+            d = xyz[targeted, 2] - target
+            h = L.dot(x)
+            g = concatenate((h - hmin, hmax - h, ub - xyz[upper, 2], xyz[lower, 2] - lb))
+            return d, g
+
+        # --------------------------------------------------------------------------
+        # optimization
+        # --------------------------------------------------------------------------
+        with monitor.phase("iterations"):
+            x = q[ind, 0]
+            d, g = evaluate(x)
+            f = d.dot(d)
+            violation = max(0.0, -g.min())
+            ctol = 1e-6 * (1.0 + abs(target).max())
+            mu = 1e-3
+
+            for k in range(kmax):
+                if display:
+                    print(k, f, violation)
+
+                # the Gauss-Newton model of the objective and the linearized constraints
+                # the factorization of the current point is shared by all tangent solves
+                sensitivity.update(xyz, T.dot(x).reshape((-1, 1)))
+                dz = sensitivity.jvp(T)
+                J = dz[targeted]
+                G = concatenate((L, -L, -dz[upper], dz[lower]))
+                H = J.T.dot(J)
+                c = J.T.dot(d)
+                D = diag(diag(H)) + 1e-9 * H.trace() / len(x) * eye(len(x))
+
+                xyzk = array(xyz, copy=True)
+                pk = array(p, copy=True)
+                accepted = False
+
+                while mu < 1e12:
+                    step = _solve_subproblem(H + mu * D, c, G, g)
+                    d1, g1 = evaluate(x + step)
+                    f1 = d1.dot(d1)
+                    violation1 = max(0.0, -g1.min())
+                    # accept steps that reduce the objective while remaining feasible,
+                    # and steps that reduce the violation of the constraints by an infeasible point
+                    if violation > ctol:
+                        accepted = violation1 < violation
+                    else:
+                        accepted = violation1 <= ctol and f1 < f
+                    if accepted:
+                        break
+                    xyz[:] = xyzk
+                    p[:] = pk
+                    mu *= 4
+
+                if not accepted:
+                    break
+
+                x = x + step
+                converged = abs(f - f1) <= tol * max(f, 1.0) and violation1 <= ctol
+                d, g, f, violation = d1, g1, f1, violation1
+                mu = max(mu / 3, 1e-6)
+
+                monitor.iteration(k, f)
+
+                if converged:
+                    break
+
+        # --------------------------------------------------------------------------
+        # update
+        # --------------------------------------------------------------------------
+        with monitor.phase("writeback"):
+            q = T.dot(x).reshape((-1, 1))
+            forces = q * normrow(C.dot(xyz))
+            system, factor = problem.system(q)
+            r = factor * system[2].dot(xyz) - p
+            # --------------------------------------------------------------------------
+            # form
+            # --------------------------------------------------------------------------
+            for vertex in form.vertices():
+                index = k_i[vertex]
+                form.vertex_attribute(vertex, "z", xyz[index, 2])
+                form.vertex_attributes(vertex, ["_rx", "_ry", "_rz"], r[index])
+
+            for edge in form.edges_where({"_is_edge": True}):
+                index = uv_i[edge]  # type: ignore
+                form.edge_attributes(edge, ["q", "_f"], [q[index, 0], forces[index, 0]])
+
+    return form, f
@@ -1,19 +1,21 @@
 import sys
 from typing import TYPE_CHECKING
 
+from numpy import diag
 from numpy import empty_like
 from numpy.linalg import cond
 from scipy.linalg import lstsq
 from scipy.linalg import norm
+from scipy.linalg import qr
 from scipy.linalg import solve
 from scipy.sparse.linalg import factorized
 
 from compas.linalg import dof
-from compas.linalg import nonpivots
-from compas.linalg import rref
 from compas.matrices import connectivity_matrix
 from compas.matrices import equilibrium_matrix
 
+from .monitor import Monitor
+
 if TYPE_CHECKING:
     from compas_tna.diagrams import FormDiagram
 
@@ -34,33 +36,89 @@ def apply_bounds(x, xmin, xmax):
     x[xbig] = xmax[xbig]
 
 
-def update_z(xyz, Q, C, p, free, fixed, updateloads, tol=1e-3, kmax=100, display=False):
-    Ci = C[:, free]
-    Cf = C[:, fixed]
-    Ct = C.transpose()
-    Cit = Ci.transpose()
-    A = Cit.dot(Q).dot(Ci)
-    A_solve = factorized(A)
-    B = Cit.dot(Q).dot(Cf)
-    CtQC = Ct.dot(Q).dot(C)
+def vertical_system(Q, C, free, fixed, monitor=None):
+    r"""Assemble and factorize the system of vertical equilibrium for given force densities.
+
+    Parameters
+    ----------
+    Q : sparse matrix
+        The diagonal matrix of force densities.
+    C : sparse matrix
+        The connectivity matrix.
+    free : list[int]
+        The indices of the free vertices.
+    fixed : list[int]
+        The indices of the fixed vertices.
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the assembly and factorization phases.
+
+    Returns
+    -------
+    tuple
+        The solver of the free block ``Cit Q Ci``,
+        the coupling block ``Cit Q Cf`` with the fixed vertices,
+        and the full matrix ``Ct Q C``.
+
+    Notes
+    -----
+    Since all three matrices are linear in the force densities,
+    the system for force densities ``scale * q`` is that of ``q`` scaled by ``scale``.
+    The heights of the free vertices under loads ``p`` are then
+
+    .. math::
+
+        \mathbf{z}_i = (\mathbf{C}_i^T \mathbf{Q} \mathbf{C}_i)^{-1} (\mathbf{p}_i / scale - \mathbf{C}_i^T \mathbf{Q} \mathbf{C}_f \mathbf{z}_f)
+
+    such that a single factorization serves all scales.
+
+    """
+    monitor = monitor or Monitor()
+
+    with monitor.phase("assembly"):
+        Ci = C[:, free]
+        Cf = C[:, fixed]
+        Ct = C.transpose()
+        Cit = Ci.transpose()
+        CitQ = Cit.dot(Q)
+        A = CitQ.dot(Ci)
+        B = CitQ.dot(Cf)
+        CtQC = Ct.dot(Q).dot(C)
+
+    with monitor.phase("factorization"):
+        A_solve = factorized(A.tocsc())
 
-    updateloads(p, xyz)
+    return A_solve, B, CtQC
 
-    residual = 0
 
-    for k in range(kmax):
-        if display:
-            print(k)
+def update_z(xyz, Q, C, p, free, fixed, updateloads, tol=1e-3, kmax=100, display=False, monitor=None, system=None, scale=1.0):
+    monitor = monitor or Monitor()
+    with monitor.phase("update_z"):
+        if system is None:
+            system = vertical_system(Q, C, free, fixed, monitor=monitor)
+            scale = 1.0
 
-        xyz[free, 2] = A_solve(p[free, 2] - B.dot(xyz[fixed, 2]))
+        A_solve, B, CtQC = system
 
-        updateloads(p, xyz)
+        with monitor.phase("iterations"):
+            updateloads(p, xyz)
 
-        r = CtQC.dot(xyz[:, 2]) - p[:, 2]
-        residual = norm(r[free])
+            residual = 0
 
-        if residual < tol:
-            break
+            for k in range(kmax):
+                if display:
+                    print(k)
+
+                xyz[free, 2] = A_solve(p[free, 2] / scale - B.dot(xyz[fixed, 2]))
+
+                updateloads(p, xyz)
+
+                r = scale * CtQC.dot(xyz[:, 2]) - p[:, 2]
+                residual = norm(r[free])
+
+                monitor.iteration(k, residual)
+
+                if residual < tol:
+                    break
 
     return residual
 
@@ -131,6 +189,25 @@ def form_count_dof(form: "FormDiagram"):
 
 
 def form_identify_dof(form: "FormDiagram", **kwargs):
+    """Identify the independent edges of the FormDiagram.
+
+    Parameters
+    ----------
+    form : :class:`compas_tna.diagrams.FormDiagram`
+
+    Returns
+    -------
+    list[int]
+        The indices of the independent edges, in the order of :meth:`FormDiagram.uv_index`.
+
+    Notes
+    -----
+    The independent edges are identified with a QR decomposition with column pivoting of the equilibrium matrix.
+    The first columns of the permutation span the column space of the matrix and correspond to the dependent edges.
+    In contrast to Gauss-Jordan elimination, the decomposition is numerically stable,
+    such that the matrix of the dependent edges is well-conditioned.
+
+    """
     k2i = form.vertex_index()
     xyz = form.vertices_attributes("xyz")
     fixed = [k2i[key] for key in form.supports()]
@@ -138,4 +215,9 @@ def form_identify_dof(form: "FormDiagram", **kwargs):
     edges = [(k2i[u], k2i[v]) for u, v in form.edges_where({"_is_edge": True})]
     C = connectivity_matrix(edges)
     E = equilibrium_matrix(C, xyz, free)
-    return nonpivots(rref(E))
+    if not E.shape[0]:
+        return list(range(E.shape[1]))
+    R, P = qr(E, mode="r", pivoting=True)  # type: ignore
+    d = abs(diag(R))
+    rank = int((d > d[0] * max(E.shape) * sys.float_info.epsilon).sum())
+    return sorted(P[rank:].tolist())
@@ -5,7 +5,9 @@ from compas.geometry import angle_vectors_xy
 from compas_tna.diagrams import ForceDiagram
 from compas_tna.diagrams import FormDiagram
 
+from .monitor import Monitor
 from .parallelisation import parallelise_edges
+from .parallelisation import parallelise_edges_local
 
 
 def horizontal_nodal(
@@ -14,6 +16,10 @@ def horizontal_nodal(
     alpha: float = 100,
     kmax: int = 100,
     callback: Optional[Callable] = None,
+    monitor: Optional[Monitor] = None,
+    changed: Optional[list[int]] = None,
+    tol: float = 1e-6,
+    coloured: bool = False,
 ) -> None:
     r"""Compute horizontal equilibrium using a node-per-node approach.
 
@@ -35,6 +41,25 @@ def horizontal_nodal(
         The callback should take the current iterand, the coordinates of the form diagram,
         and the coordinates of the force diagram as input parameters.
         Default is ``None``.
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the phases and iterations of the solver.
+        Default is ``None``.
+    changed : list[int], optional
+        The vertices of the form diagram that were moved, or of which the connected edges were modified,
+        since the diagrams were last in equilibrium.
+        If provided, only the neighbourhood of these vertices is updated,
+        using :func:`parallelise_edges_local` instead of :func:`parallelise_edges`,
+        and only the vertices and edges that were processed are written back to the diagrams.
+        Default is ``None``.
+    tol : float, optional
+        The displacement below which a local update stops propagating.
+        Only used in combination with ``changed``.
+        Default is ``1e-6``.
+    coloured : bool, optional
+        If True, the diagrams are parallelised with the graph-coloured Gauss-Seidel scheme of :func:`parallelise_edges`,
+        which typically needs fewer iterations than the default Jacobi scheme.
+        Not used in combination with ``changed``, since local updates always use the current positions.
+        Default is False.
 
     Returns
     -------
@@ -55,140 +80,202 @@ def horizontal_nodal(
     """
     alpha = float(alpha) / 100.0
     alpha = max(0, min(1, alpha))
-    # --------------------------------------------------------------------------
-    # form diagram
-    # --------------------------------------------------------------------------
-    k_i = form.vertex_index()
-    i_nbrs = {k_i[key]: [k_i[nbr] for nbr in form.vertex_neighbors(key)] for key in form.vertices()}
-    fixed = set(list(form.supports()) + list(form.fixed()))
-    fixed = [k_i[key] for key in fixed]
-    xy: list[list[float]] = form.vertices_attributes("xy")  # type: ignore
-
-    edges = list(form.edges_where({"_is_edge": True}))
-    lmin: list[float] = form.edges_attribute("lmin", keys=edges)  # type: ignore
-    lmax: list[float] = form.edges_attribute("lmax", keys=edges)  # type: ignore
-    hmin: list[float] = form.edges_attribute("hmin", keys=edges)  # type: ignore
-    hmax: list[float] = form.edges_attribute("hmax", keys=edges)  # type: ignore
-
-    flipmask = [-1.0 if form.edge_attribute(edge, "_is_tension") else 1.0 for edge in edges]
-
-    uv_i: dict[tuple[int, int], int] = form.uv_index()
-    ij_e = {(k_i[u], k_i[v]): index for (u, v), index in iter(uv_i.items())}
-
-    edges = [[k_i[u], k_i[v]] for u, v in edges]
-    # --------------------------------------------------------------------------
-    # force diagram
-    # --------------------------------------------------------------------------
-    _k_i = force.vertex_index()
-    _i_nbrs = {_k_i[key]: [_k_i[nbr] for nbr in force.vertex_neighbors(key)] for key in force.vertices()}
-    _fixed = list(force.fixed())
-    _fixed = [_k_i[key] for key in _fixed]
-    _xy: list[list[float]] = force.vertices_attributes("xy")  # type: ignore
-
-    _edges = force.ordered_edges(form)
-    _uv_i = {uv: index for index, uv in enumerate(_edges)}
-    _ij_e = {(_k_i[u], _k_i[v]): index for (u, v), index in iter(_uv_i.items())}
-    _lmin: list[float] = force.edges_attribute("lmin", keys=_edges)  # type: ignore
-    _lmax: list[float] = force.edges_attribute("lmax", keys=_edges)  # type: ignore
-    _edges = [[_k_i[u], _k_i[v]] for u, v in _edges]
-    scale = force.attributes.get("scale", 1.0)
-    # --------------------------------------------------------------------------
-    # rotate force diagram to make it parallel to the form diagram
-    # use CCW direction (opposite of cycle direction)
-    # --------------------------------------------------------------------------
-    _x, _y = zip(*_xy)
-    _xy[:] = [list(item) for item in zip([-_ for _ in _y], _x)]
-    # --------------------------------------------------------------------------
-    # make the diagrams parallel to a target vector
-    # that is the (alpha) weighted average of the directions of corresponding
-    # edges of the two diagrams
-    # --------------------------------------------------------------------------
-    uv = [[factor * (xy[j][0] - xy[i][0]), factor * (xy[j][1] - xy[i][1])] for (i, j), factor in zip(edges, flipmask)]
-    _uv = [[_xy[j][0] - _xy[i][0], _xy[j][1] - _xy[i][1]] for i, j in _edges]
-    lengths = [(dx**2 + dy**2) ** 0.5 for dx, dy in uv]
-    forces = [(dx**2 + dy**2) ** 0.5 for dx, dy in _uv]
-    # --------------------------------------------------------------------------
-    # the target vectors
-    # --------------------------------------------------------------------------
-    form_targets = [[alpha * v[0] / length, alpha * v[1] / length] if length else [0, 0] for v, length in zip(uv, lengths)]
-    force_targets = [[(1 - alpha) * v[0] / length, (1 - alpha) * v[1] / length] if length else [0, 0] for v, length in zip(_uv, forces)]
-    targets = [[a[0] + b[0], a[1] + b[1]] for a, b in zip(form_targets, force_targets)]
-    # --------------------------------------------------------------------------
-    # proper force bounds
-    # --------------------------------------------------------------------------
-    hmin[:] = [_ / scale for _ in hmin]
-    hmax[:] = [_ / scale for _ in hmax]
-    _lmin[:] = [max(a, b) for a, b in zip(hmin, _lmin)]
-    _lmax[:] = [min(a, b) for a, b in zip(hmax, _lmax)]
-    # --------------------------------------------------------------------------
-    # parallelise
-    # --------------------------------------------------------------------------
-    if alpha < 1:
-        parallelise_edges(
-            xy,
-            edges,
-            targets,
-            i_nbrs,
-            ij_e,
-            fixed=fixed,
-            kmax=kmax,
-            lmin=lmin,
-            lmax=lmax,
-        )
-    if alpha > 0:
-        parallelise_edges(
-            _xy,
-            _edges,
-            targets,
-            _i_nbrs,
-            _ij_e,
-            fixed=_fixed,
-            kmax=kmax,
-            lmin=_lmin,
-            lmax=_lmax,
-            callback=callback,
-        )
-    # --------------------------------------------------------------------------
-    # update the coordinate difference vectors
-    # --------------------------------------------------------------------------
-    uv = [[xy[j][0] - xy[i][0], xy[j][1] - xy[i][1]] for i, j in edges]
-    _uv = [[_xy[j][0] - _xy[i][0], _xy[j][1] - _xy[i][1]] for i, j in _edges]
-    lengths = [(dx**2 + dy**2) ** 0.5 for dx, dy in uv]
-    forces = [(dx**2 + dy**2) ** 0.5 for dx, dy in _uv]
-    # --------------------------------------------------------------------------
-    # compute the force densities
-    # --------------------------------------------------------------------------
-    forces[:] = [f * factor for f, factor in zip(forces, flipmask)]
-    q = [f / length for f, length in zip(forces, lengths)]
-    # --------------------------------------------------------------------------
-    # rotate the force diagram 90 degrees in CW direction
-    # this way the relation between the two diagrams is easier to read
-    # --------------------------------------------------------------------------
-    _x, _y = zip(*_xy)
-    _xy[:] = [list(item) for item in zip(_y, [-_ for _ in _x])]
-    # --------------------------------------------------------------------------
-    # angle deviations
-    # note that this does not account for flipped edges!
-    # --------------------------------------------------------------------------
-    angles = [angle_vectors_xy(uv[i], _uv[i], deg=True) for i in range(len(edges))]
-    # --------------------------------------------------------------------------
-    # update form
-    # --------------------------------------------------------------------------
-    for key in form.vertices():
-        i = k_i[key]
-        form.vertex_attributes(key, "xy", xy[i])
-    for uv in form.edges_where({"_is_edge": True}):
-        i = uv_i[uv]  # type: ignore
-        form.edge_attributes(uv, ["q", "_f", "_l", "_a"], [q[i], forces[i], lengths[i], angles[i]])
-    # --------------------------------------------------------------------------
-    # update force
-    # --------------------------------------------------------------------------
-    for key in force.vertices():
-        i = _k_i[key]
-        force.vertex_attributes(key, "xy", _xy[i])
-    for u, v in force.edges():
-        if (u, v) in _uv_i:
-            i = _uv_i[(u, v)]  # type: ignore
-        else:
-            i = _uv_i[(v, u)]  # type: ignore
-        force.edge_attributes((u, v), ["_l", "_a"], [forces[i], angles[i]])
+
+    monitor = monitor or Monitor()
+    with monitor.phase("horizontal_nodal"):
+        with monitor.phase("index"):
+            # --------------------------------------------------------------------------
+            # form diagram
+            # --------------------------------------------------------------------------
+            k_i = form.vertex_index()
+            i_nbrs = {k_i[key]: [k_i[nbr] for nbr in form.vertex_neighbors(key)] for key in form.vertices()}
+            fixed = set(list(form.supports()) + list(form.fixed()))
+            fixed = [k_i[key] for key in fixed]
+            xy: list[list[float]] = form.vertices_attributes("xy")  # type: ignore
+
+            edges = index_uv = list(form.edges_where({"_is_edge": True}))
+            lmin: list[float] = form.edges_attribute("lmin", keys=edges)  # type: ignore
+            lmax: list[float] = form.edges_attribute("lmax", keys=edges)  # type: ignore
+            hmin: list[float] = form.edges_attribute("hmin", keys=edges)  # type: ignore
+            hmax: list[float] = form.edges_attribute("hmax", keys=edges)  # type: ignore
+
+            flipmask = [-1.0 if form.edge_attribute(edge, "_is_tension") else 1.0 for edge in edges]
+
+            uv_i: dict[tuple[int, int], int] = form.uv_index()
+            ij_e = {(k_i[u], k_i[v]): index for (u, v), index in iter(uv_i.items())}
+
+            edges = [[k_i[u], k_i[v]] for u, v in edges]
+            # --------------------------------------------------------------------------
+            # force diagram
+            # --------------------------------------------------------------------------
+            _k_i = force.vertex_index()
+            _i_nbrs = {_k_i[key]: [_k_i[nbr] for nbr in force.vertex_neighbors(key)] for key in force.vertices()}
+            _fixed = list(force.fixed())
+            _fixed = [_k_i[key] for key in _fixed]
+            _xy: list[list[float]] = force.vertices_attributes("xy")  # type: ignore
+
+            _edges = force.ordered_edges(form)
+            _uv_i = {uv: index for index, uv in enumerate(_edges)}
+            _index_uv = _edges
+            _ij_e = {(_k_i[u], _k_i[v]): index for (u, v), index in iter(_uv_i.items())}
+            _lmin: list[float] = force.edges_attribute("lmin", keys=_edges)  # type: ignore
+            _lmax: list[float] = force.edges_attribute("lmax", keys=_edges)  # type: ignore
+            _edges = [[_k_i[u], _k_i[v]] for u, v in _edges]
+            scale = force.attributes.get("scale", 1.0)
+        with monitor.phase("assembly"):
+            # --------------------------------------------------------------------------
+            # rotate force diagram to make it parallel to the form diagram
+            # use CCW direction (opposite of cycle direction)
+            # --------------------------------------------------------------------------
+            _x, _y = zip(*_xy)
+            _xy[:] = [list(item) for item in zip([-_ for _ in _y], _x)]
+            # --------------------------------------------------------------------------
+            # make the diagrams parallel to a target vector
+            # that is the (alpha) weighted average of the directions of corresponding
+            # edges of the two diagrams
+            # --------------------------------------------------------------------------
+            uv = [[factor * (xy[j][0] - xy[i][0]), factor * (xy[j][1] - xy[i][1])] for (i, j), factor in zip(edges, flipmask)]
+            _uv = [[_xy[j][0] - _xy[i][0], _xy[j][1] - _xy[i][1]] for i, j in _edges]
+            lengths = [(dx**2 + dy**2) ** 0.5 for dx, dy in uv]
+            forces = [(dx**2 + dy**2) ** 0.5 for dx, dy in _uv]
+            # --------------------------------------------------------------------------
+            # the target vectors
+            # --------------------------------------------------------------------------
+            form_targets = [[alpha * v[0] / length, alpha * v[1] / length] if length else [0, 0] for v, length in zip(uv, lengths)]
+            force_targets = [[(1 - alpha) * v[0] / length, (1 - alpha) * v[1] / length] if length else [0, 0] for v, length in zip(_uv, forces)]
+            targets = [[a[0] + b[0], a[1] + b[1]] for a, b in zip(form_targets, force_targets)]
+            # --------------------------------------------------------------------------
+            # proper force bounds
+            # --------------------------------------------------------------------------
+            hmin[:] = [_ / scale for _ in hmin]
+            hmax[:] = [_ / scale for _ in hmax]
+            _lmin[:] = [max(a, b) for a, b in zip(hmin, _lmin)]
+            _lmax[:] = [min(a, b) for a, b in zip(hmax, _lmax)]
+        with monitor.phase("iterations"):
+            # --------------------------------------------------------------------------
+            # parallelise
+            # --------------------------------------------------------------------------
+            if changed is not None:
+                # only the neighbourhood of the changed vertices is updated
+                # the changed vertices and their neighbours are the vertices of the form edges with new targets
+                # the corresponding force edges are the duals of these edges
+                changed = [k_i[key] for key in changed]
+                incident = _incident_edges(changed, i_nbrs, ij_e)
+                moved = set(changed)
+                _moved = set()
+                if alpha < 1:
+                    moved |= parallelise_edges_local(
+                        xy,
+                        targets,
+                        i_nbrs,
+                        ij_e,
+                        [i for e in incident for i in edges[e]],
+                        fixed=fixed,
+                        kmax=kmax,
+                        tol=tol,
+                        lmin=lmin,
+                        lmax=lmax,
+                        monitor=monitor,
+                    )
+                if alpha > 0:
+                    _moved = parallelise_edges_local(
+                        _xy,
+                        targets,
+                        _i_nbrs,
+                        _ij_e,
+                        [i for e in incident for i in _edges[e]],
+                        fixed=_fixed,
+                        kmax=kmax,
+                        tol=tol,
+                        lmin=_lmin,
+                        lmax=_lmax,
+                        monitor=monitor,
+                    )
+                vertices = moved
+                _vertices = _moved
+                indices = _incident_edges(moved, i_nbrs, ij_e) | _incident_edges(_moved, _i_nbrs, _ij_e)
+            else:
+                vertices = range(len(xy))
+                _vertices = range(len(_xy))
+                indices = range(len(edges))
+            if changed is None and alpha < 1:
+                parallelise_edges(
+                    xy,
+                    edges,
+                    targets,
+                    i_nbrs,
+                    ij_e,
+                    fixed=fixed,
+                    kmax=kmax,
+                    lmin=lmin,
+                    lmax=lmax,
+                    monitor=monitor,
+                    coloured=coloured,
+                )
+            if changed is None and alpha > 0:
+                parallelise_edges(
+                    _xy,
+                    _edges,
+                    targets,
+                    _i_nbrs,
+                    _ij_e,
+                    fixed=_fixed,
+                    kmax=kmax,
+                    lmin=_lmin,
+                    lmax=_lmax,
+                    callback=callback,
+                    monitor=monitor,
+                    coloured=coloured,
+                )
+        with monitor.phase("writeback"):
+            # --------------------------------------------------------------------------
+            # update the coordinate difference vectors
+            # --------------------------------------------------------------------------
+            uv = [[xy[j][0] - xy[i][0], xy[j][1] - xy[i][1]] for i, j in edges]
+            _uv = [[_xy[j][0] - _xy[i][0], _xy[j][1] - _xy[i][1]] for i, j in _edges]
+            lengths = [(dx**2 + dy**2) ** 0.5 for dx, dy in uv]
+            forces = [(dx**2 + dy**2) ** 0.5 for dx, dy in _uv]
+            # --------------------------------------------------------------------------
+            # compute the force densities
+            # --------------------------------------------------------------------------
+            forces[:] = [f * factor for f, factor in zip(forces, flipmask)]
+            q = [f / length for f, length in zip(forces, lengths)]
+            # --------------------------------------------------------------------------
+            # rotate the force diagram 90 degrees in CW direction
+            # this way the relation between the two diagrams is easier to read
+            # --------------------------------------------------------------------------
+            _x, _y = zip(*_xy)
+            _xy[:] = [list(item) for item in zip(_y, [-_ for _ in _x])]
+            # --------------------------------------------------------------------------
+            # angle deviations
+            # note that this does not account for flipped edges!
+            # --------------------------------------------------------------------------
+            angles = [angle_vectors_xy(uv[i], _uv[i], deg=True) for i in range(len(edges))]
+            # --------------------------------------------------------------------------
+            # update form
+            # --------------------------------------------------------------------------
+            i_k = list(form.vertices())
+            for i in vertices:
+                form.vertex_attributes(i_k[i], "xy", xy[i])
+            for i in indices:
+                form.edge_attributes(index_uv[i], ["q", "_f", "_l", "_a"], [q[i], forces[i], lengths[i], angles[i]])
+            # --------------------------------------------------------------------------
+            # update force
+            # --------------------------------------------------------------------------
+            _i_k = list(force.vertices())
+            for i in _vertices:
+                force.vertex_attributes(_i_k[i], "xy", _xy[i])
+            for i in indices:
+                force.edge_attributes(_index_uv[i], ["_l", "_a"], [forces[i], angles[i]])
+
+
+def _incident_edges(vertices, i_nbrs, ij_e):
+    # the indices of the edges connected to the given vertices
+    indices = set()
+    for i in vertices:
+        for j in i_nbrs[i]:
+            if (i, j) in ij_e:
+                indices.add(ij_e[(i, j)])
+            elif (j, i) in ij_e:
+                indices.add(ij_e[(j, i)])
+    return indices
@@ -1,3 +1,6 @@
+from typing import Callable
+from typing import Optional
+
 from numpy import array
 from numpy import float64
 from numpy import where
@@ -11,8 +14,212 @@ from compas_tna.diagrams import FormDiagram
 
 from .diagrams import apply_bounds
 from .diagrams import rot90
-from .parallelisation_numpy import parallelise_nodal
-from .parallelisation_numpy import parallelise_sparse
+from .horizontal import _incident_edges
+from .monitor import Monitor
+from .parallelisation import parallelise_edges_local
+from .parallelisation_numpy import FactorizationCache
+from .parallelisation_numpy import parallelise_batched
+from .parallelisation_numpy import parallelise_sparse_factorized
+from .parallelisation_numpy import topology_fingerprint
+
+
+class HorizontalState:
+    """Solver state of :func:`horizontal_numpy`, for warm-starting subsequent solves.
+
+    The state stores the index maps, the connectivity matrices, the bounds and the factorized systems
+    of the form and force diagram, and the coordinates of the last solution.
+    Passed to :func:`horizontal_numpy` again, for example after moving a few vertices of the form diagram,
+    the solver skips the collection of the data from the diagrams and the factorization,
+    and continues from the previous solution of the force diagram.
+
+    The state remains valid as long as the topology, the supports and fixed vertices,
+    and the bounds of the edges of the diagrams don't change.
+    If the numbers of vertices or edges of the diagrams change, the state is rebuilt automatically.
+    Otherwise, call :meth:`reset` after such changes.
+
+    Parameters
+    ----------
+    cache : :class:`FactorizationCache`, optional
+        The cache of the factorized systems, keyed by the topology and the fixed vertices of the diagrams.
+        States of diagrams with the same topology share their factorizations through the cache.
+        Default is ``None``, in which case the factorizations are only stored in the state.
+        Pass :data:`compas_tna.equilibrium.FACTORIZATIONS` to use the cache of the module.
+
+    Examples
+    --------
+    >>> state = HorizontalState()
+    >>> horizontal_numpy(form, force, state=state)
+    >>> form.vertex_attributes(vertex, "xy", [x, y])
+    >>> horizontal_numpy(form, force, state=state, changed=[vertex], tol=1e-6)
+
+    """
+
+    def __init__(self, cache: Optional[FactorizationCache] = None):
+        self.cache = cache
+        self.reset()
+
+    @property
+    def initialized(self) -> bool:
+        """True if the state contains the data of a previous solve."""
+        return self.signature is not None
+
+    def reset(self) -> None:
+        """Remove the data of the previous solve.
+
+        Returns
+        -------
+        None
+
+        """
+        self.signature = None
+        self.k_i = None
+        self.uv_i = None
+        self.fixed = None
+        self.edges = None
+        self.xy = None
+        self.lmin = None
+        self.lmax = None
+        self.hmin = None
+        self.hmax = None
+        self.C = None
+        self.Ct = None
+        self._k_i = None
+        self._uv_i = None
+        self._fixed = None
+        self._edges = None
+        self._xy = None
+        self._lmin = None
+        self._lmax = None
+        self._C = None
+        self._Ct = None
+        self._parallelise = {}
+
+    @staticmethod
+    def _signature(form: FormDiagram, force: ForceDiagram) -> tuple:
+        return form.number_of_vertices(), form.number_of_edges(), force.number_of_vertices(), force.number_of_edges()
+
+    def is_valid(self, form: FormDiagram, force: ForceDiagram) -> bool:
+        """Verify that the state can be used for warm-starting a solve of the given diagrams.
+
+        Parameters
+        ----------
+        form : :class:`FormDiagram`
+            A FormDiagram.
+        force : :class:`ForceDiagram`
+            A ForceDiagram.
+
+        Returns
+        -------
+        bool
+
+        """
+        return self.initialized and self.signature == self._signature(form, force)
+
+    def initialize(self, form: FormDiagram, force: ForceDiagram) -> None:
+        """Collect the data of the solver from the diagrams.
+
+        Parameters
+        ----------
+        form : :class:`FormDiagram`
+            A FormDiagram.
+        force : :class:`ForceDiagram`
+            A ForceDiagram.
+
+        Returns
+        -------
+        None
+
+        """
+        self.reset()
+        # --------------------------------------------------------------------------
+        # form diagram
+        # --------------------------------------------------------------------------
+        k_i = form.vertex_index()
+        fixed = set(list(form.supports()) + list(form.fixed()))
+        edges = list(form.edges_where({"_is_edge": True}))
+        self.k_i = k_i
+        self.uv_i = form.uv_index()
+        self.fixed = [k_i[key] for key in fixed]
+        self.xy = array(form.vertices_attributes("xy"), dtype=float64)
+        self.lmin = array(form.edges_attribute("lmin", keys=edges), dtype=float64).reshape((-1, 1))
+        self.lmax = array(form.edges_attribute("lmax", keys=edges), dtype=float64).reshape((-1, 1))
+        self.hmin = array(form.edges_attribute("hmin", keys=edges), dtype=float64).reshape((-1, 1))
+        self.hmax = array(form.edges_attribute("hmax", keys=edges), dtype=float64).reshape((-1, 1))
+        self.edges = [[k_i[u], k_i[v]] for u, v in edges]
+        self.C = connectivity_matrix(self.edges, "csr")
+        self.Ct = self.C.transpose()
+        # --------------------------------------------------------------------------
+        # force diagram
+        # --------------------------------------------------------------------------
+        _k_i = force.vertex_index()
+        _edges = force.ordered_edges(form)
+        _fixed = [_k_i[key] for key in force.fixed()]
+        self._k_i = _k_i
+        self._uv_i = {uv: index for index, uv in enumerate(_edges)}
+        self._fixed = _fixed or [0]
+        self._xy = array(force.vertices_attributes("xy"), dtype=float64)
+        self._lmin = array(force.edges_attribute("lmin", keys=_edges), dtype=float64).reshape((-1, 1))
+        self._lmax = array(force.edges_attribute("lmax", keys=_edges), dtype=float64).reshape((-1, 1))
+        self._edges = [[_k_i[u], _k_i[v]] for u, v in _edges]
+        self._C = connectivity_matrix(self._edges, "csr")
+        self._Ct = self._C.transpose()
+
+        self.signature = self._signature(form, force)
+
+    def update(self, form: FormDiagram, force: ForceDiagram, changed: Optional[list[int]] = None) -> None:
+        """Update the coordinates stored in the state with the coordinates of the diagrams.
+
+        Parameters
+        ----------
+        form : :class:`FormDiagram`
+            A FormDiagram.
+        force : :class:`ForceDiagram`
+            A ForceDiagram.
+        changed : list[int], optional
+            The vertices of the form diagram that were moved since the previous solve.
+            Only the coordinates of these vertices are read from the form diagram,
+            and the solve continues from the previous solution of the force diagram.
+            If ``None``, the coordinates of all vertices of both diagrams are read.
+
+        Returns
+        -------
+        None
+
+        """
+        if changed is None:
+            self.xy[:] = form.vertices_attributes("xy")
+            self._xy[:] = force.vertices_attributes("xy")
+            return
+        for vertex in changed:
+            self.xy[self.k_i[vertex]] = form.vertex_attributes(vertex, "xy")
+
+    def parallelise(self, name: str, monitor: Optional[Monitor] = None) -> Callable:
+        """Get the factorized parallelisation of the form (``"form"``) or force (``"force"``) diagram.
+
+        The factorization is computed on first use, and reused afterwards.
+        If the state has a cache, the factorization is taken from the cache if another state with the same topology computed it before.
+
+        Parameters
+        ----------
+        name : {"form", "force"}
+            The diagram.
+        monitor : :class:`Monitor`, optional
+            A monitor receiving the factorization phase.
+
+        Returns
+        -------
+        callable
+            See :func:`parallelise_sparse_factorized`.
+
+        """
+        if name not in self._parallelise:
+            if name == "form":
+                C, Ct, edges, fixed = self.C, self.Ct, self.edges, self.fixed
+            else:
+                C, Ct, edges, fixed = self._C, self._Ct, self._edges, self._fixed
+            key = (name, topology_fingerprint(edges, fixed)) if self.cache is not None else None
+            self._parallelise[name] = parallelise_sparse_factorized(Ct.dot(C), fixed, monitor=monitor, key=key, cache=self.cache)
+        return self._parallelise[name]
 
 
 def horizontal_numpy(
@@ -20,6 +227,10 @@ def horizontal_numpy(
     force: ForceDiagram,
     alpha: float = 100.0,
     kmax: int = 100,
+    monitor: Optional[Monitor] = None,
+    state: Optional[HorizontalState] = None,
+    changed: Optional[list[int]] = None,
+    tol: Optional[float] = None,
 ) -> tuple[FormDiagram, ForceDiagram]:
     r"""Compute horizontal equilibrium.
 
@@ -35,6 +246,22 @@ def horizontal_numpy(
         If 0.0, the target vectors are the edges of the force diagram.
     kmax : int, optional
        Maximum number of iterations (the default is 100).
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the phases and iterations of the solver.
+        Default is ``None``.
+    state : :class:`HorizontalState`, optional
+        The solver state of a previous solve of the same diagrams, for warm-starting the solver.
+        An empty state is filled with the data of this solve.
+        Default is ``None``, in which case nothing is reused from earlier solves,
+        not even the factorizations of diagrams with the same topology.
+        Use a state with a :class:`FactorizationCache` to share these.
+    changed : list[int], optional
+        The vertices of the form diagram that were moved since the previous solve with the same ``state``.
+        See :meth:`HorizontalState.update`.
+        Default is ``None``.
+    tol : float, optional
+        If provided, the iterations stop as soon as no vertex of either diagram moves more than this distance in an iteration.
+        Default is ``None``, in which case all ``kmax`` iterations are computed.
 
     Returns
     -------
@@ -53,132 +280,147 @@ def horizontal_numpy(
     with :math:`\mathbf{C}` the connectivity matrix and :math:`\mathbf{t}` the
     target vectors.
 
+    Examples
+    --------
+    Interactive editing, with a warm start after every move of a vertex.
+
+    >>> state = HorizontalState()
+    >>> horizontal_numpy(form, force, state=state)
+    >>> form.vertex_attributes(vertex, "xy", [x, y])
+    >>> horizontal_numpy(form, force, state=state, changed=[vertex], tol=1e-6)
+
     """
     # --------------------------------------------------------------------------
     # alpha == 1 : form diagram fixed
     # alpha == 0 : force diagram fixed
     # --------------------------------------------------------------------------
     alpha = max(0.0, min(1.0, float(alpha) / 100.0))
-    # --------------------------------------------------------------------------
-    # form diagram
-    # --------------------------------------------------------------------------
-    k_i = form.vertex_index()
-    uv_i = form.uv_index()
-    fixed = set(list(form.supports()) + list(form.fixed()))
-    fixed = [k_i[key] for key in fixed]
-    xy = array(form.vertices_attributes("xy"), dtype=float64)
-
-    edges = list(form.edges_where({"_is_edge": True}))
-    lmin = array(form.edges_attribute("lmin", keys=edges), dtype=float64).reshape((-1, 1))
-    lmax = array(form.edges_attribute("lmax", keys=edges), dtype=float64).reshape((-1, 1))
-    hmin = array(form.edges_attribute("hmin", keys=edges), dtype=float64).reshape((-1, 1))
-    hmax = array(form.edges_attribute("hmax", keys=edges), dtype=float64).reshape((-1, 1))
-    edges = [[k_i[u], k_i[v]] for u, v in edges]
-
-    C = connectivity_matrix(edges, "csr")
-    Ct = C.transpose()
-    CtC = Ct.dot(C)
-    # --------------------------------------------------------------------------
-    # force diagram
-    # --------------------------------------------------------------------------
-    _k_i = force.vertex_index()
-    _uv_i = force.uv_index(form=form)
-    _fixed = list(force.fixed())
-    _fixed = [_k_i[key] for key in _fixed]
-    _fixed = _fixed or [0]
-    _xy = array(force.vertices_attributes("xy"), dtype=float64)
-
-    _edges = force.ordered_edges(form)
-    _lmin = array(force.edges_attribute("lmin", keys=_edges), dtype=float64).reshape((-1, 1))
-    _lmax = array(force.edges_attribute("lmax", keys=_edges), dtype=float64).reshape((-1, 1))
-    _edges = [[_k_i[u], _k_i[v]] for u, v in _edges]
-
-    _C = connectivity_matrix(_edges, "csr")
-    _Ct = _C.transpose()
-    _Ct_C = _Ct.dot(_C)
-
-    scale = force.attributes.get("scale", 1.0)
-    # --------------------------------------------------------------------------
-    # rotate force diagram to make it parallel to the form diagram
-    # use CCW direction (opposite of cycle direction)
-    # --------------------------------------------------------------------------
-    _xy[:] = rot90(_xy, +1.0)
-    # --------------------------------------------------------------------------
-    # make the diagrams parallel to a target vector
-    # that is the (alpha) weighted average of the directions of corresponding
-    # edges of the two diagrams
-    # --------------------------------------------------------------------------
-    uv = C.dot(xy)
-    _uv = _C.dot(_xy)
-    l = normrow(uv)  # noqa: E741
-    _l = normrow(_uv)
-    t = alpha * normalizerow(uv) + (1 - alpha) * normalizerow(_uv)
-    # proper bounds
-    hmin /= scale
-    hmax /= scale
-    _lmin = where(hmin > _lmin, hmin, _lmin)
-    _lmax = where(hmax < _lmax, hmax, _lmax)
-    # parallelise
-    # add the outer loop to the parallelise function
-    for k in range(kmax):
-        # apply length bounds
-        apply_bounds(l, lmin, lmax)
-        apply_bounds(_l, _lmin, _lmax)
-        if alpha != 1.0:
-            # if emphasis is not entirely on the form
-            # update the form diagram
-            xy = parallelise_sparse(CtC, Ct.dot(l * t), xy, fixed, key="CtC")
+
+    monitor = monitor or Monitor()
+    with monitor.phase("horizontal_numpy"):
+        with monitor.phase("index"):
+            # --------------------------------------------------------------------------
+            # collect the data of the diagrams, unless a valid state is available
+            # --------------------------------------------------------------------------
+            if state is None:
+                state = HorizontalState()
+            if state.is_valid(form, force):
+                state.update(form, force, changed)
+            else:
+                state.initialize(form, force)
+
+            uv_i = state.uv_i
+            k_i = state.k_i
+            edges = state.edges
+            xy = state.xy
+            lmin = state.lmin
+            lmax = state.lmax
+            C = state.C
+            Ct = state.Ct
+
+            _uv_i = state._uv_i
+            _k_i = state._k_i
+            _xy = state._xy
+            _C = state._C
+            _Ct = state._Ct
+
+            scale = force.attributes.get("scale", 1.0)
+        with monitor.phase("assembly"):
+            # --------------------------------------------------------------------------
+            # rotate force diagram to make it parallel to the form diagram
+            # use CCW direction (opposite of cycle direction)
+            # --------------------------------------------------------------------------
+            _xy[:] = rot90(_xy, +1.0)
+            # --------------------------------------------------------------------------
+            # make the diagrams parallel to a target vector
+            # that is the (alpha) weighted average of the directions of corresponding
+            # edges of the two diagrams
+            # --------------------------------------------------------------------------
             uv = C.dot(xy)
-            l = normrow(uv)  # noqa: E741
-        if alpha != 0.0:
-            # if emphasis is not entirely on the force
-            # update the force diagram
-            _xy = parallelise_sparse(_Ct_C, _Ct.dot(_l * t), _xy, _fixed, key="_Ct_C")
             _uv = _C.dot(_xy)
+            l = normrow(uv)  # noqa: E741
             _l = normrow(_uv)
-    # --------------------------------------------------------------------------
-    # compute the force densities
-    # --------------------------------------------------------------------------
-    f = _l
-    q = (f / l).astype(float64)
-    # --------------------------------------------------------------------------
-    # rotate the force diagram 90 degrees in CW direction
-    # this way the relation between the two diagrams is easier to read
-    # --------------------------------------------------------------------------
-    _xy[:] = rot90(_xy, -1.0)
-    # --------------------------------------------------------------------------
-    # angle deviations
-    # note that this does not account for flipped edges!
-    # --------------------------------------------------------------------------
-    a = [angle_vectors_xy(uv[i], _uv[i], deg=True) for i in range(len(edges))]
-    # --------------------------------------------------------------------------
-    # update form
-    # --------------------------------------------------------------------------
-    attr: dict
-    for key, attr in form.vertices(data=True):  # type: ignore
-        i = k_i[key]
-        attr["x"] = xy[i, 0]
-        attr["y"] = xy[i, 1]
-    for (u, v), attr in form.edges_where({"_is_edge": True}, True):  # type: ignore
-        i = uv_i[(u, v)]  # type: ignore
-        attr["q"] = q[i, 0]
-        attr["_f"] = f[i, 0]
-        attr["_l"] = l[i, 0]
-        attr["_a"] = a[i]
-    # --------------------------------------------------------------------------
-    # update force
-    # --------------------------------------------------------------------------
-    for key, attr in force.vertices(True):  # type: ignore
-        i = _k_i[key]
-        attr["x"] = _xy[i, 0]
-        attr["y"] = _xy[i, 1]
-    for (u, v), attr in force.edges(True):  # type: ignore
-        if (u, v) in _uv_i:
-            i = _uv_i[(u, v)]  # type: ignore
-        else:
-            i = _uv_i[(v, u)]  # type: ignore
-        attr["_l"] = _l[i, 0]
-        attr["_a"] = a[i]
+            t = alpha * normalizerow(uv) + (1 - alpha) * normalizerow(_uv)
+            # proper bounds
+            hmin = state.hmin / scale
+            hmax = state.hmax / scale
+            _lmin = where(hmin > state._lmin, hmin, state._lmin)
+            _lmax = where(hmax < state._lmax, hmax, state._lmax)
+            # factorizations
+            if alpha != 1.0:
+                parallelise_form = state.parallelise("form", monitor=monitor)
+            if alpha != 0.0:
+                parallelise_force = state.parallelise("force", monitor=monitor)
+        with monitor.phase("iterations"):
+            # parallelise
+            # add the outer loop to the parallelise function
+            for k in range(kmax):
+                xy0 = xy.copy()
+                _xy0 = _xy.copy()
+                # apply length bounds
+                apply_bounds(l, lmin, lmax)
+                apply_bounds(_l, _lmin, _lmax)
+                if alpha != 1.0:
+                    # if emphasis is not entirely on the form
+                    # update the form diagram
+                    xy = parallelise_form(Ct.dot(l * t), xy)
+                    uv = C.dot(xy)
+                    l = normrow(uv)  # noqa: E741
+                if alpha != 0.0:
+                    # if emphasis is not entirely on the force
+                    # update the force diagram
+                    _xy = parallelise_force(_Ct.dot(_l * t), _xy)
+                    _uv = _C.dot(_xy)
+                    _l = normrow(_uv)
+                # the largest displacement of a vertex of either diagram
+                residual = max(normrow(xy - xy0).max(), normrow(_xy - _xy0).max())
+                monitor.iteration(k, residual)
+                if tol is not None and residual < tol:
+                    break
+        with monitor.phase("writeback"):
+            # --------------------------------------------------------------------------
+            # compute the force densities
+            # --------------------------------------------------------------------------
+            f = _l
+            q = (f / l).astype(float64)
+            # --------------------------------------------------------------------------
+            # rotate the force diagram 90 degrees in CW direction
+            # this way the relation between the two diagrams is easier to read
+            # --------------------------------------------------------------------------
+            _xy[:] = rot90(_xy, -1.0)
+            # --------------------------------------------------------------------------
+            # angle deviations
+            # note that this does not account for flipped edges!
+            # --------------------------------------------------------------------------
+            a = [angle_vectors_xy(uv[i], _uv[i], deg=True) for i in range(len(edges))]
+            # --------------------------------------------------------------------------
+            # update form
+            # --------------------------------------------------------------------------
+            attr: dict
+            for key, attr in form.vertices(data=True):  # type: ignore
+                i = k_i[key]
+                attr["x"] = xy[i, 0]
+                attr["y"] = xy[i, 1]
+            for (u, v), attr in form.edges_where({"_is_edge": True}, True):  # type: ignore
+                i = uv_i[(u, v)]  # type: ignore
+                attr["q"] = q[i, 0]
+                attr["_f"] = f[i, 0]
+                attr["_l"] = l[i, 0]
+                attr["_a"] = a[i]
+            # --------------------------------------------------------------------------
+            # update force
+            # --------------------------------------------------------------------------
+            for key, attr in force.vertices(True):  # type: ignore
+                i = _k_i[key]
+                attr["x"] = _xy[i, 0]
+                attr["y"] = _xy[i, 1]
+            for (u, v), attr in force.edges(True):  # type: ignore
+                if (u, v) in _uv_i:
+                    i = _uv_i[(u, v)]  # type: ignore
+                else:
+                    i = _uv_i[(v, u)]  # type: ignore
+                attr["_l"] = _l[i, 0]
+                attr["_a"] = a[i]
     # --------------------------------------------------------------------------
     # return to make rpc compatible
     # --------------------------------------------------------------------------
@@ -190,6 +432,11 @@ def horizontal_nodal_numpy(
     force: ForceDiagram,
     alpha: float = 100,
     kmax: int = 100,
+    monitor: Optional[Monitor] = None,
+    changed: Optional[list[int]] = None,
+    tol: Optional[float] = None,
+    max_workers: Optional[int] = None,
+    coloured: bool = False,
 ) -> tuple[FormDiagram, ForceDiagram]:
     """Compute horizontal equilibrium using a node-per-node approach.
 
@@ -205,6 +452,31 @@ def horizontal_nodal_numpy(
         If 0.0, the target vectors are the edges of the force diagram.
     kmax : int, optional
        Maximum number of iterations (the default is 100).
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the phases and iterations of the solver.
+        Default is ``None``.
+    changed : list[int], optional
+        The vertices of the form diagram that were moved, or of which the connected edges were modified,
+        since the diagrams were last in equilibrium.
+        If provided, only the neighbourhood of these vertices is updated,
+        using :func:`parallelise_edges_local` instead of :func:`parallelise_batched`,
+        and only the vertices and edges that were processed are written back to the diagrams.
+        The vertices are then processed one by one, which only pays off if the change dies out within ``tol``
+        in a region that is small compared to the diagram.
+        Default is ``None``.
+    tol : float, optional
+        The displacement of the vertices below which the iterations stop,
+        or, in combination with ``changed``, below which a local update stops propagating.
+        Default is ``None``, in which case all ``kmax`` iterations are performed,
+        and a local update stops propagating below a displacement of ``1e-6``.
+    max_workers : int, optional
+        The number of threads updating the vertices of the diagrams.
+        Default is ``None``, in which case the vertices are updated in the main thread.
+    coloured : bool, optional
+        If True, the diagrams are parallelised with the graph-coloured Gauss-Seidel scheme of :func:`parallelise_batched`,
+        which typically needs fewer iterations than the default Jacobi scheme, but more work per iteration.
+        Not used in combination with ``changed``, since local updates always use the current positions.
+        Default is False.
 
     Returns
     -------
@@ -215,158 +487,207 @@ def horizontal_nodal_numpy(
     """
     alpha = float(alpha) / 100.0
     alpha = max(0.0, min(1.0, alpha))
-    # --------------------------------------------------------------------------
-    # form diagram
-    # --------------------------------------------------------------------------
-    k_i = form.vertex_index()
-    uv_i = form.uv_index()
-    i_nbrs = {k_i[key]: [k_i[nbr] for nbr in form.vertex_neighbors(key)] for key in form.vertices()}
-    ij_e = {(k_i[u], k_i[v]): index for (u, v), index in iter(uv_i.items())}
-    fixed = set(list(form.supports()) + list(form.fixed()))
-    fixed = [k_i[key] for key in fixed]
-    edges = [[k_i[u], k_i[v]] for u, v in form.edges_where({"_is_edge": True})]
-    lmin = array(
-        [attr.get("lmin", 1e-7) for key, attr in form.edges_where({"_is_edge": True}, True)],  # type: ignore
-        dtype=float64,
-    ).reshape((-1, 1))
-    lmax = array(
-        [attr.get("lmax", 1e7) for key, attr in form.edges_where({"_is_edge": True}, True)],  # type: ignore
-        dtype=float64,
-    ).reshape((-1, 1))
-    hmin = array(
-        [attr.get("hmin", 1e-7) for key, attr in form.edges_where({"_is_edge": True}, True)],  # type: ignore
-        dtype=float64,
-    ).reshape((-1, 1))
-    hmax = array(
-        [attr.get("hmax", 1e7) for key, attr in form.edges_where({"_is_edge": True}, True)],  # type: ignore
-        dtype=float64,
-    ).reshape((-1, 1))
-    flipmask = array(
-        [1.0 if not attr["_is_tension"] else -1.0 for key, attr in form.edges_where({"_is_edge": True}, True)],  # type: ignore
-        dtype=float,
-    ).reshape((-1, 1))
-    xy = array(form.vertices_attributes("xy"), dtype=float64)
-    C = connectivity_matrix(edges, "csr")
-    # --------------------------------------------------------------------------
-    # force diagram
-    # --------------------------------------------------------------------------
-    _k_i = force.vertex_index()
-    _uv_i = force.uv_index(form=form)
-    _i_nbrs = {_k_i[key]: [_k_i[nbr] for nbr in force.vertex_neighbors(key)] for key in force.vertices()}
-    _ij_e = {(_k_i[u], _k_i[v]): index for (u, v), index in iter(_uv_i.items())}
-    _fixed = list(force.fixed())
-    _fixed = [_k_i[key] for key in _fixed]
-    _fixed = _fixed or [0]
-
-    _edges = force.ordered_edges(form)
-    _xy = array(force.vertices_attributes("xy"), dtype=float64)
-    _lmin = array([attr.get("lmin", 1e-7) for key, attr in force.edges(True)], dtype=float64).reshape((-1, 1))  # type: ignore
-    _lmax = array([attr.get("lmax", 1e7) for key, attr in force.edges(True)], dtype=float64).reshape((-1, 1))  # type: ignore
-    _edges = [[_k_i[u], _k_i[v]] for u, v in _edges]
-
-    _C = connectivity_matrix(_edges, "csr")
-    scale = force.attributes.get("scale", 1.0)
-    # --------------------------------------------------------------------------
-    # rotate force diagram to make it parallel to the form diagram
-    # use CCW direction (opposite of cycle direction)
-    # --------------------------------------------------------------------------
-    _xy[:] = rot90(_xy, +1.0)
-    # --------------------------------------------------------------------------
-    # make the diagrams parallel to a target vector
-    # that is the (alpha) weighted average of the directions of corresponding
-    # edges of the two diagrams
-    # --------------------------------------------------------------------------
-    uv = flipmask * C.dot(xy)
-    _uv = _C.dot(_xy)
-    l = normrow(uv)  # noqa: E741
-    _l = normrow(_uv)
-    # --------------------------------------------------------------------------
-    # the target vectors
-    # --------------------------------------------------------------------------
-    targets = alpha * normalizerow(uv) + (1 - alpha) * normalizerow(_uv)
-    # --------------------------------------------------------------------------
-    # proper force bounds
-    # --------------------------------------------------------------------------
-    hmin /= scale
-    hmax /= scale
-    _lmin = where(hmin > _lmin, hmin, _lmin)
-    _lmax = where(hmax < _lmax, hmax, _lmax)
-    # --------------------------------------------------------------------------
-    # parallelise
-    # --------------------------------------------------------------------------
-    if alpha < 1:
-        parallelise_nodal(
-            xy,
-            C,
-            targets,
-            i_nbrs,
-            ij_e,
-            fixed=fixed,
-            kmax=kmax,
-            lmin=lmin,
-            lmax=lmax,
-        )
-    if alpha > 0:
-        parallelise_nodal(
-            _xy,
-            _C,
-            targets,
-            _i_nbrs,
-            _ij_e,
-            kmax=kmax,
-            lmin=_lmin,
-            lmax=_lmax,
-        )
-    # --------------------------------------------------------------------------
-    # update the coordinate difference vectors
-    # --------------------------------------------------------------------------
-    uv = C.dot(xy)
-    _uv = _C.dot(_xy)
-    l = normrow(uv)  # noqa: E741
-    _l = normrow(_uv)
-    # --------------------------------------------------------------------------
-    # compute the force densities
-    # --------------------------------------------------------------------------
-    f = flipmask * _l
-    q = (f / l).astype(float64)
-    # --------------------------------------------------------------------------
-    # rotate the force diagram 90 degrees in CW direction
-    # this way the relation between the two diagrams is easier to read
-    # --------------------------------------------------------------------------
-    _xy[:] = rot90(_xy, -1.0)
-    # --------------------------------------------------------------------------
-    # angle deviations
-    # note that this does not account for flipped edges!
-    # --------------------------------------------------------------------------
-    a = [angle_vectors_xy(uv[i], _uv[i], deg=True) for i in range(len(edges))]
-    # --------------------------------------------------------------------------
-    # update form
-    # --------------------------------------------------------------------------
-    attr: dict
-    for key, attr in form.vertices(True):  # type: ignore
-        i = k_i[key]
-        attr["x"] = xy[i, 0]
-        attr["y"] = xy[i, 1]
-    for (u, v), attr in form.edges_where({"_is_edge": True}, True):  # type: ignore
-        i = uv_i[(u, v)]  # type: ignore
-        attr["q"] = q[i, 0]
-        attr["_f"] = f[i, 0]
-        attr["_l"] = l[i, 0]
-        attr["_a"] = a[i]
-    # --------------------------------------------------------------------------
-    # update force
-    # --------------------------------------------------------------------------
-    for key, attr in force.vertices(True):  # type: ignore
-        i = _k_i[key]
-        attr["x"] = _xy[i, 0]
-        attr["y"] = _xy[i, 1]
-    for (u, v), attr in force.edges(True):  # type: ignore
-        if (u, v) in _uv_i:
-            i = _uv_i[(u, v)]  # type: ignore
-        else:
-            i = _uv_i[(v, u)]  # type: ignore
-        attr["_l"] = _l[i, 0]
-        attr["_a"] = a[i]
+
+    monitor = monitor or Monitor()
+    with monitor.phase("horizontal_nodal_numpy"):
+        with monitor.phase("index"):
+            # --------------------------------------------------------------------------
+            # form diagram
+            # --------------------------------------------------------------------------
+            k_i = form.vertex_index()
+            # the edges and their attributes are collected in a single pass
+            index_uv = []
+            data = []
+            for edge, attr in form.edges_where({"_is_edge": True}, True):  # type: ignore
+                index_uv.append(edge)
+                data.append(
+                    [
+                        attr.get("lmin", 1e-7),
+                        attr.get("lmax", 1e7),
+                        attr.get("hmin", 1e-7),
+                        attr.get("hmax", 1e7),
+                        1.0 if not attr["_is_tension"] else -1.0,
+                    ]
+                )
+            uv_i = {uv: index for index, uv in enumerate(index_uv)}
+            i_nbrs = {k_i[key]: [k_i[nbr] for nbr in form.vertex_neighbors(key)] for key in form.vertices()}
+            ij_e = {(k_i[u], k_i[v]): index for (u, v), index in iter(uv_i.items())}
+            fixed = set(list(form.supports()) + list(form.fixed()))
+            fixed = [k_i[key] for key in fixed]
+            edges = [[k_i[u], k_i[v]] for u, v in index_uv]
+            data = array(data, dtype=float64).reshape((-1, 5))
+            lmin = data[:, [0]]
+            lmax = data[:, [1]]
+            hmin = data[:, [2]]
+            hmax = data[:, [3]]
+            flipmask = data[:, [4]]
+            xy = array(form.vertices_attributes("xy"), dtype=float64)
+            C = connectivity_matrix(edges, "csr")
+            # --------------------------------------------------------------------------
+            # force diagram
+            # --------------------------------------------------------------------------
+            _k_i = force.vertex_index()
+            _edges = force.ordered_edges(form)
+            _uv_i = {uv: index for index, uv in enumerate(_edges)}
+            _index_uv = _edges
+            _i_nbrs = {_k_i[key]: [_k_i[nbr] for nbr in force.vertex_neighbors(key)] for key in force.vertices()}
+            _ij_e = {(_k_i[u], _k_i[v]): index for (u, v), index in iter(_uv_i.items())}
+            _fixed = list(force.fixed())
+            _fixed = [_k_i[key] for key in _fixed]
+
+            _xy = array(force.vertices_attributes("xy"), dtype=float64)
+            _lmin = array([attr.get("lmin", 1e-7) for key, attr in force.edges(True)], dtype=float64).reshape((-1, 1))  # type: ignore
+            _lmax = array([attr.get("lmax", 1e7) for key, attr in force.edges(True)], dtype=float64).reshape((-1, 1))  # type: ignore
+            _edges = [[_k_i[u], _k_i[v]] for u, v in _edges]
+
+            _C = connectivity_matrix(_edges, "csr")
+            scale = force.attributes.get("scale", 1.0)
+        with monitor.phase("assembly"):
+            # --------------------------------------------------------------------------
+            # rotate force diagram to make it parallel to the form diagram
+            # use CCW direction (opposite of cycle direction)
+            # --------------------------------------------------------------------------
+            _xy[:] = rot90(_xy, +1.0)
+            # --------------------------------------------------------------------------
+            # make the diagrams parallel to a target vector
+            # that is the (alpha) weighted average of the directions of corresponding
+            # edges of the two diagrams
+            # --------------------------------------------------------------------------
+            uv = flipmask * C.dot(xy)
+            _uv = _C.dot(_xy)
+            l = normrow(uv)  # noqa: E741
+            _l = normrow(_uv)
+            # --------------------------------------------------------------------------
+            # the target vectors
+            # --------------------------------------------------------------------------
+            targets = alpha * normalizerow(uv) + (1 - alpha) * normalizerow(_uv)
+            # --------------------------------------------------------------------------
+            # proper force bounds
+            # --------------------------------------------------------------------------
+            hmin /= scale
+            hmax /= scale
+            _lmin = where(hmin > _lmin, hmin, _lmin)
+            _lmax = where(hmax < _lmax, hmax, _lmax)
+        with monitor.phase("iterations"):
+            # --------------------------------------------------------------------------
+            # parallelise
+            # --------------------------------------------------------------------------
+            if changed is not None:
+                # only the neighbourhood of the changed vertices is updated
+                # the changed vertices and their neighbours are the vertices of the form edges with new targets
+                # the corresponding force edges are the duals of these edges
+                # the vertices are processed one by one, on lists rather than arrays to avoid the overhead of indexing arrays
+                changed = [k_i[key] for key in changed]
+                incident = _incident_edges(changed, i_nbrs, ij_e)
+                moved = set(changed)
+                _moved = set()
+                target_list = targets.tolist()
+                local_tol = 1e-6 if tol is None else tol
+                if alpha < 1:
+                    xy_list = xy.tolist()
+                    moved |= parallelise_edges_local(
+                        xy_list,
+                        target_list,
+                        i_nbrs,
+                        ij_e,
+                        [i for e in incident for i in edges[e]],
+                        fixed=fixed,
+                        kmax=kmax,
+                        tol=local_tol,
+                        lmin=lmin[:, 0].tolist(),
+                        lmax=lmax[:, 0].tolist(),
+                        monitor=monitor,
+                    )
+                    xy[:] = xy_list
+                if alpha > 0:
+                    _xy_list = _xy.tolist()
+                    _moved = parallelise_edges_local(
+                        _xy_list,
+                        target_list,
+                        _i_nbrs,
+                        _ij_e,
+                        [i for e in incident for i in _edges[e]],
+                        fixed=_fixed,
+                        kmax=kmax,
+                        tol=local_tol,
+                        lmin=_lmin[:, 0].tolist(),
+                        lmax=_lmax[:, 0].tolist(),
+                        monitor=monitor,
+                    )
+                    _xy[:] = _xy_list
+                vertices = moved
+                _vertices = _moved
+                indices = _incident_edges(moved, i_nbrs, ij_e) | _incident_edges(_moved, _i_nbrs, _ij_e)
+            else:
+                vertices = range(xy.shape[0])
+                _vertices = range(_xy.shape[0])
+                indices = range(len(edges))
+            if changed is None and alpha < 1:
+                parallelise_batched(
+                    xy,
+                    C,
+                    targets,
+                    fixed=fixed,
+                    kmax=kmax,
+                    tol=tol,
+                    lmin=lmin,
+                    lmax=lmax,
+                    coloured=coloured,
+                    max_workers=max_workers,
+                    monitor=monitor,
+                )
+            if changed is None and alpha > 0:
+                parallelise_batched(
+                    _xy,
+                    _C,
+                    targets,
+                    kmax=kmax,
+                    tol=tol,
+                    lmin=_lmin,
+                    lmax=_lmax,
+                    coloured=coloured,
+                    max_workers=max_workers,
+                    monitor=monitor,
+                )
+        with monitor.phase("writeback"):
+            # --------------------------------------------------------------------------
+            # update the coordinate difference vectors
+            # --------------------------------------------------------------------------
+            uv = C.dot(xy)
+            _uv = _C.dot(_xy)
+            l = normrow(uv)  # noqa: E741
+            _l = normrow(_uv)
+            # --------------------------------------------------------------------------
+            # compute the force densities
+            # --------------------------------------------------------------------------
+            f = flipmask * _l
+            q = (f / l).astype(float64)
+            # --------------------------------------------------------------------------
+            # rotate the force diagram 90 degrees in CW direction
+            # this way the relation between the two diagrams is easier to read
+            # --------------------------------------------------------------------------
+            _xy[:] = rot90(_xy, -1.0)
+            # --------------------------------------------------------------------------
+            # angle deviations
+            # note that this does not account for flipped edges!
+            # --------------------------------------------------------------------------
+            a = [angle_vectors_xy(uv[i], _uv[i], deg=True) for i in range(len(edges))]
+            # --------------------------------------------------------------------------
+            # update form
+            # --------------------------------------------------------------------------
+            i_k = list(form.vertices())
+            for i in vertices:
+                form.vertex_attributes(i_k[i], "xy", xy[i].tolist())
+            for i in indices:
+                form.edge_attributes(index_uv[i], ["q", "_f", "_l", "_a"], [q[i, 0], f[i, 0], l[i, 0], a[i]])
+            # --------------------------------------------------------------------------
+            # update force
+            # --------------------------------------------------------------------------
+            _i_k = list(force.vertices())
+            for i in _vertices:
+                force.vertex_attributes(_i_k[i], "xy", _xy[i].tolist())
+            for i in indices:
+                force.edge_attributes(_index_uv[i], ["_l", "_a"], [_l[i, 0], a[i]])
     # --------------------------------------------------------------------------
     # return to make rpc compatible
     # --------------------------------------------------------------------------
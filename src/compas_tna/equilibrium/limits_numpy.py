@@ -0,0 +1,341 @@
+from typing import TYPE_CHECKING
+from typing import Optional
+
+from numpy import abs as npabs
+from numpy import array
+from numpy import concatenate
+from numpy import float64
+from numpy import inf
+from numpy import maximum
+from numpy import minimum
+from numpy import ones
+from numpy import sign
+from numpy import zeros
+from scipy.linalg import lstsq
+from scipy.optimize import linprog
+from scipy.sparse import csr_matrix
+from scipy.sparse import diags
+from scipy.sparse import eye
+from scipy.sparse import hstack
+
+from compas.linalg import normrow
+from compas.matrices import equilibrium_matrix
+from compas_tna.diagrams import FormDiagram
+
+from .bestfit_numpy import _free_values
+from .bestfit_numpy import independent_edges_matrix
+from .diagrams import form_identify_dof
+from .diagrams import update_z
+from .monitor import Monitor
+from .sensitivity_numpy import VerticalSensitivity
+from .vertical_numpy import VerticalProblem
+
+if TYPE_CHECKING:
+    from compas_tna.envelope import Envelope
+
+
+def thrust_limits(
+    form: FormDiagram,
+    envelope: Optional["Envelope"] = None,
+    density: float = 1.0,
+    ind: Optional[list[int]] = None,
+    kmax: int = 100,
+    tol: float = 1e-6,
+    rtol: float = 1e-6,
+    display: bool = False,
+    monitor: Optional[Monitor] = None,
+    problem: Optional[VerticalProblem] = None,
+) -> tuple[tuple[FormDiagram, float, bool, float], tuple[FormDiagram, float, bool, float]]:
+    """Compute the thrust networks with the minimum and maximum horizontal thrust that fit within an envelope.
+
+    The horizontal thrust is the sum of the magnitudes of the horizontal reactions at the supports.
+    The heights of the free vertices are constrained by the vertex attributes ``"ub"`` and ``"lb"``,
+    and the horizontal forces of the edges by the edge attributes ``"hmin"`` and ``"hmax"``.
+    If the supports have the attribute ``"b"``, the reactions are constrained to pass within these horizontal offsets
+    from the supports, at the level ``z = 0``.
+
+    Parameters
+    ----------
+    form : :class:`FormDiagram`
+        The form diagram, in horizontal equilibrium.
+        The force densities and heights stored in the diagram are the starting point of the search,
+        for example after :func:`vertical_from_zmax` or :func:`vertical_bestfit`.
+    envelope : :class:`Envelope`, optional
+        The envelope of the structure.
+        If provided, its bounds are applied to the form diagram with :meth:`Envelope.apply_bounds_to_formdiagram`.
+        Default is ``None``, in which case the bounds already stored in the diagram are used.
+    density : float, optional
+        The density for computation of the self-weight of the thrust network.
+        Set this to 0.0 if the self-weight is applied as loads, for example with :meth:`Envelope.apply_selfweight_to_formdiagram`.
+        Default is ``1.0``.
+    ind : list[int], optional
+        The indices of the independent edges, in the order of :meth:`FormDiagram.uv_index`.
+        Default is ``None``, in which case they are identified with :func:`form_identify_dof`.
+    kmax : int, optional
+        The maximum number of linear programs per search,
+        and of iterations of the computation of vertical equilibrium with the self-weight in every evaluation.
+        Default is ``100``.
+    tol : float, optional
+        The stopping criterion, relative to the horizontal thrust.
+        Default is ``1e-6``.
+    rtol : float, optional
+        The stopping criterion for computing vertical equilibrium with the self-weight in every evaluation,
+        and the violation of the constraints that is accepted in a converged search,
+        relative to the largest height of the starting point.
+        Default is ``1e-6``.
+    display : bool, optional
+        If True, information about the iterations will be displayed.
+        Default is False.
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the phases and iterations of the solver.
+        Default is ``None``.
+    problem : :class:`VerticalProblem`, optional
+        The precompiled vertical problem of the form diagram.
+        Default is ``None``.
+
+    Returns
+    -------
+    tuple[tuple[:class:`FormDiagram`, float, bool, float], tuple[:class:`FormDiagram`, float, bool, float]]
+        The results of the searches for the minimum and the maximum thrust.
+        Every result consists of the thrust network, as a copy of the form diagram,
+        its scale, i.e. its horizontal thrust relative to that of the starting point,
+        whether the search converged,
+        and the largest violation of the constraints by the network.
+        A search has converged if the linearized problem predicts no further improvement
+        and the network satisfies the constraints.
+        It has not converged if it reached ``kmax`` linear programs, if a linear program failed,
+        if the trust region collapsed, or if no network satisfying the constraints was found,
+        for example because the bounds are infeasible.
+        The networks of searches that have not converged are the best networks found, and not limits.
+
+    Notes
+    -----
+    The force densities of all edges are a linear function of those of the independent edges (see :func:`independent_edges_matrix`),
+    and so are the horizontal reactions.
+    The heights of the vertices and the vertical reactions are not.
+    Both searches are therefore solved with sequential linear programming in a trust region of the independent force densities.
+    In every iteration, the Jacobians of the heights and the vertical reactions are computed with :class:`VerticalSensitivity`,
+    reusing the factorization of the vertical system of the current point,
+    and the linearized problem is solved with the HiGHS solver of :func:`scipy.optimize.linprog`.
+    The constraints of the linear programs are elastic,
+    such that the search can start from a thrust network that does not fit within the envelope.
+    Sequential linear programming finds local optima, which depend on the starting point.
+
+    Examples
+    --------
+    >>> form, _ = vertical_from_zmax(form, 3.0)
+    >>> (form_min, scale_min, converged_min, _), (form_max, scale_max, converged_max, _) = thrust_limits(form, envelope)
+
+    """
+    monitor = monitor or Monitor()
+    with monitor.phase("thrust_limits"):
+        with monitor.phase("index"):
+            if envelope is not None:
+                envelope.apply_bounds_to_formdiagram(form)
+
+            if problem is None:
+                problem = VerticalProblem(form)
+            else:
+                problem.check(form)
+
+            free = problem.free
+            fixed = problem.fixed
+            C = problem.C
+            xyz, thick, p, q = problem.data(form)
+
+            upper, ub = _free_values(form, problem, "ub")
+            lower, lb = _free_values(form, problem, "lb")
+            hmin = array(form.edges_attribute("hmin", keys=problem.edges), dtype=float64)
+            hmax = array(form.edges_attribute("hmax", keys=problem.edges), dtype=float64)
+
+            vertices = list(form.vertices())
+            bounded = []
+            b = []
+            for i, index in enumerate(fixed):
+                offset = form.vertex_attribute(vertices[index], "b")
+                if offset is not None:
+                    bounded.append(i)
+                    b.append(offset)
+            b = npabs(array(b, dtype=float64).reshape((-1, 2)))
+        with monitor.phase("assembly"):
+            # --------------------------------------------------------------------------
+            # independent edges
+            # the horizontal reactions are linear in the independent force densities
+            # --------------------------------------------------------------------------
+            if ind is None:
+                ind = form_identify_dof(form)
+            E = equilibrium_matrix(C, xyz, free, "csr")
+            T = independent_edges_matrix(E, ind)
+            L = normrow(C.dot(xyz[:, :2])) * T
+            # the edges between two fixed vertices do not take part in the equilibrium of the free vertices
+            # they are excluded from the reactions, and their force densities are not changed
+            uv = C.dot(xyz[:, :2])
+            inactive = npabs(C[:, free]).sum(axis=1).A1 == 0
+            uv[inactive] = 0.0
+            frozen = inactive[ind]
+            Cft = C[:, fixed].transpose()
+            Rx = Cft.dot(diags([uv[:, 0]], [0])).dot(T)
+            Ry = Cft.dot(diags([uv[:, 1]], [0])).dot(T)
+            px = p[fixed, 0]
+            py = p[fixed, 1]
+            # --------------------------------------------------------------------------
+            # loads and sensitivities
+            # --------------------------------------------------------------------------
+            p0 = array(p, copy=True)
+            sensitivity = VerticalSensitivity(form, density=density, tol=rtol, problem=problem)
+            update_loads = problem.loads(p0, thick, density)
+        # --------------------------------------------------------------------------
+        # evaluations
+        # --------------------------------------------------------------------------
+        zb = xyz[fixed, 2][bounded]
+
+        def evaluate(x):
+            qx = T.dot(x).reshape((-1, 1))
+            try:
+                system, factor = problem.system(qx, monitor=monitor)
+            except RuntimeError:
+                # the system is singular if all edges of a free vertex have zero force density
+                return inf, None, None
+            update_z(xyz, None, C, p, free, fixed, update_loads, tol=rtol, kmax=kmax, monitor=monitor, system=system, scale=factor)
+            rx = Rx.dot(x) - px
+            ry = Ry.dot(x) - py
+            rz = factor * system[2].dot(xyz[:, 2])[fixed] - p[fixed, 2]
+            thrust = ((rx**2 + ry**2) ** 0.5).sum()
+            h = L.dot(x)
+            g = [h - hmin, hmax - h, ub - xyz[upper, 2], xyz[lower, 2] - lb]
+            if bounded:
+                # the horizontal offset of the reaction at z = 0 is z * rh / rz
+                rzb = npabs(rz[bounded])
+                g += [b[:, 0] * rzb - npabs(zb * rx[bounded]), b[:, 1] * rzb - npabs(zb * ry[bounded])]
+            return thrust, concatenate(g), (rx, ry, rz)
+
+        def linearize(x, reactions):
+            rx, ry, rz = reactions
+            sensitivity.update(xyz, T.dot(x).reshape((-1, 1)))
+            dz = sensitivity.jvp(T)
+            rh = (rx**2 + ry**2) ** 0.5
+            nonzero = rh > 0
+            wx = zeros(rh.shape[0])
+            wy = zeros(rh.shape[0])
+            wx[nonzero] = rx[nonzero] / rh[nonzero]
+            wy[nonzero] = ry[nonzero] / rh[nonzero]
+            gradient = Rx.transpose().dot(wx) + Ry.transpose().dot(wy)
+            G = [L, -L, -dz[upper], dz[lower]]
+            if bounded:
+                drz = sensitivity.reactions_jvp(T)[fixed][bounded]
+                srz = sign(rz[bounded]).reshape((-1, 1))
+                sx = sign(zb * rx[bounded]).reshape((-1, 1))
+                sy = sign(zb * ry[bounded]).reshape((-1, 1))
+                dx = zb.reshape((-1, 1)) * Rx[bounded]
+                dy = zb.reshape((-1, 1)) * Ry[bounded]
+                G += [b[:, [0]] * srz * drz - sx * dx, b[:, [1]] * srz * drz - sy * dy]
+            return gradient, concatenate(G)
+
+        # --------------------------------------------------------------------------
+        # searches
+        # --------------------------------------------------------------------------
+        x0 = q[ind, 0]
+        xyz0 = array(xyz, copy=True)
+        p_0 = array(p, copy=True)
+        thrust0, g0, reactions0 = evaluate(x0)
+        # the cost of a unit of violation of the constraints in the merit function
+        # and the violation that is accepted in the result
+        height = max(1.0, float(npabs(xyz[:, 2]).max()))
+        penalty = 1e3 * max(thrust0, 1.0) / height
+        feasibility = rtol * height
+
+        results = []
+        for direction, name in ((1.0, "min"), (-1.0, "max")):
+            with monitor.phase(name):
+                xyz[:] = xyz0
+                p[:] = p_0
+                x = array(x0, copy=True)
+                thrust, g, reactions = thrust0, g0, reactions0
+                merit = direction * thrust + penalty * maximum(0.0, -g).sum()
+                radius = 0.5
+                linearization = None
+                stationary = False
+
+                for k in range(kmax):
+                    if display:
+                        print(name, k, thrust, maximum(0.0, -g).sum())
+
+                    if linearization is None:
+                        linearization = linearize(x, reactions)
+                    gradient, G = linearization
+                    # elastic linear program in the step and the violations of the constraints
+                    # minimize direction * gradient^T s + penalty * sum(v)
+                    # subject to G s + g + v >= 0, |s| <= radius * |x|, v >= 0
+                    nc = g.shape[0]
+                    n = x.shape[0]
+                    width = radius * maximum(npabs(x), 1e-3 * npabs(x).max())
+                    width[frozen] = 0.0
+                    c = concatenate((direction * gradient, penalty * ones(nc)))
+                    A = hstack((csr_matrix(-G), -eye(nc, format="csr")), format="csr")
+                    bounds = [(-w, w) for w in width] + [(0, None)] * nc
+                    lp = linprog(c, A_ub=A, b_ub=g, bounds=bounds, method="highs")
+                    if lp.status != 0:
+                        break
+
+                    step = lp.x[:n]
+                    predicted = merit - (direction * (thrust + gradient.dot(step)) + penalty * lp.x[n:].sum())
+                    if predicted <= tol * max(thrust, 1.0):
+                        stationary = True
+                        break
+
+                    xyzk = array(xyz, copy=True)
+                    pk = array(p, copy=True)
+                    thrust1, g1, reactions1 = evaluate(x + step)
+                    merit1 = direction * thrust1 + penalty * maximum(0.0, -g1).sum() if g1 is not None else inf
+                    ratio = (merit - merit1) / predicted
+
+                    if ratio <= 0.1 and g1 is not None and (g1 < minimum(g, 0.0)).any():
+                        # second-order correction
+                        # the least-norm step that removes the violations caused by the curvature of the constraints
+                        violated = g1 < minimum(g, 0.0)
+                        step = step + lstsq(G[violated], -g1[violated])[0]
+                        thrust1, g1, reactions1 = evaluate(x + step)
+                        merit1 = direction * thrust1 + penalty * maximum(0.0, -g1).sum() if g1 is not None else inf
+                        ratio = (merit - merit1) / predicted
+
+                    if ratio > 0.1:
+                        x = x + step
+                        thrust, g, reactions, merit = thrust1, g1, reactions1, merit1
+                        linearization = None
+                        if ratio > 0.75:
+                            radius = min(2 * radius, 10.0)
+                    else:
+                        xyz[:] = xyzk
+                        p[:] = pk
+                        radius /= 4
+                        if radius < 1e-8:
+                            break
+
+                    monitor.iteration(k, thrust)
+
+            violation = float(maximum(0.0, -g).max()) if g.shape[0] else 0.0
+            converged = stationary and violation <= feasibility
+            network = _network(form, problem, T.dot(x).reshape((-1, 1)), xyz, p)
+            results.append((network, thrust / thrust0 if thrust0 else 0.0, converged, violation))
+
+    return results[0], results[1]
+
+
+def _network(form, problem, q, xyz, p):
+    # a copy of the form diagram with the given force densities and heights
+    C = problem.C
+    system, factor = problem.system(q)
+    r = factor * system[2].dot(xyz) - p
+    f = q * normrow(C.dot(xyz))
+
+    network = form.copy()
+    for vertex in network.vertices():
+        index = problem.k_i[vertex]
+        network.vertex_attribute(vertex, "z", xyz[index, 2])
+        network.vertex_attributes(vertex, ["_rx", "_ry", "_rz"], r[index])
+
+    for edge in network.edges_where({"_is_edge": True}):
+        index = problem.uv_i[edge]  # type: ignore
+        network.edge_attributes(edge, ["q", "_f"], [q[index, 0], f[index, 0]])
+
+    return network
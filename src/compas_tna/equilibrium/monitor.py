@@ -0,0 +1,197 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from typing import Optional
+
+
+class Monitor:
+    """Base class for monitoring the equilibrium solvers.
+
+    The solvers report the start and end of every phase of the computation,
+    and the progress of their iterations, to the monitor they receive.
+    Phases can be nested.
+    The base class ignores all events,
+    and is used by the solvers if no monitor is provided.
+
+    The phases reported by the solvers are
+
+    * the solver itself, for example ``"horizontal_numpy"``,
+    * ``"index"``: building the index maps and collecting the data from the diagrams,
+    * ``"assembly"``: assembling the matrices,
+    * ``"factorization"``: factorizing matrices,
+    * ``"iterations"``: the iterations of the solver,
+    * ``"update_z"``: the iterative computation of the heights of the vertices for given force densities,
+    * ``"solve"``: the call to an external solver,
+    * ``"writeback"``: computing derived quantities and writing the results back to the diagrams.
+
+    The solvers enter their phases with :meth:`phase`,
+    such that the end of a phase is also registered if the solver raises an exception.
+
+    Examples
+    --------
+    >>> class PrintMonitor(Monitor):
+    ...     def iteration(self, k, residual=None):
+    ...         print(k, residual)
+    >>> horizontal_numpy(form, force, monitor=PrintMonitor())
+
+    """
+
+    def start(self, phase: str) -> None:
+        """Register the start of a phase.
+
+        Parameters
+        ----------
+        phase : str
+            The name of the phase.
+
+        Returns
+        -------
+        None
+
+        """
+        pass
+
+    def stop(self, phase: str) -> None:
+        """Register the end of a phase.
+
+        Parameters
+        ----------
+        phase : str
+            The name of the phase.
+
+        Returns
+        -------
+        None
+
+        """
+        pass
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Register the start of a phase, and its end when the context is left, also if the context is left with an exception.
+
+        Parameters
+        ----------
+        phase : str
+            The name of the phase.
+
+        Examples
+        --------
+        >>> with monitor.phase("assembly"):
+        ...     A = C.T.dot(Q).dot(C)
+
+        """
+        self.start(phase)
+        try:
+            yield
+        finally:
+            self.stop(phase)
+
+    def iteration(self, k: int, residual: Optional[float] = None) -> None:
+        """Register an iteration of the current phase.
+
+        Parameters
+        ----------
+        k : int
+            The iteration counter.
+        residual : float, optional
+            The residual, or another measure of convergence, after the iteration.
+
+        Returns
+        -------
+        None
+
+        """
+        pass
+
+
+class Collector(Monitor):
+    """Monitor collecting the timings and iterations of all phases.
+
+    Phases are identified by their path: the names of the enclosing phases and the phase itself, separated by slashes.
+    The data of repeated phases with the same path is accumulated.
+
+    Attributes
+    ----------
+    phases : dict[str, dict]
+        Per phase path, the number of ``calls``, the total ``time`` in seconds,
+        the number of ``iterations``, and the ``residuals`` reported by the iterations.
+
+    Examples
+    --------
+    >>> collector = Collector()
+    >>> horizontal_numpy(form, force, monitor=collector)
+    >>> vertical_from_zmax(form, 3.0, monitor=collector)
+    >>> print(collector.summary())
+
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self._stack = []
+
+    def __str__(self):
+        return self.summary()
+
+    def _path(self) -> str:
+        return "/".join(name for name, _ in self._stack)
+
+    def reset(self) -> None:
+        """Remove all collected data.
+
+        Returns
+        -------
+        None
+
+        """
+        self.phases = {}
+        self._stack = []
+
+    def start(self, phase: str) -> None:
+        self._stack.append((phase, time.perf_counter()))
+        path = self._path()
+        if path not in self.phases:
+            self.phases[path] = {"calls": 0, "time": 0.0, "iterations": 0, "residuals": []}
+        self.phases[path]["calls"] += 1
+
+    def stop(self, phase: str) -> None:
+        if not self._stack or self._stack[-1][0] != phase:
+            raise ValueError("The phase {} is not the current phase.".format(phase))
+        path = self._path()
+        _, t0 = self._stack.pop()
+        self.phases[path]["time"] += time.perf_counter() - t0
+
+    def iteration(self, k: int, residual: Optional[float] = None) -> None:
+        if not self._stack:
+            return
+        data = self.phases[self._path()]
+        data["iterations"] += 1
+        if residual is not None:
+            data["residuals"].append(residual)
+
+    def summary(self) -> str:
+        """Compile a table of the collected data.
+
+        Returns
+        -------
+        str
+
+        """
+        total = sum(data["time"] for path, data in self.phases.items() if "/" not in path) or 1.0
+        header = "{:<48} {:>6} {:>12} {:>7} {:>10} {:>14}".format("phase", "calls", "time [s]", "%", "iterations", "residual")
+        lines = [header, "-" * len(header)]
+        for path, data in self.phases.items():
+            depth = path.count("/")
+            name = "  " * depth + path.split("/")[-1]
+            residual = "{:.6e}".format(data["residuals"][-1]) if data["residuals"] else "-"
+            lines.append(
+                "{:<48} {:>6} {:>12.6f} {:>7.1f} {:>10} {:>14}".format(
+                    name,
+                    data["calls"],
+                    data["time"],
+                    100 * data["time"] / total,
+                    data["iterations"] or "-",
+                    residual,
+                )
+            )
+        return "\n".join(lines)
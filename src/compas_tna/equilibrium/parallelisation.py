@@ -1,6 +1,50 @@
 from compas.geometry import midpoint_point_point_xy
 
 
+def vertex_colors(n, edges, fixed=None):
+    """Color the free vertices of a graph such that no two adjacent vertices have the same color.
+
+    Parameters
+    ----------
+    n : int
+        The number of vertices.
+    edges : list[tuple[int, int]]
+        The edges as pairs of vertex indices.
+    fixed : list[int], optional
+        Vertices that are not colored.
+
+    Returns
+    -------
+    list[list[int]]
+        The vertices per color.
+
+    Notes
+    -----
+    The vertices are colored greedily, in order, with the first color not used by any of their neighbours.
+    Unlike :func:`compas.topology.vertex_coloring`, this takes linear time in the size of the graph.
+
+    """
+    fixed = set(fixed or [])
+    nbrs = [[] for _ in range(n)]
+    for i, j in edges:
+        nbrs[i].append(j)
+        nbrs[j].append(i)
+    color = [-1] * n
+    colors = []
+    for i in range(n):
+        if i in fixed or not nbrs[i]:
+            continue
+        used = set(color[j] for j in nbrs[i])
+        c = 0
+        while c in used:
+            c += 1
+        color[i] = c
+        if c == len(colors):
+            colors.append([])
+        colors[c].append(i)
+    return colors
+
+
 def parallelise_edges(
     xy,
     edges,
@@ -12,6 +56,9 @@ def parallelise_edges(
     lmin=None,
     lmax=None,
     callback=None,
+    monitor=None,
+    coloured=False,
+    tol=None,
 ):
     """Parallelise the edges of a mesh to given target vectors.
 
@@ -42,11 +89,34 @@ def parallelise_edges(
     callback : callable, optional
         A user-defined callback function to be executed after every iteration.
         Default is ``None``.
+    monitor : :class:`compas_tna.equilibrium.Monitor`, optional
+        A monitor receiving the iterations, with the largest displacement of a vertex per iteration.
+        Default is ``None``.
+    coloured : bool, optional
+        If True, update the vertices with a graph-coloured Gauss-Seidel scheme.
+        Otherwise, update all vertices with the Jacobi scheme.
+        Default is False.
+    tol : float, optional
+        If provided, the iterations stop as soon as no vertex moves more than this distance in an iteration.
+        Default is ``None``.
 
     Returns
     -------
     None
 
+    Notes
+    -----
+    Every free vertex is moved to the average of the positions proposed by the edges connecting it to its neighbours.
+    Neighbours that are not connected by one of the edges, for example by an edge that is not an ``_is_edge`` edge of a form diagram,
+    do not contribute, and vertices without edges are not moved.
+
+    In the Jacobi scheme, all vertices are updated from the positions and edge lengths at the start of the iteration.
+    In the graph-coloured Gauss-Seidel scheme, the free vertices are colored such that no two neighbours have the same color
+    (see :func:`vertex_colors`), and are updated color by color,
+    from the current positions of their neighbours and the current lengths of their edges.
+    The Gauss-Seidel scheme propagates changes faster and typically needs fewer iterations.
+    :func:`compas_tna.equilibrium.parallelisation_numpy.parallelise_batched` updates the vertices of every color as one vectorized batch.
+
     Examples
     --------
     >>>
@@ -61,6 +131,11 @@ def parallelise_edges(
 
     n = len(xy)
 
+    if coloured:
+        order = [j for color in vertex_colors(n, edges, fixed) for j in color]
+    else:
+        order = [j for j in range(n) if j not in fixed]
+
     for k in range(kmax):
         xy0 = [[x, y] for x, y in xy]
         uv = [[xy[j][0] - xy[i][0], xy[j][1] - xy[i][1]] for i, j in edges]
@@ -72,32 +147,43 @@ def parallelise_edges(
         if lmax:
             lengths[:] = [min(a, b) for a, b in zip(lengths, lmax)]
 
-        for j in range(n):
-            if j in fixed:
-                continue
+        # the Gauss-Seidel scheme uses the current positions
+        source = xy if coloured else xy0
 
-            nbrs = i_nbrs[j]
+        for j in order:
             x, y = 0.0, 0.0
+            count = 0
 
-            for i in nbrs:
-                ax, ay = xy0[i]
-
+            for i in i_nbrs[j]:
                 if (i, j) in ij_e:
                     e = ij_e[(i, j)]
-                    l = lengths[e]  # noqa: E741
-                    tx, ty = targets[e]
-                    x += ax + l * tx
-                    y += ay + l * ty
-
-                else:
+                    sign = 1.0
+                elif (j, i) in ij_e:
                     e = ij_e[(j, i)]
-                    l = lengths[e]  # noqa: E741
-                    tx, ty = targets[e]
-                    x += ax - l * tx
-                    y += ay - l * ty
+                    sign = -1.0
+                else:
+                    continue
+
+                ax, ay = source[i]
+                l = lengths[e]  # noqa: E741
+
+                if coloured:
+                    l = ((xy[j][0] - ax) ** 2 + (xy[j][1] - ay) ** 2) ** 0.5  # noqa: E741
 
-            xy[j][0] = x / len(nbrs)
-            xy[j][1] = y / len(nbrs)
+                    if lmin:
+                        l = max(l, lmin[e])  # noqa: E741
+
+                    if lmax:
+                        l = min(l, lmax[e])  # noqa: E741
+
+                tx, ty = targets[e]
+                x += ax + sign * l * tx
+                y += ay + sign * l * ty
+                count += 1
+
+            if count:
+                xy[j][0] = x / count
+                xy[j][1] = y / count
 
         for i, j in ij_e:
             e = ij_e[(i, j)]
@@ -109,3 +195,144 @@ def parallelise_edges(
 
         if callback:
             callback(k, xy, edges)
+
+        if monitor or tol is not None:
+            residual = max([((x - x0) ** 2 + (y - y0) ** 2) ** 0.5 for (x, y), (x0, y0) in zip(xy, xy0)] or [0.0])
+
+            if monitor:
+                monitor.iteration(k, residual)
+
+            if tol is not None and residual < tol:
+                break
+
+
+def parallelise_edges_local(
+    xy,
+    targets,
+    i_nbrs,
+    ij_e,
+    active,
+    fixed=None,
+    kmax=100,
+    tol=1e-6,
+    lmin=None,
+    lmax=None,
+    monitor=None,
+):
+    """Parallelise the edges of a mesh to given target vectors,
+    processing only the vertices in the neighbourhood of a local change.
+
+    Parameters
+    ----------
+    xy : list
+        The XY coordinates of the vertices.
+    targets : list
+        A target vector for every edge.
+    i_nbrs : dict
+        A list of neighbours per vertex.
+    ij_e : dict
+        An edge index per vertex pair.
+    active : list
+        The vertices that are processed first,
+        typically the vertices of which the neighbourhood or the target vectors of the connected edges have changed.
+    fixed : list, optional
+        The fixed nodes of the mesh.
+        Default is ``None``.
+    kmax : int, optional
+        Maximum number of rounds.
+        Default is ``100``.
+    tol : float, optional
+        A vertex that moves more than this distance when processed queues its neighbours for the next round.
+        Default is ``1e-6``.
+    lmin : list, optional
+        Minimum length per edge.
+        Default is ``None``.
+    lmax : list, optional
+        Maximum length per edge.
+        Default is ``None``.
+    monitor : :class:`compas_tna.equilibrium.Monitor`, optional
+        A monitor receiving the rounds, with the largest displacement of a vertex per round.
+        Default is ``None``.
+
+    Returns
+    -------
+    set
+        The vertices that were processed, and therefore possibly moved.
+
+    Notes
+    -----
+    In contrast to :func:`parallelise_edges`, which updates every vertex in every iteration,
+    this function maintains a worklist of vertices.
+    Every vertex in the worklist is moved to the average of the positions proposed by its neighbours,
+    using the updated positions of the vertices processed before it in the same round (Gauss-Seidel).
+    Only the neighbours of vertices that moved more than ``tol`` are processed in the next round,
+    such that the changes propagate outward until they die out.
+    The cost of a local change is therefore proportional to the size of the affected region,
+    rather than to the size of the mesh times the number of iterations.
+
+    """
+    fixed = fixed or []
+    fixed = set(fixed)
+
+    processed = set()
+    worklist = sorted(set(active) - fixed)
+    # the neighbours of the processed vertices, with the connecting edges and their orientation
+    # these are collected once per vertex, since vertices are typically processed in many rounds
+    stars = {}
+
+    for k in range(kmax):
+        if not worklist:
+            break
+
+        residual = 0.0
+        queued = set()
+
+        for j in worklist:
+            star = stars.get(j)
+            if star is None:
+                star = stars[j] = []
+                for i in i_nbrs[j]:
+                    if (i, j) in ij_e:
+                        star.append((i, ij_e[(i, j)], 1.0))
+                    elif (j, i) in ij_e:
+                        star.append((i, ij_e[(j, i)], -1.0))
+
+            if not star:
+                continue
+
+            xj, yj = xy[j][0], xy[j][1]
+            x, y = 0.0, 0.0
+
+            for i, e, sign in star:
+                ax, ay = xy[i][0], xy[i][1]
+                l = ((xj - ax) ** 2 + (yj - ay) ** 2) ** 0.5  # noqa: E741
+
+                if lmin is not None:
+                    l = max(l, lmin[e])  # noqa: E741
+
+                if lmax is not None:
+                    l = min(l, lmax[e])  # noqa: E741
+
+                tx, ty = targets[e]
+                x += ax + sign * l * tx
+                y += ay + sign * l * ty
+
+            count = len(star)
+
+            x /= count
+            y /= count
+            d = ((x - xj) ** 2 + (y - yj) ** 2) ** 0.5
+            xy[j][0] = x
+            xy[j][1] = y
+            processed.add(j)
+
+            if d > tol:
+                residual = max(residual, d)
+                queued.update(i for i in i_nbrs[j] if i not in fixed)
+
+        worklist = sorted(queued)
+
+        if monitor:
+            monitor.iteration(k, residual)
+
+    return processed
@@ -1,18 +1,80 @@
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy
 import numpy.typing as npt
 from numpy.linalg import cond
 from scipy.linalg import cho_factor
 from scipy.linalg import cho_solve
 from scipy.linalg import lstsq
+from scipy.sparse import coo_matrix
 from scipy.sparse.linalg import factorized
 
-from compas.linalg import lufactorized
 from compas.linalg import normrow
+from compas_tna.cache import LRUCache
+from compas_tna.cache import fingerprint
+
+from .monitor import Monitor
+from .parallelisation import vertex_colors
 
 EPS = 1 / sys.float_info.epsilon
 
 
+class FactorizationCache(LRUCache):
+    r"""Thread-safe LRU cache of factorized systems.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of factorizations kept in the cache.
+        The least recently used factorization is removed first.
+        Default is ``32``.
+
+    Notes
+    -----
+    The keys of the cache should identify the factorized system, not the purpose of the system.
+    Use :func:`topology_fingerprint` for systems that only depend on the topology and the fixed vertices of a diagram,
+    such as :math:`\mathbf{C}^{T} \mathbf{C}`.
+    This way, diagrams with the same topology share their factorizations,
+    and the factorizations of different diagrams are never mixed up.
+
+    The cache is opt-in: the solvers only store factorizations in a cache that is passed to them explicitly,
+    for example through :class:`HorizontalState`, or under an explicit ``key``.
+
+    The cache can be shared by several threads.
+    Factorizations are computed outside of the lock of the cache,
+    such that concurrent misses of the same key may factorize the same system more than once.
+
+    Examples
+    --------
+    >>> cache = FactorizationCache(maxsize=8)
+    >>> key = ("form", topology_fingerprint(edges, fixed))
+    >>> parallelise = cache.get(key, lambda: parallelise_sparse_factorized(A, fixed))
+
+    """
+
+
+FACTORIZATIONS = FactorizationCache()
+
+
+def topology_fingerprint(edges, fixed) -> str:
+    """Compute a fingerprint of the topology and the fixed vertices of a diagram.
+
+    Parameters
+    ----------
+    edges : list[tuple[int, int]]
+        The vertex indices of the edges.
+    fixed : list[int]
+        The indices of the fixed vertices.
+
+    Returns
+    -------
+    str
+
+    """
+    return fingerprint(numpy.asarray(edges, dtype=numpy.int64), numpy.asarray(sorted(fixed), dtype=numpy.int64))
+
+
 def parallelise(A: npt.NDArray, x: npt.NDArray, b: npt.NDArray, known: list[int]) -> npt.NDArray:
     r"""Solve a system of linear equations with part of solution known.
 
@@ -62,20 +124,68 @@ def parallelise(A: npt.NDArray, x: npt.NDArray, b: npt.NDArray, known: list[int]
     return x
 
 
-def parallelise_sparse(A, B, X, known, k=1, key=None):
+def parallelise_sparse(A, B, X, known, k=1, key=None, monitor=None, cache=None):
+    if key:
+        # the factorization is looked up by the contents of the matrix and the known elements, and not only by the name of the system
+        # such that matrices with the same pattern but other values, such as C^T Q C for other force densities, are never mixed up
+        A = A.tocsr()
+        key = (key, fingerprint(A.shape, A.indptr, A.indices, A.data, numpy.asarray(sorted(known), dtype=numpy.int64)))
+        parallelise = parallelise_sparse_factorized(A, known, monitor=monitor, key=key, cache=cache)
+        return parallelise(B, X)
     unknown = list(set(range(X.shape[0])) - set(known))
     A11 = A[unknown, :][:, unknown]
     A12 = A[unknown, :][:, known]
     b = B[unknown] - A12.dot(X[known])
-    if key:
-        Y = lufactorized(A11, key)(b)
-    else:
-        Y = factorized(A11)(b)
-    X[unknown] = Y
+    with (monitor or Monitor()).phase("factorization"):
+        solve = factorized(A11)
+    X[unknown] = solve(b)
     return X
 
 
-def parallelise_nodal(xy, C, targets, i_nbrs, ij_e, fixed=None, kmax=100, lmin=None, lmax=None):
+def parallelise_sparse_factorized(A, known, monitor=None, key=None, cache=None):
+    """Factorize a sparse system of linear equations with part of the solution known,
+    for repeated solves with different right-hand sides.
+
+    Parameters
+    ----------
+    A : sparse matrix
+        Coefficient matrix represented as an (n x n) sparse matrix.
+    known : list[int]
+        The indices of the known elements of the solution.
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the factorization phase.
+    key : hashable, optional
+        The key of the factorization in the cache, for example a :func:`topology_fingerprint`.
+        Default is ``None``, in which case the factorization is not cached.
+    cache : :class:`FactorizationCache`, optional
+        The cache of the factorization.
+        Default is ``None``, in which case the cache of the module is used.
+
+    Returns
+    -------
+    callable
+        A function ``parallelise(B, X)`` that computes the unknown rows of ``X`` in place,
+        from the right-hand side ``B`` and the known rows of ``X``, and returns ``X``.
+
+    """
+    if key is not None:
+        cache = FACTORIZATIONS if cache is None else cache
+        return cache.get(key, lambda: parallelise_sparse_factorized(A, known, monitor=monitor))
+
+    unknown = sorted(set(range(A.shape[0])) - set(known))
+    A11 = A[unknown, :][:, unknown]
+    A12 = A[unknown, :][:, known]
+    with (monitor or Monitor()).phase("factorization"):
+        solve = factorized(A11.tocsc())
+
+    def parallelise(B, X):
+        X[unknown] = solve(B[unknown] - A12.dot(X[known]))
+        return X
+
+    return parallelise
+
+
+def parallelise_nodal(xy, C, targets, i_nbrs, ij_e, fixed=None, kmax=100, lmin=None, lmax=None, monitor=None):
     fixed = fixed or []
     fixed = set(fixed)
 
@@ -94,7 +204,8 @@ def parallelise_nodal(xy, C, targets, i_nbrs, ij_e, fixed=None, kmax=100, lmin=N
                 continue
 
             nbrs = i_nbrs[j]
-            xy[j, :] = 0.0
+            count = 0
+            x = numpy.zeros(xy.shape[1])
 
             for i in nbrs:
                 if (i, j) in ij_e:
@@ -106,10 +217,12 @@ def parallelise_nodal(xy, C, targets, i_nbrs, ij_e, fixed=None, kmax=100, lmin=N
                 else:
                     continue
 
-                xy[j] += xy0[i] + l[e, 0] * t
+                x += xy0[i] + l[e, 0] * t
+                count += 1
 
-            # add damping factor?
-            xy[j] /= len(nbrs)
+            # only the neighbours connected by an edge contribute, as in parallelise_edges and parallelise_batched
+            if count:
+                xy[j] = x / count
 
         for i, j in ij_e:
             e = ij_e[(i, j)]
@@ -121,6 +234,124 @@ def parallelise_nodal(xy, C, targets, i_nbrs, ij_e, fixed=None, kmax=100, lmin=N
                 xy[i] = c[:]
                 xy[j] = c[:]
 
+        if monitor:
+            monitor.iteration(k, normrow(xy - xy0).max())
+
+
+def parallelise_batched(xy, C, targets, fixed=None, kmax=100, tol=None, lmin=None, lmax=None, coloured=False, max_workers=None, monitor=None):
+    """Parallelise the edges of a mesh to given target vectors, updating the vertices in vectorized batches.
+
+    Parameters
+    ----------
+    xy : array
+        The XY coordinates of the vertices, as an (n x 2) array.
+        The coordinates are updated in place.
+    C : sparse matrix
+        The (m x n) connectivity matrix of the edges.
+    targets : array
+        A target vector for every edge, as an (m x 2) array.
+    fixed : list[int], optional
+        The fixed vertices.
+    kmax : int, optional
+        Maximum number of sweeps.
+    tol : float, optional
+        If provided, the sweeps stop as soon as no vertex moves more than this distance in a sweep.
+    lmin : array, optional
+        Minimum length per edge, as an (m x 1) array.
+    lmax : array, optional
+        Maximum length per edge, as an (m x 1) array.
+    coloured : bool, optional
+        If True, update the vertices with a graph-coloured Gauss-Seidel scheme.
+        Otherwise, update all vertices at once with the Jacobi scheme of :func:`parallelise_nodal`.
+        Default is False.
+    max_workers : int, optional
+        If larger than one, every batch of vertices is updated in chunks by a pool of this many threads.
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the sweeps, with the largest displacement of a vertex per sweep.
+
+    Returns
+    -------
+    array
+        The updated coordinates.
+
+    Notes
+    -----
+    Every vertex is moved to the average of the positions proposed by the edges connecting it to its neighbours,
+    as in :func:`parallelise_nodal` and :func:`parallelise_edges`,
+    but the vertices are updated as batches of sparse matrix products rather than one by one.
+    Vertices without connected edges are not moved.
+
+    In the Jacobi scheme, all free vertices form a single batch,
+    and are updated from the positions and edge lengths at the start of the sweep.
+    In the graph-coloured Gauss-Seidel scheme, the free vertices are colored such that no two neighbours have the same color,
+    and the vertices of every color form a batch,
+    updated from the current positions of the vertices of the other colors.
+    The Gauss-Seidel scheme propagates changes faster and typically needs fewer sweeps,
+    but every sweep consists of one batch per color instead of a single batch.
+
+    """
+    C = C.tocsr()
+    Ct = C.transpose().tocsr()
+    n = xy.shape[0]
+    # the endpoints of the edges and the adjacency matrix
+    edges = C.indices.reshape((-1, 2)).tolist()
+    i = C.indices[0::2]
+    j = C.indices[1::2]
+    A = coo_matrix((numpy.ones(2 * len(i)), (numpy.hstack([i, j]), numpy.hstack([j, i]))), shape=(n, n)).tocsr()
+    degree = numpy.asarray(abs(Ct).sum(axis=1)).reshape((-1, 1))
+    # the batches of vertices
+    # with the rows of the matrices that are needed to update them
+    if coloured:
+        colors = vertex_colors(n, edges, fixed)
+    else:
+        free = set(range(n)) - set(fixed or [])
+        colors = [[index for index in sorted(free) if degree[index, 0]]]
+    chunks = max(1, max_workers or 1)
+    batches = []
+    for vertices in colors:
+        batch = []
+        for rows in numpy.array_split(numpy.array(vertices, dtype=int), chunks):
+            if not len(rows):
+                continue
+            Ct_rows = Ct[rows]
+            incident = numpy.unique(Ct_rows.indices)
+            batch.append((rows, A[rows], Ct_rows[:, incident], C[incident], incident, degree[rows]))
+        batches.append(batch)
+
+    def update(source, rows, A_rows, Ct_rows, C_incident, incident, d):
+        l = normrow(C_incident.dot(source))  # noqa: E741
+        if lmin is not None and lmax is not None:
+            apply_bounds(l, lmin[incident], lmax[incident])
+        xy[rows] = (A_rows.dot(source) + Ct_rows.dot(l * targets[incident])) / d
+
+    executor = ThreadPoolExecutor(max_workers) if chunks > 1 else None
+    try:
+        for k in range(kmax):
+            xy0 = xy.copy()
+            source = xy if coloured else xy0
+            for batch in batches:
+                if executor:
+                    list(executor.map(lambda args: update(source, *args), batch))
+                else:
+                    for args in batch:
+                        update(source, *args)
+            # collapse edges of zero length
+            l = normrow(C.dot(xy0))  # noqa: E741
+            if lmin is not None and lmax is not None:
+                apply_bounds(l, lmin, lmax)
+            for e in numpy.nonzero(l[:, 0] == 0.0)[0]:
+                u, v = edges[e]
+                xy[u] = xy[v] = 0.5 * (xy[u] + xy[v])
+            residual = normrow(xy - xy0).max()
+            if monitor:
+                monitor.iteration(k, residual)
+            if tol is not None and residual < tol:
+                break
+    finally:
+        if executor:
+            executor.shutdown()
+    return xy
+
 
 def apply_bounds(x, xmin, xmax):
     xsmall = x < xmin
@@ -1,9 +1,220 @@
-from compas_fd.solvers import fd_numpy
+from typing import Optional
 
+import numpy
+import numpy.typing as npt
+from scipy.sparse import diags
+from scipy.sparse.linalg import splu
+
+from compas.linalg import normrow
+from compas.matrices import connectivity_matrix
 from compas_tna.diagrams import FormDiagram
 
+from .monitor import Monitor
+
+
+class RelaxationProblem:
+    """Precompiled force density relaxation of a form diagram.
+
+    The problem holds the index maps, the connectivity matrices and the free and fixed vertices of the relaxation,
+    which only depend on the topology of the diagram and the fixed vertices.
+    It also keeps the factorized system of the last force densities it was used with,
+    which is reused for other loads and positions of the fixed vertices,
+    and for force densities that are a multiple of these.
+
+    Parameters
+    ----------
+    form : :class:`FormDiagram`
+        The form diagram.
+    fixed : list[int]
+        The fixed vertices of the diagram.
+
+    Examples
+    --------
+    >>> problem = RelaxationProblem(form, list(form.supports()))
+    >>> relax_boundary_openings(form, list(form.supports()), problem=problem)
+    >>> form.edges_attribute("q", 2.0, keys=boundary)
+    >>> relax_boundary_openings(form, list(form.supports()), problem=problem)
+
+    """
+
+    def __init__(self, form: FormDiagram, fixed: list[int]):
+        self.k_i = form.vertex_index()
+        self.vcount = form.number_of_vertices()
+        self.edges = list(form.edges())
+        self.fixed = sorted(self.k_i[key] for key in fixed)
+        self.free = sorted(set(range(self.vcount)) - set(self.fixed))
+        self.C = connectivity_matrix([(self.k_i[u], self.k_i[v]) for u, v in self.edges], "csr")
+        self.Ci = self.C[:, self.free].tocsc()
+        self.Cf = self.C[:, self.fixed].tocsc()
+        self._q = None
+        self._system = None
+
+    def check(self, form: FormDiagram, fixed: list[int]) -> None:
+        """Verify that the problem corresponds to the topology and the fixed vertices of a form diagram.
+
+        Parameters
+        ----------
+        form : :class:`FormDiagram`
+            The form diagram.
+        fixed : list[int]
+            The fixed vertices of the diagram.
+
+        Raises
+        ------
+        ValueError
+            If the numbers of vertices or edges of the diagram, or the fixed vertices, are different from those of the problem.
+
+        """
+        if form.number_of_vertices() != self.vcount or form.number_of_edges() != self.C.shape[0]:
+            raise ValueError("The relaxation problem does not correspond to the form diagram.")
+        if sorted(self.k_i[key] for key in fixed) != self.fixed:
+            raise ValueError("The relaxation problem does not correspond to the fixed vertices.")
+
+    def data(self, form: FormDiagram) -> tuple:
+        """Collect the coordinates, loads and force densities of a form diagram.
 
-def relax_boundary_openings(form: FormDiagram, fixed: list[int]) -> FormDiagram:
+        Parameters
+        ----------
+        form : :class:`FormDiagram`
+            The form diagram.
+
+        Returns
+        -------
+        tuple
+            The coordinates (n x 3), loads (n x 3) and force densities (m,).
+
+        """
+        xyz = numpy.array(form.vertices_attributes("xyz"), dtype=numpy.float64)
+        p = numpy.array(form.vertices_attributes(("px", "py", "pz")), dtype=numpy.float64)
+        q = numpy.array(form.edges_attribute("q", keys=self.edges), dtype=numpy.float64)
+        return xyz, p, q
+
+    def system(self, q: npt.NDArray, monitor: Optional[Monitor] = None) -> tuple:
+        r"""Get the factorized system of the free vertices for given force densities.
+
+        Parameters
+        ----------
+        q : ndarray (m,)
+            The force densities.
+        monitor : :class:`Monitor`, optional
+            A monitor receiving the assembly and factorization phases, if the system has to be factorized.
+
+        Returns
+        -------
+        tuple
+            The factorization of :math:`\mathbf{C}_i^T \mathbf{Q} \mathbf{C}_i`,
+            the matrix :math:`\mathbf{C}_i^T \mathbf{Q} \mathbf{C}_f`,
+            and the factor with which both have to be scaled for the given force densities.
+
+        """
+        q = numpy.asarray(q, dtype=numpy.float64).reshape(-1)
+        if self._q is not None:
+            index = numpy.argmax(numpy.abs(self._q))
+            if self._q[index]:
+                factor = q[index] / self._q[index]
+                if factor and numpy.allclose(q, factor * self._q, rtol=1e-12, atol=0):
+                    return self._system[0], self._system[1], factor
+        monitor = monitor or Monitor()
+        with monitor.phase("assembly"):
+            CiQ = self.Ci.transpose().dot(diags([q], [0]))  # type: ignore
+            Ai = CiQ.dot(self.Ci).tocsc()
+            Af = CiQ.dot(self.Cf).tocsr()
+        with monitor.phase("factorization"):
+            self._system = splu(Ai), Af
+        self._q = q.copy()
+        return self._system[0], self._system[1], 1.0
+
+    def solve(
+        self,
+        xyz: npt.NDArray,
+        q: npt.NDArray,
+        p: npt.NDArray,
+        lengths: Optional[npt.NDArray] = None,
+        kmax: int = 100,
+        tol: float = 1e-3,
+        monitor: Optional[Monitor] = None,
+    ) -> tuple:
+        """Compute the equilibrium coordinates of the free vertices.
+
+        Parameters
+        ----------
+        xyz : ndarray (n x 3)
+            The coordinates of the vertices.
+            Only the coordinates of the fixed vertices are used.
+        q : ndarray (m,)
+            The force densities of the edges.
+        p : ndarray (n x 3)
+            The loads at the vertices.
+        lengths : ndarray (m,), optional
+            Target lengths of the edges.
+            If provided, the force densities are updated iteratively,
+            keeping the forces of the edges constant, until the lengths of the edges match the targets.
+            The target lengths should be positive.
+            Default is ``None``.
+        kmax : int, optional
+            The maximum number of solves with target lengths, including the solve with the initial force densities,
+            which is always done.
+            Default is ``100``.
+        tol : float, optional
+            The relative tolerance on the lengths of the edges.
+            Default is ``1e-3``.
+        monitor : :class:`Monitor`, optional
+            A monitor receiving the phases of the solver.
+
+        Returns
+        -------
+        tuple
+            The coordinates of the vertices in equilibrium (n x 3),
+            the force densities of the edges that produce these coordinates (m,),
+            whether the lengths of the edges match the targets within the tolerance,
+            and the largest relative difference between the lengths of the edges and the targets.
+            Without target lengths, the solution is always converged, with a residual of zero.
+
+        Raises
+        ------
+        ValueError
+            If the number of target lengths is not the number of edges, or if a target length is not positive.
+
+        """
+        monitor = monitor or Monitor()
+        free = self.free
+        fixed = self.fixed
+        xyz = numpy.array(xyz, dtype=numpy.float64)
+        q = numpy.array(q, dtype=numpy.float64).reshape(-1)
+        p = numpy.asarray(p, dtype=numpy.float64)
+        if lengths is None:
+            Ai, Af, factor = self.system(q, monitor=monitor)
+            xyz[free] = Ai.solve(p[free] / factor - Af.dot(xyz[fixed]))
+            return xyz, q, True, 0.0
+
+        lengths = numpy.asarray(lengths, dtype=numpy.float64).reshape(-1)
+        if lengths.shape[0] != self.C.shape[0]:
+            raise ValueError(f"Expected {self.C.shape[0]} target lengths, got {lengths.shape[0]}.")
+        if not numpy.all(lengths > 0):
+            raise ValueError("The target lengths of the edges should be positive.")
+        # the initial solve is always done, such that the coordinates correspond to the force densities
+        for k in range(max(kmax, 1)):
+            Ai, Af, factor = self.system(q, monitor=monitor)
+            xyz[free] = Ai.solve(p[free] / factor - Af.dot(xyz[fixed]))
+            current = normrow(self.C.dot(xyz)).ravel()
+            residual = float(numpy.abs(current / lengths - 1.0).max())
+            monitor.iteration(k, residual)
+            if residual <= tol or k >= kmax - 1:
+                break
+            # keep the forces of the edges constant
+            q = q * current / lengths
+        return xyz, q, residual <= tol, residual
+
+
+def relax_boundary_openings(
+    form: FormDiagram,
+    fixed: list[int],
+    monitor: Optional[Monitor] = None,
+    problem: Optional[RelaxationProblem] = None,
+    lengths: Optional[npt.ArrayLike] = None,
+    kmax: int = 100,
+    tol: float = 1e-3,
+) -> FormDiagram:
     """Relax the FormDiagram to create a smooth starting geometry with inward curving unsupported boundaries.
 
     Parameters
@@ -12,6 +223,25 @@ def relax_boundary_openings(form: FormDiagram, fixed: list[int]) -> FormDiagram:
         The FormDiagram.
     fixed : list[int]
         The fixed vertices of the diagram.
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the phases of the solver.
+    problem : :class:`RelaxationProblem`, optional
+        The precompiled relaxation problem of the diagram and the fixed vertices,
+        for reusing the connectivity matrices and the factorization across calls.
+        Default is ``None``.
+    lengths : array-like (m,), optional
+        Target lengths of the edges, in the order of :meth:`FormDiagram.edges`.
+        If provided, the force densities of the edges are updated iteratively towards these lengths,
+        and stored in the diagram.
+        The relative differences between the lengths of the edges and the targets are reported to the monitor as residuals.
+        Default is ``None``.
+    kmax : int, optional
+        The maximum number of solves with target lengths, including the solve with the initial force densities,
+        which is always done.
+        Default is ``100``.
+    tol : float, optional
+        The relative tolerance on the target lengths.
+        Default is ``1e-3``.
 
     Returns
     -------
@@ -19,21 +249,32 @@ def relax_boundary_openings(form: FormDiagram, fixed: list[int]) -> FormDiagram:
         The diagram is updated in place, but the updated diagram is also returned
         for compatibility with RPC calls.
 
+    Raises
+    ------
+    ValueError
+        If the problem does not correspond to the diagram, or if the target lengths are invalid.
+        See :meth:`RelaxationProblem.solve`.
+
     """
-    k_i = form.vertex_index()
-    xyz: list[list[float]] = form.vertices_attributes("xyz")  # type: ignore
-    edges = [(k_i[u], k_i[v]) for u, v in form.edges()]
-    fixed = [k_i[key] for key in fixed]
-    q: list[float] = form.edges_attribute("q")  # type: ignore
-    loads: list[list[float]] = form.vertices_attributes(("px", "py", "pz"))  # type: ignore
-    result = fd_numpy(
-        vertices=xyz,
-        fixed=fixed,
-        edges=edges,
-        forcedensities=q,
-        loads=loads,
-    )
-    for key in form.vertices():
-        index = k_i[key]
-        form.vertex_attributes(key, "xyz", result.vertices[index])
+    monitor = monitor or Monitor()
+    with monitor.phase("relax_boundary_openings"):
+        with monitor.phase("index"):
+            if problem is None:
+                problem = RelaxationProblem(form, fixed)
+            else:
+                problem.check(form, fixed)
+            xyz, p, q = problem.data(form)
+
+        with monitor.phase("solve"):
+            xyz, q, _, _ = problem.solve(xyz, q, p, lengths=lengths, kmax=kmax, tol=tol, monitor=monitor)
+
+        with monitor.phase("writeback"):
+            for (_, attr), (x, y, z) in zip(form.vertices(data=True), xyz.tolist()):
+                attr["x"] = x
+                attr["y"] = y
+                attr["z"] = z
+            if lengths is not None:
+                for edge, value in zip(problem.edges, q.tolist()):
+                    form.edge_attribute(edge, "q", value)
+
     return form
@@ -0,0 +1,289 @@
+from typing import Optional
+
+import numpy
+import numpy.typing as npt
+from scipy.sparse import diags
+
+from compas_tna.diagrams import FormDiagram
+
+from .vertical_numpy import VerticalProblem
+
+
+class VerticalSensitivity:
+    r"""Analytic sensitivities of the heights and reactions of a thrust network with respect to its force densities.
+
+    The sensitivities are computed for the current state of the form diagram,
+    which should be in vertical equilibrium, for example after :func:`vertical_from_zmax` or :func:`vertical_from_q`.
+
+    Parameters
+    ----------
+    form : :class:`FormDiagram`
+        The form diagram.
+    scale : float, optional
+        The scale of the force densities stored in the diagram.
+        The force densities of the thrust network are ``scale * q``,
+        as in :func:`vertical_from_q`.
+        After :func:`vertical_from_zmax`, the stored force densities are already scaled, and the scale is ``1.0``.
+        Default is ``1.0``.
+    density : float, optional
+        The density used for computing the self-weight.
+        Default is ``1.0``.
+    selfweight : bool, optional
+        If True, include the change of the self-weight with the heights of the vertices.
+        Default is True.
+    tol : float, optional
+        The convergence tolerance of the iterations accounting for the self-weight.
+        Default is ``1e-12``.
+    kmax : int, optional
+        The maximum number of iterations accounting for the self-weight.
+        Default is ``100``.
+    problem : :class:`VerticalProblem`, optional
+        The precompiled vertical problem of the form diagram, the factorization of which is reused.
+        Default is ``None``.
+
+    Notes
+    -----
+    At equilibrium, the residual forces at the free vertices vanish
+
+    .. math::
+
+        \mathbf{R}(\mathbf{z}_i, \mathbf{q}) = \mathbf{C}_i^T \mathbf{Q} \mathbf{C} \mathbf{z} - \mathbf{p}_i(\mathbf{z}) = \mathbf{0}
+
+    such that
+
+    .. math::
+
+        \frac{\partial \mathbf{z}_i}{\partial \mathbf{q}} = - \mathbf{K}^{-1} \mathbf{C}_i^T \mathrm{diag}(\mathbf{C} \mathbf{z}),
+        \quad \mathbf{K} = \mathbf{C}_i^T \mathbf{Q} \mathbf{C}_i - \frac{\partial \mathbf{p}_i}{\partial \mathbf{z}_i}
+
+    The systems with :math:`\mathbf{K}` are solved with the factorization of :math:`\mathbf{C}_i^T \mathbf{Q} \mathbf{C}_i`,
+    iterating over the self-weight term in the same way as :func:`update_z`.
+    Derivatives of scalar objectives are computed with the adjoint method (:meth:`vjp`),
+    at the cost of a single solve, independently of the number of edges.
+
+    Examples
+    --------
+    >>> form, scale = vertical_from_zmax(form, 3.0)
+    >>> sensitivity = VerticalSensitivity(form)
+    >>> dz = sensitivity.jvp(dq)
+    >>> gradient = sensitivity.vjp(numpy.ones(form.number_of_vertices()))  # derivative of the sum of the heights
+
+    """
+
+    def __init__(
+        self,
+        form: FormDiagram,
+        scale: float = 1.0,
+        density: float = 1.0,
+        selfweight: bool = True,
+        tol: float = 1e-12,
+        kmax: int = 100,
+        problem: Optional[VerticalProblem] = None,
+    ):
+        if problem is None:
+            problem = VerticalProblem(form)
+        else:
+            problem.check(form)
+
+        self.problem = problem
+        self.scale = scale
+        self.tol = tol
+        self.kmax = kmax
+
+        xyz, thick, p, q0 = problem.data(form)
+
+        self.n = xyz.shape[0]
+        self.free = problem.free
+        self.fixed = problem.fixed
+        self.loads = None
+        if selfweight and density:
+            self.loads = problem.loads(p, thick, density)
+
+        self.update(xyz, q0)
+
+    def update(self, xyz: npt.NDArray, q: npt.NDArray) -> None:
+        """Recompute the sensitivities for another equilibrium state of the thrust network.
+
+        The topology, the supports, the thickness and the additional loads of the form diagram should be the same.
+        This avoids collecting the data from the diagram,
+        for example when the sensitivities are evaluated repeatedly during an optimization.
+
+        Parameters
+        ----------
+        xyz : ndarray (n x 3)
+            The coordinates of the vertices in equilibrium.
+        q : ndarray (m x 1)
+            The force densities, before scaling with :attr:`scale`.
+
+        Returns
+        -------
+        None
+
+        """
+        problem = self.problem
+        free = self.free
+        fixed = self.fixed
+        C = problem.C
+
+        self.q0 = q[:, 0]
+        self.q = self.scale * self.q0
+
+        system, factor = problem.system(q)
+        A0_solve = system[0]
+        s = self.scale * factor
+        self._solve = lambda b: A0_solve(b) / s
+
+        Cz = C.dot(xyz[:, 2])
+        Ci = C[:, free]
+        Cf = C[:, fixed]
+        Q = diags([self.q], [0])  # type: ignore
+        # the derivatives of the residuals at the free and fixed vertices with respect to the force densities
+        self.Di = Ci.transpose().dot(diags([Cz], [0])).tocsr()  # type: ignore
+        self.Df = Cf.transpose().dot(diags([Cz], [0])).tocsr()  # type: ignore
+        # the coupling of the reactions with the heights of the free vertices
+        self.Bf = Cf.transpose().dot(Q).dot(Ci).tocsr()
+
+        self.Jii = None
+        self.Jfi = None
+        if self.loads is not None:
+            J = self.loads.jacobian(xyz)
+            self.Jii = J[free][:, free].tocsr()
+            self.Jfi = J[fixed][:, free].tocsr()
+            if not self.Jii.nnz:
+                self.Jii = None
+
+    # --------------------------------------------------------------------------
+    # solves
+    # --------------------------------------------------------------------------
+
+    def _solve_tangent(self, b: npt.NDArray, transpose: bool = False) -> npt.NDArray:
+        x = self._solve(b)
+        if self.Jii is None:
+            return x
+        J = self.Jii.transpose() if transpose else self.Jii
+        for _ in range(self.kmax):
+            x0 = x
+            x = self._solve(b + J.dot(x))
+            if numpy.abs(x - x0).max() <= self.tol * max(1.0, numpy.abs(x).max()):
+                break
+        return x
+
+    def _full(self, zi: npt.NDArray) -> npt.NDArray:
+        z = numpy.zeros((self.n,) + zi.shape[1:])
+        z[self.free] = zi
+        return z
+
+    # --------------------------------------------------------------------------
+    # heights
+    # --------------------------------------------------------------------------
+
+    def jvp(self, dq: npt.NDArray) -> npt.NDArray:
+        """Compute the change of the heights of the vertices for a change of the force densities.
+
+        Parameters
+        ----------
+        dq : ndarray (m,)
+            The change of the force densities of the edges, in the order of :meth:`FormDiagram.uv_index`.
+
+        Returns
+        -------
+        ndarray (n,)
+            The change of the heights of the vertices, in the order of :meth:`FormDiagram.vertex_index`.
+            The heights of the fixed vertices don't change.
+
+        """
+        dzi = -self._solve_tangent(self.Di.dot(dq))
+        return self._full(dzi)
+
+    def vjp(self, w: npt.NDArray) -> npt.NDArray:
+        """Compute the gradient of a weighted sum of the heights with respect to the force densities.
+
+        Parameters
+        ----------
+        w : ndarray (n,)
+            The weights of the heights of the vertices,
+            i.e. the derivative of an objective function with respect to the heights.
+
+        Returns
+        -------
+        ndarray (m,)
+            The gradient with respect to the force densities of the edges.
+
+        """
+        adjoint = self._solve_tangent(numpy.asarray(w, dtype=float)[self.free], transpose=True)
+        return -self.Di.transpose().dot(adjoint)
+
+    def jacobian(self) -> npt.NDArray:
+        """Compute the full Jacobian of the heights of the vertices with respect to the force densities.
+
+        Returns
+        -------
+        ndarray (n x m)
+
+        Warnings
+        --------
+        The Jacobian is a dense matrix.
+        For large diagrams, use :meth:`jvp` or :meth:`vjp` instead.
+
+        """
+        dzi = -self._solve_tangent(self.Di.toarray())
+        return self._full(dzi)
+
+    def dscale(self) -> npt.NDArray:
+        """Compute the derivative of the heights of the vertices with respect to the scale of the force densities.
+
+        Returns
+        -------
+        ndarray (n,)
+
+        """
+        return self.jvp(self.q0)
+
+    # --------------------------------------------------------------------------
+    # reactions
+    # --------------------------------------------------------------------------
+
+    def reactions_jvp(self, dq: npt.NDArray) -> npt.NDArray:
+        """Compute the change of the vertical reactions for a change of the force densities.
+
+        Parameters
+        ----------
+        dq : ndarray (m,) | ndarray (m x k)
+            The change of the force densities of the edges,
+            or several changes as the columns of a matrix, for example :func:`independent_edges_matrix`.
+
+        Returns
+        -------
+        ndarray (n,) | ndarray (n x k)
+            The change of the vertical reaction forces at the fixed vertices, per change of the force densities.
+            The values at the free vertices are zero.
+
+        """
+        dzi = -self._solve_tangent(self.Di.dot(dq))
+        drf = self.Df.dot(dq) + self.Bf.dot(dzi)
+        if self.Jfi is not None:
+            drf -= self.Jfi.dot(dzi)
+        dr = numpy.zeros((self.n,) + drf.shape[1:])
+        dr[self.fixed] = drf
+        return dr
+
+    def reactions_vjp(self, w: npt.NDArray) -> npt.NDArray:
+        """Compute the gradient of a weighted sum of the vertical reactions with respect to the force densities.
+
+        Parameters
+        ----------
+        w : ndarray (n,)
+            The weights of the vertical reactions; only the values at the fixed vertices are used.
+
+        Returns
+        -------
+        ndarray (m,)
+            The gradient with respect to the force densities of the edges.
+
+        """
+        wf = numpy.asarray(w, dtype=float)[self.fixed]
+        v = self.Bf.transpose().dot(wf)
+        if self.Jfi is not None:
+            v -= self.Jfi.transpose().dot(wf)
+        adjoint = self._solve_tangent(v, transpose=True)
+        return self.Df.transpose().dot(wf) - self.Di.transpose().dot(adjoint)
@@ -1,7 +1,11 @@
+from typing import Optional
+
+from numpy import allclose
+from numpy import argmax
 from numpy import array
 from numpy import float64
+from numpy import zeros
 from scipy.sparse import diags
-from scipy.sparse.linalg import spsolve
 
 from compas.linalg import normrow
 from compas.matrices import connectivity_matrix
@@ -10,6 +14,133 @@ from compas_tna.diagrams import FormDiagram
 from compas_tna.loads import LoadUpdater
 
 from .diagrams import update_z
+from .diagrams import vertical_system
+from .monitor import Monitor
+
+
+class VerticalProblem:
+    """Precompiled vertical equilibrium problem of a form diagram.
+
+    The problem holds the data of the vertical solvers that only depend on the topology and the supports of the form diagram:
+    the index maps, the free and fixed vertices, the connectivity matrix, and the load updater.
+    It also keeps the factorized system of the last force densities it was used with.
+    Since the system of force densities that are a multiple of these is the same system, scaled,
+    the factorization is reused as long as the force densities only change by a scale factor,
+    for example between calls of :func:`vertical_from_zmax` with different ``zmax`` or ``density``.
+
+    The problem remains valid as long as the topology and the supports of the form diagram don't change.
+
+    Parameters
+    ----------
+    form : :class:`FormDiagram`
+        The form diagram.
+
+    Examples
+    --------
+    >>> problem = VerticalProblem(form)
+    >>> for zmax in [1.0, 2.0, 3.0]:
+    ...     form, scale = vertical_from_zmax(form, zmax, problem=problem)
+
+    """
+
+    def __init__(self, form: FormDiagram):
+        self.k_i = form.vertex_index()
+        self.uv_i = form.uv_index()
+        self.vcount = form.number_of_vertices()
+        self.fixed = [self.k_i[key] for key in form.supports()]
+        self.free = list(set(range(self.vcount)) - set(self.fixed))
+        self.edges = list(form.edges_where({"_is_edge": True}))
+        self.C = connectivity_matrix([(self.k_i[u], self.k_i[v]) for u, v in self.edges], "csr")
+        self.update_loads = LoadUpdater(form, zeros((self.vcount, 3)))  # type: ignore
+        self._q = None
+        self._system = None
+
+    def check(self, form: FormDiagram) -> None:
+        """Verify that the problem corresponds to the topology of a form diagram.
+
+        Parameters
+        ----------
+        form : :class:`FormDiagram`
+            The form diagram.
+
+        Raises
+        ------
+        ValueError
+            If the numbers of vertices or edges of the diagram are different from those of the problem.
+
+        """
+        if form.number_of_vertices() != self.vcount or len(list(form.edges_where({"_is_edge": True}))) != self.C.shape[0]:
+            raise ValueError("The vertical problem does not correspond to the form diagram.")
+
+    def data(self, form: FormDiagram) -> tuple:
+        """Collect the coordinates, thickness, loads and force densities of a form diagram.
+
+        Parameters
+        ----------
+        form : :class:`FormDiagram`
+            The form diagram.
+
+        Returns
+        -------
+        tuple
+            The coordinates (n x 3), thickness (n x 1), loads (n x 3) and force densities (m x 1).
+
+        """
+        xyz = array(form.vertices_attributes("xyz"), dtype=float64)
+        thick = array(form.vertices_attribute("t"), dtype=float64).reshape((-1, 1))
+        p = array(form.vertices_attributes(("px", "py", "pz")), dtype=float64)
+        q = array(form.edges_attribute("q", keys=self.edges), dtype=float64).reshape((-1, 1))
+        return xyz, thick, p, q
+
+    def loads(self, p0, thickness, density: float = 1.0) -> LoadUpdater:
+        """Configure the load updater of the problem.
+
+        Parameters
+        ----------
+        p0 : ndarray (n x 3)
+            The additional (fixed) loads at the vertices.
+        thickness : ndarray (n x 1) or float
+            The thickness per vertex.
+        density : float, optional
+            The density for selfweight calculations.
+
+        Returns
+        -------
+        :class:`LoadUpdater`
+
+        """
+        self.update_loads.p0 = p0
+        self.update_loads.thickness = thickness
+        self.update_loads.density = density
+        return self.update_loads
+
+    def system(self, q, monitor: Optional[Monitor] = None) -> tuple:
+        """Get the factorized system of vertical equilibrium for given force densities.
+
+        Parameters
+        ----------
+        q : ndarray (m x 1)
+            The force densities.
+        monitor : :class:`Monitor`, optional
+            A monitor receiving the assembly and factorization phases, if the system has to be factorized.
+
+        Returns
+        -------
+        tuple
+            The factorized system (see :func:`vertical_system`),
+            and the factor with which the system has to be scaled for the given force densities.
+
+        """
+        if self._q is not None:
+            index = argmax(abs(self._q))
+            if self._q[index, 0]:
+                factor = q[index, 0] / self._q[index, 0]
+                if factor and allclose(q, factor * self._q, rtol=1e-12, atol=0):
+                    return self._system, factor
+        Q = diags([q.ravel()], [0])  # type: ignore
+        self._system = vertical_system(Q, self.C, self.free, self.fixed, monitor=monitor)
+        self._q = array(q, copy=True)
+        return self._system, 1.0
 
 
 def vertical_from_zmax(
@@ -20,6 +151,8 @@ def vertical_from_zmax(
     rtol: float = 1e-3,
     density: float = 1.0,
     display: bool = False,
+    monitor: Optional[Monitor] = None,
+    problem: Optional[VerticalProblem] = None,
 ) -> tuple[FormDiagram, float]:
     """For the given form and force diagram, compute the scale of the force
     diagram for which the highest point of the thrust network is equal to a
@@ -47,6 +180,13 @@ def vertical_from_zmax(
     display : bool, optional
         If True, information about the current iteration will be displayed.
         Default is False.
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the phases and iterations of the solver.
+        Default is ``None``.
+    problem : :class:`VerticalProblem`, optional
+        The precompiled vertical problem of the form diagram,
+        for reusing the index maps, connectivity matrices, load updater and factorizations across calls.
+        Default is ``None``.
 
     Returns
     -------
@@ -55,102 +195,107 @@ def vertical_from_zmax(
 
     """
     xtol2 = xtol**2
-    # --------------------------------------------------------------------------
-    # FormDiagram
-    # --------------------------------------------------------------------------
-    k_i = form.vertex_index()
-    uv_i = form.uv_index()
-
-    vcount = len(form.vertex)
-    supports = list(form.supports())
-    fixed = [k_i[key] for key in supports]
-    free = list(set(range(vcount)) - set(fixed))
-    xyz = array(form.vertices_attributes("xyz"), dtype=float64)
-    thick = array(form.vertices_attribute("t"), dtype=float64).reshape((-1, 1))
-    p = array(form.vertices_attributes(("px", "py", "pz")), dtype=float64)
-
-    edges = list(form.edges_where({"_is_edge": True}))
-    q = array(form.edges_attribute("q", keys=edges), dtype=float64).reshape((-1, 1))
-    edges = [(k_i[u], k_i[v]) for u, v in edges]
-
-    C = connectivity_matrix(edges, "csr")
-    Ci = C[:, free]
-    Cf = C[:, fixed]
-    Cit = Ci.transpose()
-    Ct = C.transpose()
-    # --------------------------------------------------------------------------
-    # original data
-    # --------------------------------------------------------------------------
-    p0 = array(p, copy=True)
-    q0 = array(q, copy=True)
-    # --------------------------------------------------------------------------
-    # load updater
-    # --------------------------------------------------------------------------
-    update_loads = LoadUpdater(form, p0, thickness=thick, density=density)  # type: ignore
-    # --------------------------------------------------------------------------
-    # scale to zmax
-    # note that zmax should not exceed scale * diagonal
-    # --------------------------------------------------------------------------
-    scale = 1.0
-
-    for k in range(kmax):
-        if display:
-            print(k)
-
-        update_loads(p, xyz)
 
+    monitor = monitor or Monitor()
+    with monitor.phase("vertical_from_zmax"):
+        with monitor.phase("index"):
+            # --------------------------------------------------------------------------
+            # FormDiagram
+            # --------------------------------------------------------------------------
+            if problem is None:
+                problem = VerticalProblem(form)
+            else:
+                problem.check(form)
+
+            k_i = problem.k_i
+            uv_i = problem.uv_i
+            free = problem.free
+            fixed = problem.fixed
+            C = problem.C
+            xyz, thick, p, q = problem.data(form)
+        with monitor.phase("assembly"):
+            # --------------------------------------------------------------------------
+            # original data
+            # --------------------------------------------------------------------------
+            p0 = array(p, copy=True)
+            q0 = array(q, copy=True)
+            # --------------------------------------------------------------------------
+            # load updater
+            # --------------------------------------------------------------------------
+            update_loads = problem.loads(p0, thick, density)
+        # --------------------------------------------------------------------------
+        # the system of the unscaled force densities
+        # the system of the scaled force densities is the same system, scaled
+        # --------------------------------------------------------------------------
+        system, factor = problem.system(q0, monitor=monitor)
+        A0_solve, B0, CtQC = system
+        # --------------------------------------------------------------------------
+        # scale to zmax
+        # note that zmax should not exceed scale * diagonal
+        # --------------------------------------------------------------------------
+        with monitor.phase("iterations"):
+            scale = 1.0
+
+            for k in range(kmax):
+                if display:
+                    print(k)
+
+                update_loads(p, xyz)
+
+                xyz[free, 2] = A0_solve(p[free, 2] / (scale * factor) - B0.dot(xyz[fixed, 2]))
+                z = max(xyz[free, 2])
+                res2 = (z - zmax) ** 2
+
+                monitor.iteration(k, abs(z - zmax))
+
+                if k > 10:
+                    if res2 < xtol2:
+                        break
+
+                scale = scale * (z / zmax)
+
+        # --------------------------------------------------------------------------
+        # vertical
+        # --------------------------------------------------------------------------
         q = scale * q0
-        Q = diags([q.ravel()], [0])  # type: ignore
-        A = Cit.dot(Q).dot(Ci)
-        b = p[free, 2] - Cit.dot(Q).dot(Cf).dot(xyz[fixed, 2])
-        xyz[free, 2] = spsolve(A, b)
-        z = max(xyz[free, 2])
-        res2 = (z - zmax) ** 2
-
-        if k > 10:
-            if res2 < xtol2:
-                break
-
-        scale = scale * (z / zmax)
-    # --------------------------------------------------------------------------
-    # vertical
-    # --------------------------------------------------------------------------
-    q = scale * q0
-    Q = diags([q.ravel()], [0])  # type: ignore
-
-    update_z(
-        xyz,
-        Q,
-        C,
-        p,
-        free,
-        fixed,
-        update_loads,
-        tol=rtol,
-        kmax=kmax,
-        display=display,
-    )
-    # --------------------------------------------------------------------------
-    # update
-    # --------------------------------------------------------------------------
-    f = q * normrow(C.dot(xyz))
-    r = Ct.dot(Q).dot(C).dot(xyz) - p
-    # --------------------------------------------------------------------------
-    # form
-    # --------------------------------------------------------------------------
-    for vertex in form.vertices():
-        index = k_i[vertex]
-        form.vertex_attribute(vertex, "z", xyz[index, 2])
-        form.vertex_attributes(vertex, ["_rx", "_ry", "_rz"], r[index])
-
-    for edge in form.edges_where({"_is_edge": True}):
-        index = uv_i[edge]  # type: ignore
-        form.edge_attributes(edge, ["q", "_f"], [q[index, 0], f[index, 0]])
+
+        update_z(
+            xyz,
+            None,
+            C,
+            p,
+            free,
+            fixed,
+            update_loads,
+            tol=rtol,
+            kmax=kmax,
+            display=display,
+            monitor=monitor,
+            system=system,
+            scale=scale * factor,
+        )
+        # --------------------------------------------------------------------------
+        # update
+        # --------------------------------------------------------------------------
+        with monitor.phase("writeback"):
+            f = q * normrow(C.dot(xyz))
+            r = scale * factor * CtQC.dot(xyz) - p
+            # --------------------------------------------------------------------------
+            # form
+            # --------------------------------------------------------------------------
+            for vertex in form.vertices():
+                index = k_i[vertex]
+                form.vertex_attribute(vertex, "z", xyz[index, 2])
+                form.vertex_attributes(vertex, ["_rx", "_ry", "_rz"], r[index])
+
+            for edge in form.edges_where({"_is_edge": True}):
+                index = uv_i[edge]  # type: ignore
+                form.edge_attributes(edge, ["q", "_f"], [q[index, 0], f[index, 0]])
 
     return form, scale
 
 
-def vertical_from_q(form, scale=1.0, density=1.0, kmax=100, tol=1e-3, display=False):
+def vertical_from_q(form, scale=1.0, density=1.0, kmax=100, tol=1e-3, display=False, monitor=None, problem=None):
     r"""Compute vertical equilibrium from the force densities of the independent edges.
 
     Parameters
@@ -173,6 +318,13 @@ def vertical_from_q(form, scale=1.0, density=1.0, kmax=100, tol=1e-3, display=Fa
     display : bool
         Display information about the current iteration.
         Default is ``False``.
+    monitor : :class:`Monitor`, optional
+        A monitor receiving the phases and iterations of the solver.
+        Default is ``None``.
+    problem : :class:`VerticalProblem`, optional
+        The precompiled vertical problem of the form diagram,
+        for reusing the index maps, connectivity matrices, load updater and factorizations across calls.
+        Default is ``None``.
 
     Notes
     -----
@@ -188,53 +340,54 @@ def vertical_from_q(form, scale=1.0, density=1.0, kmax=100, tol=1e-3, display=Fa
             &= \frac{f_{i, thrust}}{l_{i, thrust}}
 
     """
-    k_i = form.vertex_index()
-    uv_i = form.uv_index()
-
-    vcount = form.number_of_vertices()
-    supports = list(form.supports())
-    fixed = [k_i[key] for key in supports]
-    free = list(set(range(vcount)) - set(fixed))
-    xyz = array(form.vertices_attributes("xyz"), dtype=float64)
-    thick = array(form.vertices_attribute("t"), dtype=float64).reshape((-1, 1))
-    p = array(form.vertices_attributes(("px", "py", "pz")), dtype=float64)
-
-    edges = list(form.edges_where({"_is_edge": True}))
-    q = array(form.edges_attribute("q", keys=edges), dtype=float64).reshape((-1, 1))
-    edges = [(k_i[u], k_i[v]) for u, v in edges]
-
-    C = connectivity_matrix(edges, "csr")
-    # --------------------------------------------------------------------------
-    # original data
-    # --------------------------------------------------------------------------
-    p0 = array(p, copy=True)
-    q0 = array(q, copy=True)
-    # --------------------------------------------------------------------------
-    # load updater
-    # --------------------------------------------------------------------------
-    update_loads = LoadUpdater(form, p0, thickness=thick, density=density)  # type: ignore
-    # --------------------------------------------------------------------------
-    # update forcedensity based on given q[ind]
-    # --------------------------------------------------------------------------
-    q = scale * q0
-    Q = diags([q.ravel()], [0])  # type: ignore
-    # --------------------------------------------------------------------------
-    # compute vertical
-    # --------------------------------------------------------------------------
-    update_z(xyz, Q, C, p, free, fixed, update_loads, tol=tol, kmax=kmax, display=display)
-    # --------------------------------------------------------------------------
-    # update
-    # --------------------------------------------------------------------------
-    f = q * normrow(C.dot(xyz))
-    r = C.transpose().dot(Q).dot(C).dot(xyz) - p
-    # --------------------------------------------------------------------------
-    # form
-    # --------------------------------------------------------------------------
-    for vertex in form.vertices():
-        index = k_i[vertex]
-        form.vertex_attribute(vertex, "z", xyz[index, 2])
-        form.vertex_attributes(vertex, ["_rx", "_ry", "_rz"], r[index])
-
-    for edge in form.edges_where({"_is_edge": True}):
-        index = uv_i[edge]
-        form.edge_attribute(edge, "_f", f[index, 0])
+    monitor = monitor or Monitor()
+    with monitor.phase("vertical_from_q"):
+        with monitor.phase("index"):
+            if problem is None:
+                problem = VerticalProblem(form)
+            else:
+                problem.check(form)
+
+            k_i = problem.k_i
+            uv_i = problem.uv_i
+            free = problem.free
+            fixed = problem.fixed
+            C = problem.C
+            xyz, thick, p, q = problem.data(form)
+        with monitor.phase("assembly"):
+            # --------------------------------------------------------------------------
+            # original data
+            # --------------------------------------------------------------------------
+            p0 = array(p, copy=True)
+            q0 = array(q, copy=True)
+            # --------------------------------------------------------------------------
+            # load updater
+            # --------------------------------------------------------------------------
+            update_loads = problem.loads(p0, thick, density)
+            # --------------------------------------------------------------------------
+            # update forcedensity based on given q[ind]
+            # --------------------------------------------------------------------------
+            q = scale * q0
+        system, factor = problem.system(q0, monitor=monitor)
+        _, _, CtQC = system
+        # --------------------------------------------------------------------------
+        # compute vertical
+        # --------------------------------------------------------------------------
+        update_z(xyz, None, C, p, free, fixed, update_loads, tol=tol, kmax=kmax, display=display, monitor=monitor, system=system, scale=scale * factor)
+        # --------------------------------------------------------------------------
+        # update
+        # --------------------------------------------------------------------------
+        with monitor.phase("writeback"):
+            f = q * normrow(C.dot(xyz))
+            r = scale * factor * CtQC.dot(xyz) - p
+            # --------------------------------------------------------------------------
+            # form
+            # --------------------------------------------------------------------------
+            for vertex in form.vertices():
+                index = k_i[vertex]
+                form.vertex_attribute(vertex, "z", xyz[index, 2])
+                form.vertex_attributes(vertex, ["_rx", "_ry", "_rz"], r[index])
+
+            for edge in form.edges_where({"_is_edge": True}):
+                index = uv_i[edge]
+                form.edge_attribute(edge, "_f", f[index, 0])
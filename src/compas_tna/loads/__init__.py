@@ -1,5 +1,17 @@
 from .loadupdater import LoadUpdater
+from .interpolation import ScatteredInterpolator
+from .interpolation import scattered_interpolator
+from .selfweight import face_arrays
+from .selfweight import lumped_selfweight
+from .selfweight import tributary_areas
+from .thickness import distribute_thickness
 
 __all__ = [
     "LoadUpdater",
+    "ScatteredInterpolator",
+    "distribute_thickness",
+    "face_arrays",
+    "lumped_selfweight",
+    "scattered_interpolator",
+    "tributary_areas",
 ]
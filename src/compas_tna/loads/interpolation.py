@@ -0,0 +1,186 @@
+from typing import Optional
+
+import numpy
+import numpy.typing as npt
+from scipy.interpolate import CloughTocher2DInterpolator
+from scipy.spatial import Delaunay
+from scipy.spatial import cKDTree
+
+from compas_tna.cache import LRUCache
+from compas_tna.cache import fingerprint
+
+
+class LinearInterpolator:
+    """Piecewise-linear interpolation of values given at scattered points, with its gradient.
+
+    The interpolation is the same as that of :func:`scipy.interpolate.griddata` with ``method="linear"``,
+    but the Delaunay triangulation of the points and the gradients of its triangles are computed only once,
+    such that the interpolator can be evaluated repeatedly at low cost.
+
+    Parameters
+    ----------
+    xy : array-like (n x 2)
+        The XY coordinates of the points.
+    values : array-like (n,)
+        The values at the points.
+    triangulation : :class:`scipy.spatial.Delaunay`, optional
+        The Delaunay triangulation of the points, if it is already available.
+
+    """
+
+    def __init__(self, xy, values, triangulation: Optional[Delaunay] = None):
+        self.triangulation = Delaunay(numpy.asarray(xy, dtype=numpy.float64)) if triangulation is None else triangulation
+        self.values = numpy.asarray(values, dtype=numpy.float64)
+        simplices = self.triangulation.simplices
+        transform = self.triangulation.transform
+        # the barycentric coordinates of a point are b = T (xy - r), and the value is v2 + b . (v[:2] - v2)
+        dv = self.values[simplices[:, :2]] - self.values[simplices[:, [2]]]
+        self.gradients = numpy.einsum("sji,sj->si", transform[:, :2], dv)
+
+    def __call__(self, xy, fill_value=numpy.nan):
+        """Evaluate the interpolation and its gradient at a set of points.
+
+        Parameters
+        ----------
+        xy : array-like (m x 2)
+            The XY coordinates of the points.
+        fill_value : float, optional
+            The value of the points outside the convex hull of the triangulation.
+            Default is ``nan``.
+
+        Returns
+        -------
+        tuple[ndarray, ndarray]
+            The values (m,) and the gradients (m x 2) at the points.
+            The gradients of the points outside the convex hull are zero.
+
+        """
+        xy = numpy.asarray(xy, dtype=numpy.float64).reshape((-1, 2))
+        simplex = self.triangulation.find_simplex(xy)
+        inside = simplex >= 0
+        values = numpy.full(xy.shape[0], fill_value, dtype=numpy.float64)
+        gradients = numpy.zeros((xy.shape[0], 2), dtype=numpy.float64)
+
+        s = simplex[inside]
+        transform = self.triangulation.transform[s]
+        b = numpy.einsum("sij,sj->si", transform[:, :2], xy[inside] - transform[:, 2])
+        vertices = self.triangulation.simplices[s]
+        values[inside] = self.values[vertices[:, 2]] + numpy.einsum("si,si->s", b, self.values[vertices[:, :2]] - self.values[vertices[:, [2]]])
+        gradients[inside] = self.gradients[s]
+        return values, gradients
+
+
+class ScatteredInterpolator:
+    """Interpolation of values given at a fixed set of scattered points.
+
+    The Delaunay triangulation and the search tree of the points are constructed once, on first use,
+    and shared by all interpolations of values at the same points.
+    Use :func:`scattered_interpolator` to reuse the interpolator of a set of points between calls.
+
+    Parameters
+    ----------
+    xy : array-like (n x 2)
+        The XY coordinates of the points.
+
+    Examples
+    --------
+    >>> interpolator = scattered_interpolator(xy)
+    >>> t = interpolator(thickness, xi, method="linear", extrapolate=True)
+
+    """
+
+    methods = ("linear", "nearest", "cubic")
+
+    def __init__(self, xy: npt.ArrayLike):
+        self.xy = numpy.array(xy, dtype=numpy.float64).reshape((-1, 2))
+        self._triangulation = None
+        self._tree = None
+
+    @property
+    def triangulation(self) -> Delaunay:
+        """The Delaunay triangulation of the points."""
+        if self._triangulation is None:
+            self._triangulation = Delaunay(self.xy)
+        return self._triangulation
+
+    @property
+    def tree(self) -> cKDTree:
+        """The search tree of the points."""
+        if self._tree is None:
+            self._tree = cKDTree(self.xy)
+        return self._tree
+
+    def __call__(
+        self,
+        values: npt.ArrayLike,
+        xi: npt.ArrayLike,
+        method: str = "linear",
+        extrapolate: bool = True,
+        fill_value: float = numpy.nan,
+    ) -> npt.NDArray:
+        """Interpolate values given at the points.
+
+        Parameters
+        ----------
+        values : array-like (n,)
+            The values at the points.
+        xi : array-like (m x 2)
+            The XY coordinates at which the values are interpolated.
+        method : {"linear", "nearest", "cubic"}, optional
+            The interpolation method, as in :func:`scipy.interpolate.griddata`.
+            Default is ``"linear"``.
+        extrapolate : bool, optional
+            If True, the values outside the convex hull of the points are the values of the nearest points.
+            Otherwise, they are ``fill_value``.
+            Default is True.
+        fill_value : float, optional
+            The value outside the convex hull of the points, if they are not extrapolated.
+            Default is ``nan``.
+
+        Returns
+        -------
+        ndarray (m,)
+
+        """
+        values = numpy.asarray(values, dtype=numpy.float64).reshape(-1)
+        xi = numpy.asarray(xi, dtype=numpy.float64).reshape((-1, 2))
+        if values.shape[0] != self.xy.shape[0]:
+            raise ValueError(f"Expected {self.xy.shape[0]} values, got {values.shape[0]}.")
+        if method == "nearest":
+            return values[self.tree.query(xi)[1]]
+        if method == "linear":
+            result, _ = LinearInterpolator(self.xy, values, self.triangulation)(xi)
+        elif method == "cubic":
+            result = CloughTocher2DInterpolator(self.triangulation, values)(xi)
+        else:
+            raise ValueError(f"Unknown interpolation method: {method}. Use one of {', '.join(self.methods)}.")
+        outside = numpy.isnan(result)
+        if outside.any():
+            if extrapolate:
+                result[outside] = values[self.tree.query(xi[outside])[1]]
+            else:
+                result[outside] = fill_value
+        return result
+
+
+INTERPOLATORS = LRUCache(maxsize=8)
+
+
+def scattered_interpolator(xy: npt.ArrayLike) -> ScatteredInterpolator:
+    """Get the interpolator of a set of scattered points.
+
+    The interpolators of the most recently used sets of points are cached,
+    such that the triangulation of the same points is not repeated.
+
+    Parameters
+    ----------
+    xy : array-like (n x 2)
+        The XY coordinates of the points.
+
+    Returns
+    -------
+    :class:`ScatteredInterpolator`
+
+    """
+    xy = numpy.array(xy, dtype=numpy.float64).reshape((-1, 2))
+    return INTERPOLATORS.get(fingerprint(xy), lambda: ScatteredInterpolator(xy))
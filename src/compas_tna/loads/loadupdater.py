@@ -6,10 +6,11 @@ import numpy.typing as npt
 import scipy.sparse
 
 from compas.datastructures import Mesh
-from compas.geometry import cross_vectors
-from compas.geometry import length_vector
 from compas.matrices import face_matrix
 
+from .selfweight import face_arrays
+from .selfweight import tributary_areas
+
 
 class LoadUpdater:
     """Class for constructing a callable for updating loads when geometry and selfweight change.
@@ -62,7 +63,9 @@ class LoadUpdater:
         self.vertex_index = mesh.vertex_index()
         self.fvertex_index = {face: index for index, face in enumerate(mesh.faces())}
         self.is_loaded = {face: mesh.face_attribute(face, "_is_loaded") for face in mesh.faces()}
+        self.indptr, self.indices, self.loaded = face_arrays(mesh)
         self.F = self.face_matrix()
+        self._triangles = None
 
     def __call__(
         self,
@@ -96,12 +99,82 @@ class LoadUpdater:
             face_vertices[self.fvertex_index[fkey]] = [self.vertex_index[key] for key in self.mesh.face_vertices(fkey)]  # type: ignore
         return face_matrix(face_vertices, rtype="csr", normalize=True)  # type: ignore
 
+    def triangles(self) -> tuple:
+        """Compute the triangles that make up the tributary areas of the vertices.
+
+        Every halfedge ``(u, v)`` of a loaded face contributes the triangle
+        formed by ``u``, the midpoint of the edge, and the centroid of the face
+        to the tributary area of ``u``.
+
+        Returns
+        -------
+        tuple[ndarray, ndarray, ndarray]
+            The indices of the vertices ``u``, of the vertices ``v``, and of the faces.
+
+        """
+        if self._triangles is None:
+            mesh = self.mesh
+            vertex_index = self.vertex_index
+            fvertex_index = self.fvertex_index
+            is_loaded = self.is_loaded
+            triangles = []
+            for u in mesh.vertices():
+                for v in mesh.halfedge[u]:
+                    for fkey in (mesh.halfedge[u][v], mesh.halfedge[v][u]):
+                        if fkey is not None and is_loaded[fkey]:
+                            triangles.append((vertex_index[u], vertex_index[v], fvertex_index[fkey]))
+            triangles = numpy.array(triangles, dtype=int).reshape((-1, 3))
+            self._triangles = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+        return self._triangles
+
+    def jacobian(
+        self,
+        xyz: Annotated[npt.NDArray[numpy.float64], Literal["*, 3"]],
+    ) -> scipy.sparse.csr_matrix:
+        """Compute the derivatives of the vertical loads with respect to the heights of the vertices.
+
+        Parameters
+        ----------
+        xyz : ndarray (number_of_vertices x 3)
+            The current vertex coordinates.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix (number_of_vertices x number_of_vertices)
+            The derivative of the vertical load at every vertex (rows)
+            with respect to the height of every vertex (columns).
+
+        """
+        n = xyz.shape[0]
+        U, V, F = self.triangles()
+        C = self.F.dot(xyz)
+        a = xyz[V] - xyz[U]
+        b = C[F] - xyz[U]
+        w = numpy.cross(a, b)
+        length = numpy.linalg.norm(w, axis=1).reshape((-1, 1))
+        nw = numpy.divide(w, length, out=numpy.zeros_like(w), where=length > 0)
+        # the derivatives of the area of a triangle
+        # with respect to the heights of the edge vertex (g1) and of the face centroid (g2)
+        g1 = 0.25 * (nw[:, 1] * b[:, 0] - nw[:, 0] * b[:, 1])
+        g2 = 0.25 * (nw[:, 0] * a[:, 1] - nw[:, 1] * a[:, 0])
+        t = len(U)
+        rows = numpy.hstack([U, U])
+        cols = numpy.hstack([V, U])
+        data = numpy.hstack([g1, -g1 - g2])
+        J = scipy.sparse.coo_matrix((data, (rows, cols)), shape=(n, n)).tocsr()
+        S = scipy.sparse.coo_matrix((g2, (U, numpy.arange(t))), shape=(n, t)).tocsr()
+        J = J + S.dot(self.F[F])
+        factor = numpy.broadcast_to(numpy.asarray(self.thickness, dtype=float).reshape((-1, 1)) * self.density + self.live, (n, 1))
+        return scipy.sparse.diags(factor[:, 0]).dot(J).tocsr()
+
     def tributary_areas(
         self,
         xyz: Annotated[npt.NDArray[numpy.float64], Literal["*, 3"]],
     ) -> Annotated[npt.NDArray[numpy.float64], Literal["*, 1"]]:
         """Compute the tributary area per vertex.
 
+        The areas of the loaded faces are lumped with :func:`compas_tna.loads.tributary_areas`.
+
         Parameters
         ----------
         xyz : ndarray (number_of_vertices x 3)
@@ -112,25 +185,4 @@ class LoadUpdater:
         ndarray (number_of_vertices x 1)
 
         """
-        mesh = self.mesh
-        vertex_index = self.vertex_index
-        fvertex_index = self.fvertex_index
-        is_loaded = self.is_loaded
-        C = self.F.dot(xyz)
-        areas = numpy.zeros((xyz.shape[0], 1))
-        for u in mesh.vertices():
-            p0 = xyz[vertex_index[u]]
-            a = 0
-            for v in mesh.halfedge[u]:
-                p1 = xyz[vertex_index[v]]
-                p01 = p1 - p0
-                fkey = mesh.halfedge[u][v]
-                if fkey is not None and is_loaded[fkey]:
-                    p2 = C[fvertex_index[fkey]]
-                    a += 0.25 * length_vector(cross_vectors(p01, p2 - p0))
-                fkey = mesh.halfedge[v][u]
-                if fkey is not None and is_loaded[fkey]:
-                    p3 = C[fvertex_index[fkey]]
-                    a += 0.25 * length_vector(cross_vectors(p01, p3 - p0))
-            areas[vertex_index[u]] = a
-        return areas
+        return tributary_areas(xyz, self.indptr, self.indices, self.loaded).reshape((-1, 1))
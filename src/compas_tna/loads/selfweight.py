@@ -0,0 +1,138 @@
+from itertools import chain
+from typing import Optional
+from typing import Union
+
+import numpy
+import numpy.typing as npt
+
+from compas.datastructures import Mesh
+
+
+def face_arrays(mesh: Mesh) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+    """Collect the faces of a mesh or form diagram as index arrays.
+
+    Parameters
+    ----------
+    mesh : :class:`Mesh` | :class:`CompactFormDiagram`
+        The mesh.
+
+    Returns
+    -------
+    tuple[ndarray, ndarray, ndarray]
+        The offsets of the faces in the vertex indices (f + 1,),
+        the vertex indices of the corners of all faces, face after face, in the order of :meth:`Mesh.vertices` (c,),
+        and the loaded faces (f,), i.e. the faces of which the attribute ``_is_loaded`` is not False.
+
+    """
+    loaded = numpy.array([value is not False for value in mesh.faces_attribute("_is_loaded")], dtype=bool)
+    indptr = getattr(mesh, "face_indptr", None)
+    indices = getattr(mesh, "face_indices", None)
+    if indptr is not None and indices is not None:
+        return numpy.asarray(indptr, dtype=numpy.int64), numpy.asarray(indices, dtype=numpy.int64), loaded
+    vertex_index = mesh.vertex_index()
+    faces = [mesh.face_vertices(face) for face in mesh.faces()]
+    indptr = numpy.zeros(len(faces) + 1, dtype=numpy.int64)
+    numpy.cumsum([len(vertices) for vertices in faces], out=indptr[1:])
+    indices = numpy.fromiter((vertex_index[vertex] for vertex in chain.from_iterable(faces)), dtype=numpy.int64, count=int(indptr[-1]))
+    return indptr, indices, loaded
+
+
+def tributary_areas(
+    xyz: npt.ArrayLike,
+    indptr: npt.ArrayLike,
+    indices: npt.ArrayLike,
+    loaded: Optional[npt.ArrayLike] = None,
+) -> npt.NDArray:
+    """Compute the tributary areas of the vertices of a mesh.
+
+    The tributary area of a vertex consists of the triangles formed by the vertex,
+    the midpoints of its edges and the centroids of the loaded faces around it,
+    as in :meth:`Mesh.vertex_area`.
+
+    Parameters
+    ----------
+    xyz : array-like (n x 3)
+        The coordinates of the vertices.
+    indptr : array-like (f + 1,)
+        The offsets of the faces in the vertex indices.
+    indices : array-like (c,)
+        The vertex indices of the corners of all faces, face after face.
+    loaded : array-like (f,), optional
+        A boolean mask of the faces that contribute to the tributary areas.
+        Default is ``None``, in which case all faces contribute.
+
+    Returns
+    -------
+    ndarray (n,)
+
+    """
+    xyz = numpy.asarray(xyz, dtype=numpy.float64)
+    indptr = numpy.asarray(indptr, dtype=numpy.int64)
+    corners = numpy.asarray(indices, dtype=numpy.int64)
+    n = xyz.shape[0]
+    sizes = numpy.diff(indptr)
+    corner_face = numpy.repeat(numpy.arange(sizes.shape[0]), sizes)
+    # the corners following and preceding every corner in its face
+    position = numpy.arange(corners.shape[0])
+    corner_next = position + 1
+    corner_next[indptr[1:][sizes > 0] - 1] = indptr[:-1][sizes > 0]
+    corner_prev = position - 1
+    corner_prev[indptr[:-1][sizes > 0]] = indptr[1:][sizes > 0] - 1
+
+    centroids = numpy.stack([numpy.bincount(corner_face, weights=xyz[corners, i], minlength=sizes.shape[0]) for i in range(3)], axis=1)
+    centroids /= numpy.maximum(sizes, 1)[:, None]
+
+    p = xyz[corners]
+    pc = centroids[corner_face] - p
+    a = numpy.linalg.norm(numpy.cross(xyz[corners[corner_next]] - p, pc), axis=1)
+    a += numpy.linalg.norm(numpy.cross(xyz[corners[corner_prev]] - p, pc), axis=1)
+    if loaded is not None:
+        a *= numpy.asarray(loaded, dtype=bool)[corner_face]
+    return 0.25 * numpy.bincount(corners, weights=a, minlength=n)
+
+
+def lumped_selfweight(
+    xyz: npt.ArrayLike,
+    indptr: npt.ArrayLike,
+    indices: npt.ArrayLike,
+    loaded: Optional[npt.ArrayLike] = None,
+    thickness: Union[float, npt.ArrayLike] = 1.0,
+    density: float = 1.0,
+) -> npt.NDArray:
+    """Lump the self-weight of a shell at the vertices of a mesh.
+
+    The self-weight of a vertex is the weight of its tributary area (see :func:`tributary_areas`)
+    with the thickness of the vertex.
+
+    Parameters
+    ----------
+    xyz : array-like (n x 3)
+        The coordinates of the vertices.
+    indptr : array-like (f + 1,)
+        The offsets of the faces in the vertex indices.
+    indices : array-like (c,)
+        The vertex indices of the corners of all faces, face after face.
+    loaded : array-like (f,), optional
+        A boolean mask of the faces that carry self-weight.
+        Default is ``None``, in which case all faces carry self-weight.
+    thickness : float | array-like (n,), optional
+        The thickness of the shell, at every vertex or constant.
+        Default is ``1.0``.
+    density : float, optional
+        The density of the material.
+        Default is ``1.0``.
+
+    Returns
+    -------
+    ndarray (n,)
+        The vertical loads at the vertices, negative in the direction of gravity.
+
+    Examples
+    --------
+    >>> indptr, indices, loaded = face_arrays(form)
+    >>> xyz = numpy.array(form.vertices_attributes("xyz"))
+    >>> pz = lumped_selfweight(xyz, indptr, indices, loaded, thickness=0.25, density=20.0)
+
+    """
+    areas = tributary_areas(xyz, indptr, indices, loaded)
+    return -density * numpy.asarray(thickness, dtype=numpy.float64).reshape(-1) * areas
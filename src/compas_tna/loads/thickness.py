@@ -1,15 +1,27 @@
-from numpy import array
-from scipy.interpolate import griddata
+import numpy
 
 from compas_tna.diagrams import FormDiagram
 
+from .interpolation import scattered_interpolator
 
-def distribute_thickness(formdiagram: FormDiagram) -> None:
+
+def distribute_thickness(formdiagram: FormDiagram, method: str = "linear", extrapolate: bool = True) -> None:
     """Distribute thickness by interpolating provided values over the vertex grid.
 
+    The triangulation of the vertices with a thickness is cached,
+    such that the thickness is redistributed at low cost as long as these vertices don't move.
+
     Parameters
     ----------
-    formdiagram : :class:`FormDiagram`
+    formdiagram : :class:`FormDiagram` | :class:`CompactFormDiagram`
+    method : {"linear", "nearest", "cubic"}, optional
+        The interpolation method of :class:`ScatteredInterpolator`.
+        Default is ``"linear"``.
+    extrapolate : bool, optional
+        If True, the vertices outside the convex hull of the vertices with a thickness
+        get the thickness of the nearest of those vertices.
+        Otherwise, their thickness is ``nan``.
+        Default is True.
 
     Returns
     -------
@@ -17,26 +29,14 @@ def distribute_thickness(formdiagram: FormDiagram) -> None:
         The missing thickness values are updated directly in the FormDiagram.
 
     """
-    points = []
-    values = []
-    xi = []
-    index_key = {}
-    index = 0
-    for key in formdiagram.vertices():
-        t = formdiagram.vertex_attribute(key, "t")
-        xy = formdiagram.vertex_attributes(key, "xy")
-        if t:
-            points.append(xy)
-            values.append(t)
-        else:
-            xi.append(xy)
-            index_key[index] = key
-            index += 1
-    points = array(points)
-    values = array(values)
-    xi = array(xi)
-    t = griddata(points, values, xi, method="linear")
-    t = t.flatten().tolist()
-    for index, value in enumerate(t):
-        key = index_key[index]
-        formdiagram.vertex_attribute(key, "t", value)
+    xy = numpy.array(formdiagram.vertices_attributes("xy"), dtype=float).reshape((-1, 2))
+    t = numpy.array([value or numpy.nan for value in formdiagram.vertices_attribute("t")], dtype=float)
+    missing = numpy.isnan(t)
+    if not missing.any():
+        return
+    t[missing] = scattered_interpolator(xy[~missing])(t[~missing], xy[missing], method=method, extrapolate=extrapolate)
+
+    # write the interpolated values in a single pass over the attributes of the vertices
+    for (_, attr), is_missing, value in zip(formdiagram.vertices(data=True), missing.tolist(), t.tolist()):
+        if is_missing:
+            attr["t"] = value
@@ -0,0 +1,12 @@
+from __future__ import absolute_import
+
+import compas
+
+__all__ = []
+
+if not compas.IPY:
+    from .sweep_numpy import sweep_numpy
+
+    __all__ += [
+        "sweep_numpy",
+    ]
@@ -0,0 +1,148 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+import numpy
+import numpy.typing as npt
+
+from compas.datastructures import Mesh
+from compas_tna.diagrams import CompactFormDiagram
+
+# the diagram and pipeline of a worker process
+# these are sent to every worker once, when the worker is started
+_DIAGRAM: Optional[CompactFormDiagram] = None
+_PIPELINE: Optional[Callable] = None
+
+
+def _initialize(diagram: CompactFormDiagram, pipeline: Callable) -> None:
+    global _DIAGRAM, _PIPELINE
+    _DIAGRAM = diagram
+    _PIPELINE = pipeline
+
+
+def _run(params: dict) -> tuple:
+    form: CompactFormDiagram = _DIAGRAM.copy()  # type: ignore
+    try:
+        result = _PIPELINE(form, **params)  # type: ignore
+        result = numpy.nan if result is None else float(result)
+        vertices = form.vertex_columns
+        edges = form.edge_columns
+        z = numpy.array(vertices["z"], dtype=numpy.float64)
+        q = numpy.array(edges["q"][edges["_is_edge"]], dtype=numpy.float64)
+        r = numpy.column_stack([vertices["_rx"], vertices["_ry"], vertices["_rz"]]).astype(numpy.float64)
+    except Exception as exc:
+        return False, numpy.nan, None, None, None, repr(exc)
+    return True, result, z, q, r, ""
+
+
+def _grid(grid: Union[dict, list[dict]]) -> list[dict]:
+    if isinstance(grid, dict):
+        names = list(grid)
+        return [dict(zip(names, values)) for values in product(*[grid[name] for name in names])]
+    return [dict(params) for params in grid]
+
+
+def sweep_numpy(
+    form: Union[Mesh, CompactFormDiagram],
+    grid: Union[dict, list[dict]],
+    pipeline: Callable,
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+) -> npt.NDArray:
+    """Run a solver pipeline on copies of a form diagram for every combination of parameters in a grid.
+
+    Parameters
+    ----------
+    form : :class:`FormDiagram` | :class:`CompactFormDiagram`
+        The form diagram.
+    grid : dict[str, list] | list[dict]
+        The parameter grid.
+        A dict mapping parameter names to sequences of values is expanded into all combinations of values.
+        A list of dicts is used as is.
+    pipeline : callable
+        The function running the solvers, with signature ``pipeline(form, **params) -> float | None``.
+        The function receives an independent copy of the diagram as a :class:`CompactFormDiagram`,
+        and the parameters of a single run as keyword arguments.
+        The returned value, for example the scale of the force densities, is stored in the results.
+        The function has to be picklable, i.e. defined at module level or a :func:`functools.partial` of such a function.
+    max_workers : int, optional
+        The number of worker processes.
+        Default is the number of processors of the machine.
+    chunksize : int, optional
+        The number of runs that is sent to a worker at once.
+
+    Returns
+    -------
+    ndarray
+        A record array with one record per run, in the order of the parameter grid.
+        The record fields are the parameters, and
+
+        * ``success``: False if the pipeline raised an exception,
+          or if its result or the attributes of the diagram could not be converted to numbers.
+        * ``error``: the representation of the exception of a failed run, or an empty string.
+        * ``result``: the value returned by the pipeline, or ``nan``.
+        * ``z``: the heights of the vertices, in the order of :meth:`CompactFormDiagram.vertices`.
+        * ``q``: the force densities of the edges with ``_is_edge=True``, in the order of :meth:`CompactFormDiagram.edges`.
+        * ``reactions``: the reaction forces ``(_rx, _ry, _rz)`` at the supports, zero elsewhere.
+        * ``residuals``: the residual forces ``(_rx, _ry, _rz)`` at the free vertices, zero elsewhere.
+
+        The arrays of failed runs are filled with ``nan``.
+
+    Notes
+    -----
+    The diagram and the pipeline are sent to every worker process once, as a pickled compact diagram,
+    and not once for every run.
+    Any large objects the pipeline needs, such as an envelope, should therefore be bound to the pipeline
+    with :func:`functools.partial` rather than passed through the grid.
+
+    Examples
+    --------
+    >>> from compas_tna.equilibrium import vertical_from_zmax
+    >>> def pipeline(form, zmax):
+    ...     _, scale = vertical_from_zmax(form, zmax)
+    ...     return scale
+    >>> results = sweep_numpy(form, {"zmax": numpy.linspace(1.0, 5.0, 100)}, pipeline)
+    >>> results["result"]  # the scale of the force densities for every zmax
+
+    """
+    if not isinstance(form, CompactFormDiagram):
+        form = CompactFormDiagram.from_formdiagram(form)  # type: ignore
+    form = form.copy()
+
+    runs = _grid(grid)
+    n = form.number_of_vertices()
+    m = int(numpy.count_nonzero(form.edge_columns["_is_edge"]))
+    supports = numpy.asarray(form.vertex_columns["is_support"], dtype=bool)
+
+    names = list(runs[0]) if runs else []
+    fields = [(name, numpy.asarray([params[name] for params in runs]).dtype) for name in names]
+    fields += [
+        ("success", bool),
+        ("error", object),
+        ("result", numpy.float64),
+        ("z", numpy.float64, (n,)),
+        ("q", numpy.float64, (m,)),
+        ("reactions", numpy.float64, (n, 3)),
+        ("residuals", numpy.float64, (n, 3)),
+    ]
+    results = numpy.zeros(len(runs), dtype=fields).view(numpy.recarray)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize, initargs=(form, pipeline)) as executor:
+        for index, (params, (success, result, z, q, r, error)) in enumerate(zip(runs, executor.map(_run, runs, chunksize=chunksize))):
+            for name in names:
+                results[name][index] = params[name]
+            results["success"][index] = success
+            results["error"][index] = error
+            results["result"][index] = result
+            if not success:
+                for name in ("z", "q", "reactions", "residuals"):
+                    results[name][index] = numpy.nan
+                continue
+            results["z"][index] = z
+            results["q"][index] = q
+            results["reactions"][index][supports] = r[supports]
+            results["residuals"][index][~supports] = r[~supports]
+
+    return results
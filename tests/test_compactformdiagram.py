@@ -0,0 +1,82 @@
+import pytest
+
+from compas_tna.diagrams import CompactFormDiagram
+from compas_tna.diagrams import ForceDiagram
+from compas_tna.diagrams import FormDiagram
+from compas_tna.diagrams import load_diagrams
+from compas_tna.diagrams import save_diagrams
+from compas_tna.diagrams.binary import _read_header
+from compas_tna.equilibrium import horizontal_numpy
+from compas_tna.equilibrium import vertical_from_zmax
+
+
+def test_roundtrip():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    form.update_boundaries()
+    form.vertex_attribute(0, "label", "corner")
+
+    compact = CompactFormDiagram.from_formdiagram(form)
+    assert compact.vertex_keys.dtype.name == "int32"
+    assert compact.edge_columns["q"].dtype.name == "float64"
+
+    result = compact.to_formdiagram()
+    assert list(result.edges()) == list(form.edges())
+    assert [result.face_vertices(face) for face in result.faces()] == [form.face_vertices(face) for face in form.faces()]
+    assert [dict(attr) for _, attr in result.vertices(data=True)] == [dict(attr) for _, attr in form.vertices(data=True)]
+    assert [dict(attr) for _, attr in result.edges(data=True)] == [dict(attr) for _, attr in form.edges(data=True)]
+
+
+def test_equilibrium():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    form.update_boundaries()
+    compact = CompactFormDiagram.from_formdiagram(form)
+
+    horizontal_numpy(form, ForceDiagram.from_formdiagram(form))
+    _, scale = vertical_from_zmax(form, 3.0)
+
+    horizontal_numpy(compact, ForceDiagram.from_formdiagram(compact))  # type: ignore
+    _, compact_scale = vertical_from_zmax(compact, 3.0)  # type: ignore
+
+    assert abs(scale - compact_scale) < 1e-9
+    assert compact.vertices_attribute("z") == form.vertices_attribute("z")
+
+
+def test_save_load(tmp_path):
+    form = FormDiagram.create_cross(n=6, supports="all")
+    form.update_boundaries()
+    force = ForceDiagram.from_formdiagram(form)
+    force.attributes["scale"] = 2.5
+
+    filepath = str(tmp_path / "diagrams.bin")
+    save_diagrams(filepath, form, force)
+    compact_form, compact_force = load_diagrams(filepath)
+    assert _read_header(filepath)["scale"] == 2.5
+
+    assert compact_force is not None
+    assert compact_force.attributes["scale"] == 2.5
+    assert compact_force.to_formdiagram(cls=ForceDiagram).attributes["scale"] == 2.5
+    assert compact_form._dual_edges is not None
+    assert compact_form.dual_edges() == form.dual_edges()
+    assert compact_form.edges_attribute("q") == form.edges_attribute("q")
+    assert list(compact_force.to_formdiagram(cls=ForceDiagram).edges()) == list(force.edges())
+
+
+def test_dual_edges():
+    form = FormDiagram.create_cross(n=4, supports="all")
+    form.update_boundaries()
+    compact = CompactFormDiagram.from_formdiagram(form)
+    assert compact.dual_edges() == form.dual_edges()
+
+    edge = next(form.edges_where(_is_edge=True))
+    form.edge_attribute(edge, "_is_edge", False)
+    compact.edge_attribute(edge, "_is_edge", False)
+    assert compact.dual_edges() == form.dual_edges()
+
+    # known dual edges are used until the edges marked with ``_is_edge`` change
+    edges = compact.dual_edges()
+    compact.set_dual_edges(edges[::-1])
+    assert compact.dual_edges() == edges[::-1]
+    compact.edge_attribute(edge, "_is_edge", True)
+    assert compact.dual_edges() == FormDiagram.dual_edges(compact)
+    with pytest.raises(ValueError):
+        compact.set_dual_edges(edges)
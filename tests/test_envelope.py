@@ -0,0 +1,195 @@
+import numpy
+import pytest
+
+from compas.datastructures import Mesh
+from compas_tna.diagrams import CompactFormDiagram
+from compas_tna.diagrams import FormDiagram
+from compas_tna.diagrams.diagram_circular import create_circular_radial_spaced_mesh
+from compas_tna.envelope import CrossVaultEnvelope
+from compas_tna.envelope import DomeEnvelope
+from compas_tna.envelope import MeshEnvelope
+from compas_tna.envelope import PavillionVaultEnvelope
+from compas_tna.envelope import MeshGeometry
+from compas_tna.envelope import PointedVaultEnvelope
+from compas_tna.envelope.meshenvelope import interpolate_middle_mesh
+from compas_tna.envelope.meshenvelope import project_mesh_to_target_vertical
+
+
+@pytest.mark.parametrize(
+    "envelope",
+    [
+        CrossVaultEnvelope(y_span=(0.0, 8.0), n=4),
+        PavillionVaultEnvelope(n=4),
+        PointedVaultEnvelope(n=4, he=[6.0, 6.0, 6.0, 6.0]),
+        DomeEnvelope(n_hoops=4, n_parallels=8),
+    ],
+)
+def test_bounds_and_jacobian(envelope):
+    rng = numpy.random.default_rng(0)
+    if isinstance(envelope, DomeEnvelope):
+        radius = rng.uniform(0.0, 4.5, 50)
+        angle = rng.uniform(0.0, 2 * numpy.pi, 50)
+        x = 5.0 + radius * numpy.cos(angle)
+        y = 5.0 + radius * numpy.sin(angle)
+    else:
+        x = rng.uniform(0.5, 9.5, 50)
+        y = rng.uniform(0.5, 7.5, 50)
+
+    ub, lb, dubdt, dlbdt, dubdxy, dlbdxy = envelope.bounds_and_jacobian(x, y)
+
+    zub, zlb = envelope.compute_bounds(x, y)
+    assert ub == pytest.approx(numpy.ravel(zub))
+    assert lb == pytest.approx(numpy.ravel(zlb))
+
+    h = 1e-6
+    t = envelope.thickness
+    ub1, lb1 = envelope.bounds_and_jacobian(x, y, t + h)[:2]
+    ub0, lb0 = envelope.bounds_and_jacobian(x, y, t - h)[:2]
+    assert envelope.thickness == t
+    assert dubdt == pytest.approx((ub1 - ub0) / (2 * h), abs=1e-5)
+    assert dlbdt == pytest.approx((lb1 - lb0) / (2 * h), abs=1e-5)
+
+    ub1, lb1 = envelope.bounds_and_jacobian(x + h, y)[:2]
+    ub0, lb0 = envelope.bounds_and_jacobian(x - h, y)[:2]
+    assert dubdxy[:, 0] == pytest.approx((ub1 - ub0) / (2 * h), abs=1e-5)
+    assert dlbdxy[:, 0] == pytest.approx((lb1 - lb0) / (2 * h), abs=1e-5)
+
+    ub1, lb1 = envelope.bounds_and_jacobian(x, y + h)[:2]
+    ub0, lb0 = envelope.bounds_and_jacobian(x, y - h)[:2]
+    assert dubdxy[:, 1] == pytest.approx((ub1 - ub0) / (2 * h), abs=1e-5)
+    assert dlbdxy[:, 1] == pytest.approx((lb1 - lb0) / (2 * h), abs=1e-5)
+
+
+def test_mesh_bounds_and_jacobian():
+    crossvault = CrossVaultEnvelope(n=6)
+    envelope = MeshEnvelope.from_meshes(crossvault.intrados, crossvault.extrados)
+    x, y, z = numpy.array(crossvault.extrados.vertices_attributes("xyz")).T
+
+    ub, lb, dubdt, dlbdt, dubdxy, dlbdxy = envelope.bounds_and_jacobian(x, y)
+    assert ub == pytest.approx(z)
+    assert envelope.interpolator("extrados") is envelope.interpolator("extrados")
+
+    # the bounds are linear in the thickness
+    t = envelope.thickness
+    ub1, lb1 = envelope.bounds_and_jacobian(x, y, 2 * t)[:2]
+    assert ub1 == pytest.approx(ub + t * dubdt)
+    assert lb1 == pytest.approx(lb + t * dlbdt)
+
+
+def test_mesh_geometry():
+    envelope = CrossVaultEnvelope(n=6)
+    middle = envelope.middle
+    geometry = MeshGeometry.from_mesh(middle)
+
+    assert geometry.vertex_areas() == pytest.approx([middle.vertex_area(vertex) for vertex in middle.vertices()])
+    assert geometry.face_areas() == pytest.approx([middle.face_area(face) for face in middle.faces()])
+    assert numpy.allclose(geometry.vertex_normals(), [middle.vertex_normal(vertex) for vertex in middle.vertices()])
+    assert numpy.allclose(geometry.face_normals(), [middle.face_normal(face) for face in middle.faces()])
+
+    mesh = MeshEnvelope.from_middle_mesh(middle, thickness=0.3)
+    expected = sum(0.3 * middle.vertex_area(vertex) for vertex in middle.vertices())
+    assert mesh.compute_volume() == pytest.approx(expected)
+    assert mesh.compute_selfweight() == pytest.approx(expected * mesh.rho)
+    assert mesh.compute_area() == pytest.approx(middle.area())
+
+    # the middle surface is recovered from the offsets
+    interpolated = interpolate_middle_mesh(mesh.intrados, mesh.extrados)
+    assert numpy.allclose(interpolated.vertices_attribute("z"), middle.vertices_attribute("z"))
+
+    # the middle surface of a form diagram is an independent plain mesh
+    form = FormDiagram.create_cross(n=4)
+    envelope = MeshEnvelope.from_formdiagram(form, thickness=0.3)
+    assert type(envelope.middle) is Mesh
+    assert envelope.middle.vertices_attributes("xyz") == form.vertices_attributes("xyz")
+    envelope.middle.vertex_attribute(0, "z", 1.0)
+    assert form.vertex_attribute(0, "z") == 0.0
+
+
+def test_shared_surfaces():
+    envelope = DomeEnvelope(n_hoops=4, n_parallels=8, r_oculus=1.0, thickness=0.5)
+
+    # the surfaces are the radial layouts of their own radius
+    for mesh, radius in [(envelope.intrados, 4.75), (envelope.extrados, 5.25), (envelope.middle, 5.0)]:
+        expected = create_circular_radial_spaced_mesh(radius=radius, n_hoops=4, n_parallels=8, r_oculus=1.0)
+        assert numpy.allclose(mesh.vertices_attributes("xy"), expected.vertices_attributes("xy"))
+        assert [mesh.face_vertices(face) for face in mesh.faces()] == [expected.face_vertices(face) for face in expected.faces()]
+
+    assert envelope.compute_area() == pytest.approx(envelope.middle.area())
+
+    middle = envelope.middle.copy()
+    envelope.middle = middle
+    assert envelope.middle is middle
+
+
+def test_lazy_surfaces():
+    envelope = CrossVaultEnvelope(n=4, thickness=0.5)
+    assert envelope._faces is None
+
+    envelope.compute_bounds(numpy.array([5.0]), numpy.array([2.0]))
+    assert envelope._faces is None
+
+    zmax = max(envelope.extrados.vertices_attribute("z"))
+    envelope.thickness = 1.0
+    assert envelope._faces is None
+    assert max(envelope.extrados.vertices_attribute("z")) == pytest.approx(zmax + 0.25)
+
+    envelope.n = 6
+    assert envelope.middle.number_of_faces() == CrossVaultEnvelope(n=6).middle.number_of_faces()
+
+    # assigning one surface keeps the others available
+    mesh = CrossVaultEnvelope(n=6).middle
+    envelope = CrossVaultEnvelope(n=4)
+    envelope.middle = mesh
+    assert envelope.middle is mesh
+    assert envelope.intrados is not None
+    assert envelope.extrados is not None
+    assert envelope.intrados.number_of_faces() == CrossVaultEnvelope(n=4).intrados.number_of_faces()
+    assert envelope.middle is mesh
+
+
+def test_cached_properties():
+    envelope = CrossVaultEnvelope(n=4, thickness=0.5)
+    area = envelope.area
+    volume = envelope.volume
+    assert volume == pytest.approx(0.5 * area)
+    assert envelope.selfweight == pytest.approx(volume * envelope.rho)
+
+    envelope.thickness = 1.0
+    assert envelope.volume == pytest.approx(2 * volume)
+    envelope.rho = 10.0
+    assert envelope.selfweight == pytest.approx(2 * volume * 10.0)
+
+    envelope.x_span = (0.0, 5.0)
+    assert envelope.area == pytest.approx(envelope.middle.area())
+    assert envelope.area < area
+
+    mesh = MeshEnvelope.from_middle_mesh(envelope.middle.copy(), thickness=0.5)
+    volume = mesh.volume
+    mesh.thickness = 0.25
+    assert mesh.volume == pytest.approx(0.5 * volume)
+
+
+def test_apply_bounds():
+    crossvault = CrossVaultEnvelope(n=6)
+    envelope = MeshEnvelope.from_meshes(crossvault.intrados, crossvault.extrados)
+    form = FormDiagram.create_cross(n=6, supports="all")
+    x, y = numpy.array(form.vertices_attributes("xy")).T
+
+    zub, zlb = crossvault.compute_bounds(x, y)
+    expected = {"ub": numpy.ravel(zub), "lb": numpy.ravel(zlb), "target": numpy.ravel(crossvault.compute_middle(x, y))}
+
+    # the bounds interpolated on the meshes match the vertical projection of the diagram
+    projected = {}
+    for name, mesh in [("ub", envelope.extrados), ("lb", envelope.intrados), ("target", envelope.middle)]:
+        other = form.copy()
+        project_mesh_to_target_vertical(other, mesh)
+        projected[name] = other.vertices_attribute("z")
+
+    for diagram in (form, CompactFormDiagram.from_formdiagram(form)):
+        for env, values in [(crossvault, expected), (envelope, projected)]:
+            env.apply_bounds_to_formdiagram(diagram)
+            env.apply_target_heights_to_formdiagram(diagram)
+            for name in ("ub", "lb", "target"):
+                assert diagram.vertices_attribute(name) == pytest.approx(values[name])
+            # the target heights do not change the geometry of the diagram
+            assert diagram.vertices_attribute("z") == form.vertices_attribute("z")
@@ -0,0 +1,30 @@
+import pytest
+
+from compas_tna.diagrams import FormDiagram
+from compas_tna.diagrams import ForceDiagram
+
+
+def test_from_formdiagram():
+    form = FormDiagram.create_cross(n=4, supports="all")
+    form.update_boundaries()
+    force = ForceDiagram.from_formdiagram(form)
+
+    inner = set(form.vertices()) - set(form.vertices_on_boundary()) - set(form.supports())
+    assert force.number_of_faces() == len(inner)
+    for vertex in inner:
+        assert force.face_vertices(vertex) == form.vertex_faces(vertex, ordered=True)
+
+
+def test_ordered_edges():
+    form = FormDiagram.create_cross(n=4, supports="all")
+    form.update_boundaries()
+    force = ForceDiagram.from_formdiagram(form)
+
+    for (u, v), (f1, f2) in zip(form.edges_where(_is_edge=True), force.ordered_edges(form)):
+        assert force.has_edge((f1, f2)) or force.has_edge((f2, f1))
+        assert form.halfedge[u][v] == f1
+        assert form.halfedge[v][u] == f2
+
+    form.edge_attribute(next(form.edges_where(_is_edge=True)), "_is_edge", False)
+    with pytest.raises(ValueError):
+        force.ordered_edges(form)
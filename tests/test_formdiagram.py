@@ -1,4 +1,7 @@
+import pytest
+
 from compas_tna.diagrams import FormDiagram
+from compas_tna.equilibrium import vertical_from_zmax
 
 
 def test_from_meshgrid():
@@ -14,3 +17,35 @@ def test_corner_supports():
     formdiagram.vertices_attribute("is_support", True, keys=corners)
 
     assert len(list(formdiagram.supports())) == 4
+
+
+def test_vector_fields():
+    formdiagram = FormDiagram.create_cross(n=6, supports="all")
+    for vertex in formdiagram.vertices():
+        formdiagram.vertex_attribute(vertex, "pz", -1.0)
+        formdiagram.vertex_attribute(vertex, "t", 0.5)
+    vertical_from_zmax(formdiagram, 2.0, density=0.0)
+
+    vertices = list(formdiagram.vertices())
+    supports = list(formdiagram.supports())
+    free = [vertex for vertex in vertices if vertex not in supports]
+
+    loads = formdiagram.loads_array()
+    selfweight = formdiagram.selfweight_array()
+    reactions = formdiagram.reactions_array()
+    residuals = formdiagram.residuals_array()
+
+    for index, vertex in enumerate(vertices):
+        assert list(loads[index]) == list(formdiagram.vertex_load(vertex))
+        assert list(selfweight[index]) == pytest.approx(list(formdiagram.vertex_selfweight(vertex)))
+        if vertex in supports:
+            assert list(reactions[index]) == list(formdiagram.vertex_reaction(vertex))
+            assert not residuals[index].any()
+        else:
+            assert list(residuals[index]) == list(formdiagram.vertex_residual(vertex))
+            assert not reactions[index].any()
+
+    # the loads are transferred to the supports
+    assert formdiagram.total_load() == pytest.approx([0.0, 0.0, -len(vertices)])
+    assert formdiagram.total_reaction()[2] == pytest.approx(-len(vertices), rel=1e-6)
+    assert formdiagram.max_residual() == pytest.approx(max(formdiagram.vertex_residual(vertex).length for vertex in free))
@@ -0,0 +1,181 @@
+import numpy
+import pytest
+from scipy.sparse import diags
+
+from compas.linalg import normalizerow
+from compas.matrices import connectivity_matrix
+from compas_tna.diagrams import CompactFormDiagram
+from compas_tna.diagrams import ForceDiagram
+from compas_tna.diagrams import FormDiagram
+from compas_tna.equilibrium import Collector
+from compas_tna.equilibrium import FactorizationCache
+from compas_tna.equilibrium import HorizontalState
+from compas_tna.equilibrium import horizontal_nodal
+from compas_tna.equilibrium import horizontal_nodal_numpy
+from compas_tna.equilibrium import horizontal_numpy
+from compas_tna.equilibrium.parallelisation import parallelise_edges
+from compas_tna.equilibrium.parallelisation_numpy import parallelise_batched
+from compas_tna.equilibrium.parallelisation_numpy import parallelise_nodal
+from compas_tna.equilibrium.parallelisation_numpy import parallelise_sparse
+
+
+def test_warm_start():
+    form = FormDiagram.create_cross(n=10, supports="all")
+    form.update_boundaries()
+    force = ForceDiagram.from_formdiagram(form)
+
+    state = HorizontalState()
+    horizontal_numpy(form, force, state=state)
+
+    vertex = next(key for key in form.vertices() if not form.is_vertex_on_boundary(key))
+    x, y = form.vertex_attributes(vertex, "xy")
+    form.vertex_attributes(vertex, "xy", [x + 0.05, y])
+
+    # a warm start gives the same result as a cold start from the same diagrams
+    cold = form.copy()
+    cold_force = force.copy()
+    horizontal_numpy(cold, cold_force, kmax=20)
+    warm = form.copy()
+    warm_force = force.copy()
+    horizontal_numpy(warm, warm_force, kmax=20, state=state, changed=[vertex])
+    for key in force.vertices():
+        assert warm_force.vertex_attributes(key, "xy") == pytest.approx(cold_force.vertex_attributes(key, "xy"))
+
+    # and stops as soon as it converges, without refactorizing
+    collector = Collector()
+    horizontal_numpy(form, force, state=state, tol=1e-3, monitor=collector)
+    assert "horizontal_numpy/assembly/factorization" not in collector.phases
+    assert collector.phases["horizontal_numpy/iterations"]["iterations"] < 100
+    assert collector.phases["horizontal_numpy/iterations"]["residuals"][-1] < 1e-3
+
+
+def test_factorization_cache():
+    cache = FactorizationCache(maxsize=2)
+    form = FormDiagram.create_cross(n=6, supports="all")
+    form.update_boundaries()
+    force = ForceDiagram.from_formdiagram(form)
+    horizontal_numpy(form, force, state=HorizontalState(cache=cache))
+    assert len(cache) == 1
+
+    # a diagram with the same topology reuses the factorizations
+    collector = Collector()
+    horizontal_numpy(form.copy(), force.copy(), state=HorizontalState(cache=cache), monitor=collector)
+    assert "horizontal_numpy/assembly/factorization" not in collector.phases
+
+    # systems with the same name but different matrices are not mixed up
+    for n in (4, 6):
+        other = FormDiagram.create_cross(n=n, supports="all")
+        edges = [(other.vertex_index()[u], other.vertex_index()[v]) for u, v in other.edges()]
+        C = connectivity_matrix(edges, "csr")
+        A = C.T.dot(C)
+        fixed = [other.vertex_index()[vertex] for vertex in other.supports()]
+        xy = numpy.array(other.vertices_attributes("xy"))
+        B = A.dot(xy)
+        X = xy.copy()
+        X[[i for i in range(len(xy)) if i not in fixed]] = 0.0
+        assert parallelise_sparse(A, B, X, fixed, key="CtC", cache=cache) == pytest.approx(xy)
+
+        # and the same system is factorized only once
+        collector = Collector()
+        X[[i for i in range(len(xy)) if i not in fixed]] = 0.0
+        assert parallelise_sparse(A.copy(), B, X, fixed, key="CtC", monitor=collector, cache=cache) == pytest.approx(xy)
+        assert "factorization" not in collector.phases
+
+        # but a matrix with the same pattern and other values is factorized again
+        Q = diags([numpy.linspace(1.0, 2.0, C.shape[0])], [0])
+        A = C.T.dot(Q).dot(C)
+        B = A.dot(xy)
+        X[[i for i in range(len(xy)) if i not in fixed]] = 0.0
+        assert parallelise_sparse(A, B, X, fixed, key="CtC", cache=cache) == pytest.approx(xy)
+
+    # the least recently used factorizations are removed, or all of them on request
+    assert len(cache) == 2
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_local_update():
+    form = FormDiagram.create_cross(n=10, supports="all")
+    form.update_boundaries()
+    force = ForceDiagram.from_formdiagram(form)
+    horizontal_nodal(form, force)
+
+    vertex = next(key for key in form.vertices() if not form.is_vertex_on_boundary(key))
+    x, y = form.vertex_attributes(vertex, "xy")
+    form.vertex_attributes(vertex, "xy", [x + 0.05, y])
+
+    collector = Collector()
+    horizontal_nodal(form, force, changed=[vertex], tol=1e-4, monitor=collector)
+
+    assert collector.phases["horizontal_nodal/iterations"]["iterations"] < 100
+    assert form.vertex_attributes(vertex, "xy") == [x + 0.05, y]
+    assert max(form.edges_attribute("_a", keys=list(form.edges_where(_is_edge=True)))) < 1.0
+
+
+def test_parallelise_batched():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    form.update_boundaries()
+    k_i = form.vertex_index()
+    uv_i = form.uv_index()
+    edges = [[k_i[u], k_i[v]] for u, v in form.edges_where(_is_edge=True)]
+    fixed = [k_i[key] for key in form.supports()]
+    i_nbrs = {k_i[key]: [k_i[nbr] for nbr in form.vertex_neighbors(key)] for key in form.vertices()}
+    ij_e = {(k_i[u], k_i[v]): index for (u, v), index in uv_i.items()}
+
+    xy = numpy.array(form.vertices_attributes("xy"))
+    C = connectivity_matrix(edges, "csr")
+    targets = normalizerow(C.dot(xy))
+    xy[:, 0] += numpy.linspace(0.0, 0.5, xy.shape[0])
+
+    nodal = xy.copy()
+    parallelise_nodal(nodal, C, targets, i_nbrs, ij_e, fixed=fixed, kmax=20)
+    jacobi = parallelise_batched(xy.copy(), C, targets, fixed=fixed, kmax=20)
+    assert numpy.allclose(nodal, jacobi)
+
+    collector = Collector()
+    collector.start("iterations")
+    parallelise_batched(xy.copy(), C, targets, fixed=fixed, kmax=1000, tol=1e-8, max_workers=2, monitor=collector)
+    collector.stop("iterations")
+    assert collector.phases["iterations"]["residuals"][-1] < 1e-8
+
+    # the pure Python and the vectorized implementation of both schemes are the same
+    for coloured in (False, True):
+        python = xy.tolist()
+        parallelise_edges(python, edges, targets.tolist(), i_nbrs, ij_e, fixed=fixed, kmax=20, coloured=coloured)
+        batched = parallelise_batched(xy.copy(), C, targets, fixed=fixed, kmax=20, coloured=coloured, max_workers=2)
+        assert numpy.allclose(python, batched)
+
+    # the graph-coloured Gauss-Seidel scheme converges in fewer sweeps than the Jacobi scheme
+    sweeps = {}
+    for coloured in (False, True):
+        collector = Collector()
+        collector.start("iterations")
+        parallelise_edges(xy.tolist(), edges, targets.tolist(), i_nbrs, ij_e, fixed=fixed, kmax=1000, tol=1e-8, monitor=collector, coloured=coloured)
+        collector.stop("iterations")
+        assert collector.phases["iterations"]["residuals"][-1] < 1e-8
+        sweeps[coloured] = collector.phases["iterations"]["iterations"]
+    assert sweeps[True] < sweeps[False]
+
+
+@pytest.mark.parametrize("solver", [horizontal_nodal, horizontal_nodal_numpy])
+def test_nodal_compact(solver):
+    form = FormDiagram.create_cross(n=6, supports="all")
+    form.update_boundaries()
+    compact = CompactFormDiagram.from_formdiagram(form)
+    force = ForceDiagram.from_formdiagram(form)
+    compact_force = ForceDiagram.from_formdiagram(compact)
+
+    solver(form, force, kmax=20)
+    solver(compact, compact_force, kmax=20)  # type: ignore
+    assert numpy.allclose(compact.vertices_attributes("xy"), form.vertices_attributes("xy"))
+    assert numpy.allclose(compact.edges_attribute("q"), form.edges_attribute("q"))
+    assert numpy.allclose(compact_force.vertices_attributes("xy"), force.vertices_attributes("xy"))
+
+    # the local update of a compact diagram
+    vertex = next(key for key in form.vertices() if not form.is_vertex_on_boundary(key))
+    for diagram, dual in ((form, force), (compact, compact_force)):
+        x, y = diagram.vertex_attributes(vertex, "xy")
+        diagram.vertex_attributes(vertex, "xy", [x + 0.05, y])
+        solver(diagram, dual, changed=[vertex], tol=1e-4)
+    assert numpy.allclose(compact.edges_attribute("q"), form.edges_attribute("q"))
+    assert numpy.allclose(compact_force.vertices_attributes("xy"), force.vertices_attributes("xy"))
@@ -0,0 +1,77 @@
+import numpy
+import pytest
+from scipy.interpolate import griddata
+
+from compas_tna.diagrams import CompactFormDiagram
+from compas_tna.diagrams import FormDiagram
+from compas_tna.loads import LoadUpdater
+from compas_tna.loads import distribute_thickness
+from compas_tna.loads import face_arrays
+from compas_tna.loads import lumped_selfweight
+from compas_tna.loads import scattered_interpolator
+from compas_tna.loads import tributary_areas
+
+
+def test_lumped_selfweight():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    for vertex in form.vertices():
+        form.vertex_attribute(vertex, "z", 0.1 * vertex % 0.7)
+        form.vertex_attribute(vertex, "t", 0.2 + 0.01 * vertex)
+    for face in list(form.faces())[::5]:
+        form.face_attribute(face, "_is_loaded", False)
+
+    xyz = numpy.array(form.vertices_attributes("xyz"))
+    thickness = numpy.array(form.vertices_attribute("t"))
+    indptr, indices, loaded = face_arrays(form)
+    assert not loaded.all()
+
+    areas = tributary_areas(xyz, indptr, indices, loaded)
+    assert areas == pytest.approx([form.vertex_tributary_area(vertex) for vertex in form.vertices()])
+    assert tributary_areas(xyz, indptr, indices) == pytest.approx([form.vertex_area(vertex) for vertex in form.vertices()])
+
+    pz = lumped_selfweight(xyz, indptr, indices, loaded, thickness, density=2.0)
+    assert pz == pytest.approx([2.0 * form.vertex_selfweight(vertex)[2] for vertex in form.vertices()])
+
+    # the faces of a compact diagram are used as they are
+    compact = face_arrays(CompactFormDiagram.from_formdiagram(form))
+    assert all(numpy.array_equal(a, b) for a, b in zip(compact, (indptr, indices, loaded)))
+
+    updater = LoadUpdater(form, numpy.zeros((xyz.shape[0], 3)))
+    assert updater.tributary_areas(xyz)[:, 0] == pytest.approx(areas)
+
+
+def test_scattered_interpolator():
+    rng = numpy.random.default_rng(0)
+    xy = rng.uniform(0.0, 10.0, (60, 2))
+    values = numpy.sin(xy[:, 0]) + xy[:, 1]
+    xi = rng.uniform(-1.0, 11.0, (200, 2))
+
+    interpolator = scattered_interpolator(xy)
+    assert scattered_interpolator(xy.copy()) is interpolator
+
+    for method in ("linear", "nearest", "cubic"):
+        expected = griddata(xy, values, xi, method=method)
+        result = interpolator(values, xi, method=method, extrapolate=False)
+        assert result == pytest.approx(expected, nan_ok=True)
+
+        # outside the convex hull, the values of the nearest points are used
+        result = interpolator(values, xi, method=method)
+        outside = numpy.isnan(expected)
+        assert not numpy.isnan(result).any()
+        assert result[outside] == pytest.approx(griddata(xy, values, xi[outside], method="nearest"))
+
+    with pytest.raises(ValueError):
+        interpolator(values, xi, method="quintic")
+
+
+def test_distribute_thickness():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    for vertex in form.vertices():
+        x, y = form.vertex_attributes(vertex, "xy")
+        missing = vertex % 3 == 0 and not form.is_vertex_on_boundary(vertex)
+        form.vertex_attribute(vertex, "t", 0.0 if missing else 0.1 + 0.01 * x + 0.02 * y)
+
+    distribute_thickness(form)
+    for vertex in form.vertices():
+        x, y = form.vertex_attributes(vertex, "xy")
+        assert form.vertex_attribute(vertex, "t") == pytest.approx(0.1 + 0.01 * x + 0.02 * y)
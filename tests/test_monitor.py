@@ -0,0 +1,45 @@
+import pytest
+
+from compas_tna.diagrams import ForceDiagram
+from compas_tna.diagrams import FormDiagram
+from compas_tna.equilibrium import Collector
+from compas_tna.equilibrium import VerticalProblem
+from compas_tna.equilibrium import horizontal_nodal
+from compas_tna.equilibrium import horizontal_numpy
+from compas_tna.equilibrium import vertical_from_zmax
+
+
+def test_collector():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    form.update_boundaries()
+    force = ForceDiagram.from_formdiagram(form)
+
+    collector = Collector()
+    horizontal_nodal(form, force, kmax=5, monitor=collector)
+    horizontal_numpy(form, force, kmax=5, monitor=collector)
+    vertical_from_zmax(form, 3.0, monitor=collector)
+
+    phases = collector.phases
+    assert phases["horizontal_nodal/iterations"]["iterations"] == 5
+    assert phases["horizontal_numpy/iterations"]["iterations"] == 5
+    assert phases["horizontal_numpy/assembly/factorization"]["calls"] == 1
+    assert phases["vertical_from_zmax/update_z/iterations"]["residuals"][-1] < 1e-3
+    assert phases["vertical_from_zmax"]["time"] >= phases["vertical_from_zmax/writeback"]["time"]
+    assert "horizontal_numpy" in collector.summary()
+
+
+def test_collector_exception():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    form.update_boundaries()
+    other = FormDiagram.create_cross(n=4, supports="all")
+    other.update_boundaries()
+
+    collector = Collector()
+    with pytest.raises(ValueError):
+        vertical_from_zmax(form, 3.0, problem=VerticalProblem(other), monitor=collector)
+    vertical_from_zmax(form, 3.0, monitor=collector)
+
+    phases = collector.phases
+    assert phases["vertical_from_zmax"]["calls"] == 2
+    assert phases["vertical_from_zmax/index"]["calls"] == 2
+    assert phases["vertical_from_zmax/writeback"]["calls"] == 1
@@ -0,0 +1,88 @@
+import numpy
+import pytest
+
+from compas.linalg import normrow
+from compas_tna.diagrams import FormDiagram
+from compas_tna.equilibrium import Collector
+from compas_tna.equilibrium import RelaxationProblem
+from compas_tna.equilibrium import relax_boundary_openings
+
+
+def test_relaxation_problem():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    fixed = list(form.vertices_where(is_support=True))[::2]
+    problem = RelaxationProblem(form, fixed)
+
+    for q, pz in [(1.0, 0.0), (2.0, 0.0), (2.0, -0.1)]:
+        form.edges_attribute("q", q)
+        form.vertices_attribute("pz", pz)
+        reference = relax_boundary_openings(form.copy(), fixed)
+
+        collector = Collector()
+        relax_boundary_openings(form, fixed, monitor=collector, problem=problem)
+
+        assert numpy.allclose(form.vertices_attributes("xyz"), reference.vertices_attributes("xyz"))
+        if q != 1.0:
+            # the force densities only changed by a scale factor
+            assert "relax_boundary_openings/solve/factorization" not in collector.phases
+
+    with pytest.raises(ValueError):
+        relax_boundary_openings(form, fixed[1:], problem=problem)
+
+
+def test_relaxation_fd_numpy():
+    solvers = pytest.importorskip("compas_fd.solvers")
+    form = FormDiagram.create_cross(n=6, supports="all")
+    fixed = list(form.vertices_where(is_support=True))[::2]
+    for index, edge in enumerate(form.edges()):
+        form.edge_attribute(edge, "q", 1.0 + 0.5 * (index % 3))
+    form.vertices_attribute("pz", -0.1)
+
+    k_i = form.vertex_index()
+    result = solvers.fd_numpy(
+        vertices=form.vertices_attributes("xyz"),
+        fixed=[k_i[vertex] for vertex in fixed],
+        edges=[(k_i[u], k_i[v]) for u, v in form.edges()],
+        forcedensities=form.edges_attribute("q"),
+        loads=form.vertices_attributes(("px", "py", "pz")),
+    )
+    relax_boundary_openings(form, fixed)
+
+    assert numpy.allclose(form.vertices_attributes("xyz"), result.vertices)
+
+
+def test_relaxation_lengths():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    fixed = list(form.vertices_where(is_support=True))[::2]
+    k_i = form.vertex_index()
+    u = [k_i[u] for u, _ in form.edges()]
+    v = [k_i[v] for _, v in form.edges()]
+
+    # the lengths of the edges of a relaxation with other force densities are attainable
+    for index, edge in enumerate(form.edges()):
+        form.edge_attribute(edge, "q", 1.0 + 0.5 * (index % 3))
+    relax_boundary_openings(form, fixed)
+    xyz = numpy.array(form.vertices_attributes("xyz"))
+    lengths = normrow(xyz[u] - xyz[v]).ravel()
+
+    form.edges_attribute("q", 1.0)
+    relax_boundary_openings(form, fixed, lengths=lengths, kmax=500, tol=1e-4)
+
+    xyz = numpy.array(form.vertices_attributes("xyz"))
+    result = normrow(xyz[u] - xyz[v]).ravel()
+    assert numpy.all(numpy.abs(result / lengths - 1.0) <= 1e-4)
+    assert form.edges_attribute("q") != [1.0] * form.number_of_edges()
+
+    # the force densities are those of the returned coordinates, also without convergence
+    problem = RelaxationProblem(form, fixed)
+    xyz, p, q = problem.data(form)
+    for kmax in (0, 1, 3, 500):
+        xyz_k, q_k, converged, residual = problem.solve(xyz, numpy.ones_like(q), p, lengths=lengths, kmax=kmax, tol=1e-4)
+        assert converged == (kmax == 500)
+        assert numpy.isfinite(residual)
+        assert residual == pytest.approx(numpy.abs(normrow(xyz_k[u] - xyz_k[v]).ravel() / lengths - 1.0).max())
+        xyz_q, _, _, _ = problem.solve(xyz, q_k, p)
+        assert numpy.allclose(xyz_q, xyz_k)
+
+    with pytest.raises(ValueError):
+        problem.solve(xyz, q, p, lengths=numpy.zeros_like(lengths))
@@ -0,0 +1,29 @@
+import numpy
+
+from compas_tna.diagrams import FormDiagram
+from compas_tna.equilibrium import vertical_from_zmax
+from compas_tna.sweep import sweep_numpy
+
+
+def pipeline(form, zmax):
+    if zmax < 0:
+        raise ValueError("zmax should be positive")
+    _, scale = vertical_from_zmax(form, zmax)
+    return scale
+
+
+def test_sweep_zmax():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    form.update_boundaries()
+
+    results = sweep_numpy(form, {"zmax": [-1.0, 2.0, 3.0]}, pipeline, max_workers=2)
+
+    assert results.shape == (3,)
+    assert results["success"].tolist() == [False, True, True]
+    assert results["error"].tolist() == [repr(ValueError("zmax should be positive")), "", ""]
+    assert numpy.isnan(results["z"][0]).all()
+    assert numpy.allclose(results["z"][1:].max(axis=1), [2.0, 3.0], atol=1e-2)
+
+    _, scale = vertical_from_zmax(form, 3.0)
+    assert numpy.isclose(results["result"][2], scale)
+    assert numpy.allclose(results["z"][2], form.vertices_attribute("z"))
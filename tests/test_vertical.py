@@ -0,0 +1,175 @@
+import numpy
+import pytest
+
+from compas.matrices import connectivity_matrix
+from compas.matrices import equilibrium_matrix
+from compas_tna.diagrams import FormDiagram
+from compas_tna.equilibrium import Collector
+from compas_tna.equilibrium import VerticalProblem
+from compas_tna.equilibrium import VerticalSensitivity
+from compas_tna.equilibrium import thrust_limits
+from compas_tna.equilibrium import vertical_bestfit
+from compas_tna.equilibrium import vertical_from_q
+from compas_tna.equilibrium import vertical_from_zmax
+from compas_tna.equilibrium.diagrams import form_count_dof
+from compas_tna.equilibrium.diagrams import form_identify_dof
+
+
+def test_vertical_problem():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    problem = VerticalProblem(form)
+
+    for zmax, density in [(3.0, 1.0), (2.0, 1.0), (2.0, 0.5)]:
+        reference = form.copy()
+        _, expected = vertical_from_zmax(reference, zmax, density=density)
+
+        collector = Collector()
+        _, scale = vertical_from_zmax(form, zmax, density=density, problem=problem, monitor=collector)
+
+        assert scale == pytest.approx(expected)
+        assert form.vertices_attribute("z") == pytest.approx(reference.vertices_attribute("z"))
+        if zmax != 3.0:
+            # the force densities of the form only changed by a scale factor
+            assert "vertical_from_zmax/factorization" not in collector.phases
+
+    with pytest.raises(ValueError):
+        vertical_from_zmax(FormDiagram.create_cross(n=4), 3.0, problem=problem)
+
+    # the boundary edges added by update_boundaries are not part of the problem
+    form.update_boundaries()
+    problem = VerticalProblem(form)
+    problem.check(form)
+    reference = form.copy()
+    _, scale = vertical_from_zmax(form, 3.0, problem=problem)
+    assert scale == pytest.approx(vertical_from_zmax(reference, 3.0)[1])
+
+
+def test_sensitivity():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    vertical_from_zmax(form, 2.0)
+    vertical_from_q(form, tol=1e-12, kmax=1000)
+
+    sensitivity = VerticalSensitivity(form)
+    edges = list(form.edges_where(_is_edge=True))
+    fixed = sensitivity.fixed
+
+    index = 5
+    h = 1e-6
+    q = form.edge_attribute(edges[index], "q")
+    results = []
+    for value in (q + h, q - h):
+        other = form.copy()
+        other.edge_attribute(edges[index], "q", value)
+        vertical_from_q(other, tol=1e-12, kmax=1000)
+        results.append((numpy.array(other.vertices_attribute("z")), numpy.array(other.vertices_attribute("_rz"))))
+    dz = (results[0][0] - results[1][0]) / (2 * h)
+    dr = (results[0][1] - results[1][1]) / (2 * h)
+
+    dq = numpy.zeros(len(edges))
+    dq[index] = 1.0
+    assert numpy.allclose(sensitivity.jvp(dq), dz, atol=1e-6)
+    assert numpy.allclose(sensitivity.reactions_jvp(dq)[fixed], dr[fixed], atol=1e-6)
+
+    # several changes at once, as the columns of a matrix
+    dQ = numpy.eye(len(edges))[:, [index, 0, 7]]
+    expected = numpy.column_stack([sensitivity.reactions_jvp(dQ[:, i]) for i in range(3)])
+    assert numpy.allclose(sensitivity.reactions_jvp(dQ), expected)
+
+    w = numpy.linspace(0.0, 1.0, form.number_of_vertices())
+    assert numpy.allclose(sensitivity.vjp(w), sensitivity.jacobian().T.dot(w))
+
+
+def test_bestfit():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    vertical_from_zmax(form, 2.0)
+    target = form.vertices_attribute("z")
+    for vertex, z in zip(form.vertices(), target):
+        form.vertex_attribute(vertex, "target", z)
+
+    # the target is a thrust network with the same force distribution, at a different scale
+    vertical_from_zmax(form, 3.0)
+    _, error = vertical_bestfit(form)
+
+    assert error < 1e-8
+    assert form.vertices_attribute("z") == pytest.approx(target, abs=1e-4)
+
+    # the heights are bounded by an upper bound below the target
+    for vertex in form.vertices():
+        form.vertex_attribute(vertex, "ub", form.vertex_attribute(vertex, "target") - 0.05)
+
+    _, error = vertical_bestfit(form)
+    z = numpy.array(form.vertices_attribute("z"))
+    ub = numpy.array(form.vertices_attribute("ub"))
+    free = [i for i, vertex in enumerate(form.vertices()) if not form.vertex_attribute(vertex, "is_support")]
+
+    assert error > 0
+    assert numpy.all(z[free] <= ub[free] + 1e-5)
+
+
+def test_thrust_limits():
+    form = FormDiagram.create_cross(n=6, supports="all")
+    for vertex in form.vertices():
+        form.vertex_attribute(vertex, "pz", 1.0)
+    vertical_from_zmax(form, 3.0, density=0.0)
+    for vertex in form.vertices():
+        z = form.vertex_attribute(vertex, "z")
+        form.vertex_attribute(vertex, "ub", 1.2 * z + 0.2)
+        form.vertex_attribute(vertex, "lb", 0.8 * z)
+
+    (form_min, scale_min, converged_min, violation_min), (form_max, scale_max, converged_max, violation_max) = thrust_limits(form, density=0.0, kmax=1000)
+
+    assert converged_min and converged_max
+    assert violation_min < 1e-5 and violation_max < 1e-5
+    assert scale_min < 1.0 < scale_max
+    free = [i for i, vertex in enumerate(form.vertices()) if not form.vertex_attribute(vertex, "is_support")]
+    ub = numpy.array(form.vertices_attribute("ub"))[free]
+    lb = numpy.array(form.vertices_attribute("lb"))[free]
+    for network in (form_min, form_max):
+        z = numpy.array(network.vertices_attribute("z"))[free]
+        assert numpy.all(z <= ub + 1e-5)
+        assert numpy.all(z >= lb - 1e-5)
+
+    # bounds that no thrust network satisfies
+    for vertex in form.vertices():
+        form.vertex_attribute(vertex, "ub", form.vertex_attribute(vertex, "lb") - 0.1)
+    (_, _, converged_min, violation_min), (_, _, converged_max, violation_max) = thrust_limits(form, density=0.0)
+    assert not converged_min and not converged_max
+    assert violation_min > 0.01 and violation_max > 0.01
+
+
+def test_thrust_limits_arch():
+    # the horizontal force of an arch under vertical loads is constant, and its heights are inversely proportional to it
+    # with bounds proportional to the heights, the limits of the thrust are known
+    form = FormDiagram.create_arch(n=21)
+    for u, v in form.edges():
+        form.edge_attribute((u, v), "q", 1.0 / abs(form.vertex_attribute(u, "x") - form.vertex_attribute(v, "x")))
+    for vertex in form.vertices():
+        form.vertex_attribute(vertex, "pz", 1.0)
+    vertical_from_zmax(form, 1.0, density=0.0)
+    for vertex in form.vertices():
+        z = form.vertex_attribute(vertex, "z")
+        form.vertex_attribute(vertex, "ub", 1.25 * z)
+        form.vertex_attribute(vertex, "lb", 0.5 * z)
+
+    (_, scale_min, converged_min, _), (_, scale_max, converged_max, _) = thrust_limits(form, density=0.0)
+
+    assert converged_min and converged_max
+    assert scale_min == pytest.approx(1 / 1.25, rel=1e-6)
+    assert scale_max == pytest.approx(1 / 0.5, rel=1e-6)
+
+
+def test_identify_dof():
+    form = FormDiagram.create_cross(n=10, supports="all")
+    form.update_boundaries()
+    k_i = form.vertex_index()
+    fixed = [k_i[key] for key in form.supports()]
+    free = [index for index in range(form.number_of_vertices()) if index not in fixed]
+    edges = [(k_i[u], k_i[v]) for u, v in form.edges_where(_is_edge=True)]
+    E = equilibrium_matrix(connectivity_matrix(edges), form.vertices_attributes("xyz"), free)
+
+    ind = form_identify_dof(form)
+    dep = [index for index in range(len(edges)) if index not in ind]
+    assert len(ind) == form_count_dof(form)[0]
+    # the force densities of the dependent edges follow from those of the independent edges
+    assert numpy.linalg.matrix_rank(E[:, dep]) == len(dep) == E.shape[0]
+    assert numpy.linalg.cond(E[:, dep]) < 1e6